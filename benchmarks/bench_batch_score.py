@@ -0,0 +1,98 @@
+"""Time batch scoring: per-event ``ScoringModel`` vs. a ``BatchScorer`` feature matrix.
+
+For each pool size the script times
+
+* ``model``    — one pass of :class:`plan.score.ScoringModel` over the pool,
+  which is what every extra weight setting costs without a feature matrix;
+* ``extract``  — :meth:`plan.batch_score.BatchScorer.features`, paid once;
+* ``product``  — one matrix-vector product (one weight setting);
+* ``settings`` — ``--settings`` random weight settings in one matrix product.
+
+Events are synthetic listings with ~30 words of notes (kept short so a
+million of them fit in memory), scored against ``src/scoring_config.json``
+and ``src/preferences.yaml``.
+
+Usage::
+
+    python benchmarks/bench_batch_score.py
+    python benchmarks/bench_batch_score.py --sizes 10000 100000 1000000 --settings 100
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy
+import yaml
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT / "src"))
+
+from plan.batch_score import BatchScorer  # noqa: E402
+from plan.score import ScoringModel  # noqa: E402
+
+WORDS = (
+    "climate energy lecture workshop community music jazz running yoga brunch networking "
+    "startup policy science panel film art gallery family kids outdoor hike garden"
+).split()
+CATEGORIES = ["lecture", "climate", "arts", "outdoors", "music", None]
+
+
+def _events(count: int, seed: int = 5) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "title": " ".join(rng.choices(WORDS, k=5)).title(),
+            "notes": " ".join(rng.choices(WORDS, k=30)),
+            "category": rng.choice(CATEGORIES),
+            "start_local": f"2030-05-{1 + idx % 28:02d}T{17 + idx % 6}:30",
+            "cost": rng.choice(["", "Free", "$10"]),
+            "source": rng.choice(["campus_farm", "aadl", "umich"]),
+            "travel_minutes": rng.choice([None, 15, 40, 60]),
+        }
+        for idx in range(count)
+    ]
+
+
+def _timed(run):
+    started = time.perf_counter()
+    result = run()
+    return result, time.perf_counter() - started
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    argparser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    argparser.add_argument("--settings", type=int, default=50)
+    args = argparser.parse_args()
+
+    config = json.loads((ROOT / "src" / "scoring_config.json").read_text())
+    preferences = yaml.safe_load((ROOT / "src" / "preferences.yaml").read_text())
+    scorer = BatchScorer(config, preferences)
+    base = scorer.weight_vector()
+    rng = numpy.random.default_rng(1)
+    vectors = [base * rng.uniform(0.5, 1.5, size=base.shape) for _ in range(args.settings)]
+    print(f"{len(scorer.columns)} feature columns, {args.settings} weight settings")
+
+    for size in args.sizes:
+        events = _events(size)
+        model = ScoringModel(config, preferences)
+        reference, model_seconds = _timed(lambda: [model.score(event) for event in events])
+        features, extract_seconds = _timed(lambda: scorer.features(events))
+        scores, product_seconds = _timed(lambda: scorer.scores(features, base))
+        _, settings_seconds = _timed(lambda: scorer.score_many(features, vectors))
+        same = scores.tolist() == reference
+        print(
+            f"{size:>9} events: model {model_seconds:7.2f} s | extract {extract_seconds:7.2f} s"
+            f" | product {product_seconds * 1000:7.1f} ms | {args.settings} settings {settings_seconds * 1000:7.1f} ms"
+            f" (vs ~{model_seconds * args.settings:7.1f} s per-event) | scores {'identical' if same else 'DIFFER'}"
+        )
+        del events, features, reference
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Time loading a multi-year personal calendar export for availability.
+
+The synthetic export holds ``--years`` of one-off meetings (about 25 a
+week) plus weekly standing series with EXDATEs and moved instances, in
+the shape Google Calendar exports. It is loaded three ways: the legacy full
+``Calendar.from_ical`` parse (no recurrence expansion), the horizon-bounded
+streaming load with an empty snapshot directory, and the same load again
+served from the snapshot.
+
+Usage::
+
+    python benchmarks/bench_calendar_load.py
+    python benchmarks/bench_calendar_load.py --years 2 5 10 --horizon-days 45
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT / "src"))
+
+from availability import load_calendar_events  # noqa: E402
+
+TODAY = date(2030, 5, 6)
+SERIES = 30
+
+
+def _stamp(value: datetime) -> str:
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def _export(years: int, seed: int = 5) -> bytes:
+    rng = random.Random(seed)
+    first = datetime.combine(TODAY, datetime.min.time()) - timedelta(days=365 * years)
+    blocks = []
+    for idx in range(years * 52 * 25):
+        start = (first + timedelta(days=rng.randrange(365 * years + 90))).replace(hour=rng.randrange(8, 21))
+        blocks.append(
+            f"UID:one-{idx}\r\nSUMMARY:Meeting {idx}\r\n"
+            f"DTSTART;TZID=America/Detroit:{_stamp(start)}\r\n"
+            f"DTEND;TZID=America/Detroit:{_stamp(start + timedelta(minutes=rng.choice([30, 60, 90])))}\r\n"
+        )
+    for idx in range(SERIES):
+        start = (first + timedelta(days=rng.randrange(28))).replace(hour=rng.randrange(7, 21))
+        exdate = start + timedelta(weeks=rng.randrange(52 * years))
+        blocks.append(
+            f"UID:series-{idx}\r\nSUMMARY:Standing {idx}\r\n"
+            f"DTSTART;TZID=America/Detroit:{_stamp(start)}\r\n"
+            f"DTEND;TZID=America/Detroit:{_stamp(start + timedelta(hours=1))}\r\n"
+            f"RRULE:FREQ=WEEKLY\r\nEXDATE;TZID=America/Detroit:{_stamp(exdate)}\r\n"
+        )
+        moved = start + timedelta(weeks=52 * years + 1)
+        blocks.append(
+            f"UID:series-{idx}\r\nSUMMARY:Standing {idx} (moved)\r\n"
+            f"RECURRENCE-ID;TZID=America/Detroit:{_stamp(moved)}\r\n"
+            f"DTSTART;TZID=America/Detroit:{_stamp(moved + timedelta(hours=2))}\r\n"
+            f"DTEND;TZID=America/Detroit:{_stamp(moved + timedelta(hours=3))}\r\n"
+        )
+    body = "".join(f"BEGIN:VEVENT\r\n{block}END:VEVENT\r\n" for block in blocks)
+    return f"BEGIN:VCALENDAR\r\nVERSION:2.0\r\n{body}END:VCALENDAR\r\n".encode("utf-8")
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    argparser.add_argument("--years", type=int, nargs="+", default=[2, 5])
+    argparser.add_argument("--horizon-days", type=int, default=45)
+    args = argparser.parse_args()
+
+    for years in args.years:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "calendar.ics"
+            path.write_bytes(_export(years))
+            started = time.perf_counter()
+            legacy = load_calendar_events(path)
+            legacy_seconds = time.perf_counter() - started
+
+            timings = []
+            for _ in range(2):
+                started = time.perf_counter()
+                entries = load_calendar_events(path, horizon_days=args.horizon_days, today=TODAY, snapshot_dir=Path(tmp))
+                timings.append(time.perf_counter() - started)
+            print(
+                f"{years:>3} years ({path.stat().st_size / 1e6:5.1f} MB): full parse {legacy_seconds:6.2f} s"
+                f" ({len(legacy)} entries, series unexpanded) | horizon load {timings[0]:6.2f} s"
+                f" | snapshot {timings[1] * 1000:6.2f} ms ({len(entries)} entries)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Time ``choose_portfolio``: linear overlap scan vs. ``IntervalIndex``.
+
+Candidates are spread over a 90-day horizon with the checked-in
+``src/scoring_config.json`` and ``src/preferences.yaml``. ``--uncapped``
+lifts the per-day/week caps so the number of scheduled picks (and with it
+the cost of a linear scan) grows with the pool.
+
+* ``linear`` — the previous list of scheduled windows, scanned per candidate.
+* ``index``  — :class:`plan.intervals.IntervalIndex`.
+
+Usage::
+
+    python benchmarks/bench_choose.py --candidates 50000
+    python benchmarks/bench_choose.py --candidates 50000 --uncapped
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import yaml
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT / "src"))
+
+from plan import choose  # noqa: E402
+
+
+class LinearWindows:
+    """The scan ``choose_portfolio`` used before the interval index."""
+
+    def __init__(self) -> None:
+        self.windows: list[tuple[datetime, datetime]] = []
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        for other_start, other_end in self.windows:
+            if max(start, other_start) < min(end, other_end):
+                return True
+        return False
+
+    def add(self, start: datetime, end: datetime) -> None:
+        self.windows.append((start, end))
+
+
+def _candidates(count: int, seed: int = 1) -> list[dict]:
+    rng = random.Random(seed)
+    base = datetime(2030, 5, 6)
+    events = []
+    for idx in range(count):
+        start = base + timedelta(days=rng.randrange(90), minutes=15 * rng.randrange(96))
+        end = start + timedelta(minutes=rng.choice([30, 60, 90, 120, 240]))
+        events.append(
+            {
+                "uid": f"e{idx}",
+                "start_local": start.isoformat(timespec="minutes"),
+                "end_local": end.isoformat(timespec="minutes"),
+                "score": round(rng.random(), 3),
+                "category": rng.choice(["lecture", "arts", "outdoors"]),
+            }
+        )
+    return events
+
+
+def _run(events: list[dict], config: dict, preferences: dict, index_cls) -> tuple[list[str], float]:
+    original = choose.IntervalIndex
+    choose.IntervalIndex = index_cls
+    try:
+        started = time.perf_counter()
+        portfolio = choose.choose_portfolio(events, config, preferences)
+        return [event["uid"] for event in portfolio["selected"]], time.perf_counter() - started
+    finally:
+        choose.IntervalIndex = original
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    argparser.add_argument("--candidates", type=int, default=50_000)
+    argparser.add_argument("--uncapped", action="store_true")
+    args = argparser.parse_args()
+
+    config = json.loads((ROOT / "src" / "scoring_config.json").read_text())
+    preferences = yaml.safe_load((ROOT / "src" / "preferences.yaml").read_text())
+    if args.uncapped:
+        preferences = {**preferences, "caps": {"max_per_day": 100, "max_per_week": 10**6, "max_weekend_total": 10**6}}
+    events = _candidates(args.candidates)
+
+    linear, linear_seconds = _run(events, config, preferences, LinearWindows)
+    indexed, index_seconds = _run(events, config, preferences, choose.IntervalIndex)
+    print(f"{len(events)} candidates, {len(indexed)} selected; selections {'identical' if linear == indexed else 'DIFFER'}")
+    for label, seconds in (("linear", linear_seconds), ("index", index_seconds)):
+        print(f"{label:>6}: {seconds:6.2f} s ({linear_seconds / seconds:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Time building and querying the free/busy bitmap for a year-long calendar.
+
+Busy blocks are synthetic: mostly 30–120 minute meetings during the day,
+some evening commitments, a few running past midnight and the odd
+multi-day trip, spread over 365 days. Queries are 10,000 random 90-minute
+evening candidates, the shape the planner asks about.
+
+Usage::
+
+    python benchmarks/bench_freebusy.py
+    python benchmarks/bench_freebusy.py --entries 2000 8000 32000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT / "src"))
+
+from util.freebusy import FreeBusy  # noqa: E402
+from util.timez import ensure_timezone  # noqa: E402
+
+BASE = ensure_timezone(datetime(2030, 1, 1))
+
+
+def _entries(count: int, seed: int = 4) -> list[dict]:
+    rng = random.Random(seed)
+    entries = []
+    for idx in range(count):
+        day = BASE + timedelta(days=rng.randrange(365))
+        kind = rng.random()
+        if kind < 0.8:
+            start = day.replace(hour=rng.randrange(8, 17), minute=rng.choice([0, 15, 30, 45]))
+            length = timedelta(minutes=rng.choice([30, 60, 90, 120]))
+        elif kind < 0.97:
+            start = day.replace(hour=rng.randrange(17, 23), minute=rng.choice([0, 30]))
+            length = timedelta(minutes=rng.choice([60, 120, 180, 240]))
+        else:
+            start = day.replace(hour=rng.randrange(6, 20))
+            length = timedelta(days=rng.randrange(1, 4), hours=rng.randrange(12))
+        entries.append({"start": start, "end": start + length, "summary": f"entry {idx}", "transparent": kind > 0.995})
+    return entries
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    argparser.add_argument("--entries", type=int, nargs="+", default=[2000, 8000])
+    argparser.add_argument("--queries", type=int, default=10_000)
+    args = argparser.parse_args()
+
+    rng = random.Random(9)
+    queries = []
+    for _ in range(args.queries):
+        start = (BASE + timedelta(days=rng.randrange(365))).replace(hour=rng.randrange(17, 22), minute=rng.choice([0, 30]))
+        queries.append((start, start + timedelta(minutes=90)))
+
+    for count in args.entries:
+        entries = _entries(count)
+        started = time.perf_counter()
+        freebusy = FreeBusy.from_calendar_events(entries)
+        build = time.perf_counter() - started
+
+        started = time.perf_counter()
+        free = sum(freebusy.is_free(start, end) for start, end in queries)
+        query = time.perf_counter() - started
+
+        started = time.perf_counter()
+        days = [date(2030, 1, 1) + timedelta(days=offset) for offset in range(365)]
+        totals = [freebusy.free_minutes(day, (17 * 60, 22 * 60)) for day in days]
+        per_day = time.perf_counter() - started
+        print(
+            f"{count:>6} entries: build {build * 1000:7.1f} ms | {len(queries)} queries {query * 1000:6.1f} ms"
+            f" ({free} free) | 365 evening totals {per_day * 1000:5.2f} ms ({sum(totals) / 365 / 60:.1f} h free/evening)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Time html_pull parsing of a large listing page on each parser backend.
+
+``legacy`` is the per-node ``select_one`` loop over a BeautifulSoup tree;
+the other rows run the compiled extraction plan on every installed
+backend. All rows must produce identical events.
+
+Usage::
+
+    python benchmarks/bench_html_pull.py --rows 800 --rounds 5
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from scrape import html_extract, html_pull  # noqa: E402
+
+CONFIG = {
+    "item": "div.view-content article",
+    "title": "h2",
+    "datetime": "time",
+    "location": "div.field--name-field-location",
+    "notes": "div.field--name-body",
+    "url": "a::attr(href)",
+}
+
+
+def _page(rows: int) -> bytes:
+    articles = "".join(
+        f"<article class='node'><h2><a href='/events/{idx}'>Workshop {idx} &amp; social</a></h2>"
+        f"<time datetime='2030-06-01'> June {1 + idx % 28}, 2030 {1 + idx % 11}:30 pm </time>"
+        f"<div class='field--name-field-location'><span>Room {idx}</span> Michigan Union</div>"
+        f"<div class='field--name-body'><p>{'Bring a friend. ' * 8}</p><p>Free.</p></div></article>"
+        for idx in range(rows)
+    )
+    return (
+        "<!DOCTYPE html><html><head><title>Events</title><script>var a = 1;</script></head>"
+        f"<body><nav>{'<a href=/x>link</a>' * 200}</nav><div class='view-content'>{articles}</div></body></html>"
+    ).encode("utf-8")
+
+
+def _legacy_fields(content: bytes) -> list[dict[str, str]]:
+    def field(node, selector, attribute=None):
+        target = node.select_one(selector)
+        if not target:
+            return ""
+        return target.get(attribute, "") if attribute else target.get_text(strip=True)
+
+    soup = BeautifulSoup(content, "html.parser")
+    rows = []
+    for node in soup.select(CONFIG["item"]):
+        url_selector, url_attr = CONFIG["url"].split("::attr(")
+        rows.append(
+            {
+                "title": field(node, CONFIG["title"]),
+                "datetime": field(node, CONFIG["datetime"]),
+                "location": field(node, CONFIG["location"]),
+                "notes": field(node, CONFIG["notes"]),
+                "url": field(node, url_selector, url_attr.rstrip(")")),
+            }
+        )
+    return rows
+
+
+def _time(parse, page: bytes, rounds: int) -> tuple[list[float], list]:
+    timings, result = [], None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = parse(page)
+        timings.append(time.perf_counter() - started)
+    return timings, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    page = _page(args.rows)
+    results = {"legacy": _time(_legacy_fields, page, args.rounds)}
+    for name in html_extract.available_backends():
+        plan = html_extract.compile_plan({**CONFIG, "backend": name})
+        results[name] = _time(plan.extract, page, args.rounds)
+
+    reference = json.dumps(results["legacy"][1], sort_keys=True)
+    print(f"{args.rows} items ({len(page) / 1024:.0f} KiB), {args.rounds} rounds")
+    for label, (timings, rows) in results.items():
+        ms = [t * 1000 for t in timings]
+        same = "identical" if json.dumps(rows, sort_keys=True) == reference else "DIFFERS"
+        print(f"{label:>10}: median {statistics.median(ms):.1f} ms/page ({same})")
+    events = html_pull._parse(page, {"slug": "bench", "url": "https://example.test/", "html": CONFIG})
+    print(f"{len(events)} events via the default backend ({html_extract.compile_plan(CONFIG).backend.name})")
+
+
+if __name__ == "__main__":
+    main()
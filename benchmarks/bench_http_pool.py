@@ -0,0 +1,109 @@
+"""Compare per-request clients against the pooled fetch transport.
+
+Spins up a local keep-alive HTTP server standing in for a source registry
+of ``--sources`` URLs spread over a handful of hosts, then times:
+
+* ``fresh``  — the previous behaviour: one ``httpx.Client`` per URL.
+* ``pooled`` — ``util.http_cache.fetch`` on the shared pooled client.
+
+Usage::
+
+    python benchmarks/bench_http_pool.py --sources 120 --rounds 3
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from util import http_cache  # noqa: E402
+
+BODY = b"BEGIN:VCALENDAR\r\nVERSION:2.0\r\n" + b"X-PAD:" + b"x" * 2048 + b"\r\nEND:VCALENDAR\r\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:  # noqa: N802 - stdlib naming
+        self.send_response(200)
+        self.send_header("Content-Type", "text/calendar")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def _serve() -> ThreadingHTTPServer:
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+def _time_fresh(urls: list[str]) -> list[float]:
+    timings = []
+    for url in urls:
+        started = time.perf_counter()
+        with httpx.Client(follow_redirects=True, timeout=30.0) as client:
+            client.get(url).raise_for_status()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def _time_pooled(urls: list[str]) -> list[float]:
+    timings = []
+    for url in urls:
+        started = time.perf_counter()
+        http_cache.fetch(url, force_refresh=True)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sources", type=int, default=120)
+    parser.add_argument("--hosts", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    servers = [_serve() for _ in range(args.hosts)]
+    urls = [
+        f"http://127.0.0.1:{servers[idx % args.hosts].server_port}/source-{idx}.ics"
+        for idx in range(args.sources)
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        http_cache.CACHE_DIR = Path(tmp)
+        http_cache.INDEX_FILE = Path(tmp) / "index.json"
+        # Measure the transport, not the politeness limits.
+        http_cache.configure_scheduler(rate_per_second=1e6, burst=1000)
+        results: dict[str, list[float]] = {"fresh": [], "pooled": []}
+        for _ in range(args.rounds):
+            results["fresh"].extend(_time_fresh(urls))
+            http_cache.close_client()
+            results["pooled"].extend(_time_pooled(urls))
+        http_cache.close_client()
+
+    for server in servers:
+        server.shutdown()
+
+    print(f"{args.sources} sources across {args.hosts} hosts, {args.rounds} rounds")
+    for label, timings in results.items():
+        ms = [t * 1000 for t in timings]
+        print(
+            f"{label:>7}: median {statistics.median(ms):.2f} ms/request, "
+            f"p95 {sorted(ms)[int(len(ms) * 0.95) - 1]:.2f} ms, total {sum(ms):.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Time writing a run's calendar files: per-file ``Calendar`` rebuild vs cached VEVENT bytes.
+
+A run writes every event into its source's batch ICS and the merged feed,
+and the picks into ``winners.ics`` and ``winners-REMOVE.ics``. The legacy
+path rebuilds an ``icalendar.Event`` per event per file and serializes a
+whole ``Calendar``. The current writer renders each VEVENT once and streams
+the cached bytes into every file.
+
+Usage::
+
+    python benchmarks/bench_ics_emit.py
+    python benchmarks/bench_ics_emit.py --events 1000 10000 --picks 40
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from icalendar import Calendar
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT / "src"))
+
+from emit.ics_writer import _event_component, clear_vevent_cache, write_ics  # noqa: E402
+
+SOURCES = 30
+
+
+def _events(count: int, seed: int = 2) -> list[dict]:
+    rng = random.Random(seed)
+    base = datetime(2030, 5, 6)
+    events = []
+    for idx in range(count):
+        start = base + timedelta(days=rng.randrange(45), hours=rng.randrange(10, 21))
+        events.append(
+            {
+                "uid": f"event-{idx}@example.org",
+                "title": f"Event {idx}: talk, workshop & social",
+                "start_local": start.isoformat(timespec="minutes"),
+                "end_local": (start + timedelta(minutes=90)).isoformat(timespec="minutes"),
+                "location": "Rackham Amphitheatre, 915 E Washington St, Ann Arbor",
+                "url": f"https://example.org/events/{idx}",
+                "notes": "Doors open 30 minutes early. " * rng.randrange(1, 12),
+                "all_day": rng.random() < 0.05,
+                "source": f"source-{idx % SOURCES}",
+            }
+        )
+    return events
+
+
+def _legacy_write(events: list[dict], path: Path, *, calendar_name: str, cancelled: bool = False) -> None:
+    calendar = Calendar()
+    calendar.add("prodid", "-//Spiceflow Social//EN")
+    calendar.add("version", "2.0")
+    calendar.add("X-WR-CALNAME", calendar_name)
+    for event in events:
+        component = _event_component(event)
+        if cancelled:
+            component.add("status", "CANCELLED")
+        elif event.get("all_day"):
+            component.add("transp", "TRANSPARENT")
+        calendar.add_component(component)
+    path.write_bytes(calendar.to_ical())
+
+
+def _run(writer, events: list[dict], picks: list[dict], out: Path) -> float:
+    started = time.perf_counter()
+    for idx in range(SOURCES):
+        writer([event for event in events if event["source"] == f"source-{idx}"], out / f"source-{idx}.ics", calendar_name=f"source {idx}")
+    writer(events, out / "all_events.ics", calendar_name="merged")
+    writer(picks, out / "winners.ics", calendar_name="winners")
+    writer(picks, out / "winners-REMOVE.ics", calendar_name="rollback", cancelled=True)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    argparser.add_argument("--events", type=int, nargs="+", default=[1000, 10000])
+    argparser.add_argument("--picks", type=int, default=40)
+    args = argparser.parse_args()
+
+    for count in args.events:
+        events = _events(count)
+        picks = events[: args.picks]
+        with tempfile.TemporaryDirectory() as tmp:
+            out = Path(tmp)
+            legacy = _run(_legacy_write, events, picks, out)
+            legacy_bytes = (out / "all_events.ics").stat().st_size
+            clear_vevent_cache()
+            cold = _run(write_ics, events, picks, out)
+            warm = _run(write_ics, events, picks, out)
+            same = (out / "all_events.ics").stat().st_size == legacy_bytes
+            print(
+                f"{count:>6} events: rebuild per file {legacy:6.2f} s | render once {cold:6.2f} s"
+                f" | all bodies cached {warm:6.3f} s | merged feed same size: {same}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Time ICS ingestion of a large synthetic feed: full parse vs. streaming reader.
+
+The feed holds ``--events`` one-off VEVENTs spread over the last several
+years (as big institutional calendars do) plus a few weekly series.
+
+* ``full``   — ``Calendar.from_ical`` on the whole feed, then walk every VEVENT.
+* ``stream`` — ``util.ics_stream.iter_occurrences`` over a 45-day window.
+
+Peak Python memory is measured with ``tracemalloc`` on a separate pass.
+
+Usage::
+
+    python benchmarks/bench_ics_stream.py --events 50000
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from icalendar import Calendar
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from util.ics_stream import iter_occurrences  # noqa: E402
+from util.timez import DEFAULT_TIMEZONE  # noqa: E402
+
+
+def _feed(events: int, series: int, now: datetime) -> bytes:
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//bench//EN"]
+    span = timedelta(days=365 * 6)
+    for idx in range(events):
+        # Mostly history, the last ~2% upcoming.
+        start = now - span + span * (idx / events) * 1.02
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:event-{idx}@bench",
+            f"DTSTART;TZID=America/Detroit:{start.strftime('%Y%m%dT%H%M%S')}",
+            f"DTEND;TZID=America/Detroit:{(start + timedelta(hours=2)).strftime('%Y%m%dT%H%M%S')}",
+            f"SUMMARY:Seminar {idx}",
+            "DESCRIPTION:" + "Speaker bio and abstract. " * 8,
+            "LOCATION:Rackham Amphitheatre",
+            "END:VEVENT",
+        ]
+    for idx in range(series):
+        start = now - timedelta(days=700 + idx)
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:series-{idx}@bench",
+            f"DTSTART;TZID=America/Detroit:{start.strftime('%Y%m%dT180000')}",
+            "DURATION:PT1H",
+            "RRULE:FREQ=WEEKLY",
+            f"SUMMARY:Weekly club {idx}",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(lines) + "\r\n").encode("utf-8")
+
+
+def _full(content: bytes) -> int:
+    return sum(1 for _ in Calendar.from_ical(content).walk("VEVENT"))
+
+
+def _measure(label: str, run) -> None:
+    started = time.perf_counter()
+    count = run()
+    elapsed = time.perf_counter() - started
+    # A second, traced pass: tracemalloc slows the run too much to time it.
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:>6}: {elapsed * 1000:8.0f} ms, peak {peak / 2**20:7.1f} MiB, {count} events")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=50_000)
+    parser.add_argument("--series", type=int, default=20)
+    parser.add_argument("--horizon-days", type=int, default=45)
+    args = parser.parse_args()
+
+    now = datetime.now(DEFAULT_TIMEZONE).replace(tzinfo=None)
+    content = _feed(args.events, args.series, now)
+    window_start = datetime.now(DEFAULT_TIMEZONE)
+    window_end = window_start + timedelta(days=args.horizon_days)
+    print(f"{args.events} events + {args.series} weekly series, {len(content) / 2**20:.1f} MiB feed")
+    _measure("full", lambda: _full(content))
+    _measure("stream", lambda: sum(1 for _ in iter_occurrences(content, window_start, window_end)))
+
+
+if __name__ == "__main__":
+    main()
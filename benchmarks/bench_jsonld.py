@@ -0,0 +1,91 @@
+"""Time JSON-LD script extraction: full BeautifulSoup DOM vs. the byte scan.
+
+Point ``--corpus`` at a directory of saved pages (``*.html``; e.g. copies of
+event listings pulled from ``data/cache``). Without one, a synthetic corpus
+of heavy listing pages is generated so the benchmark runs anywhere.
+
+Usage::
+
+    python benchmarks/bench_jsonld.py --corpus saved_pages/ --rounds 5
+    python benchmarks/bench_jsonld.py --pages 40 --rows 800
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from scrape import jsonld_pull  # noqa: E402
+
+
+def _synthetic_page(rows: int, seed: int) -> bytes:
+    events = [
+        {
+            "@type": "Event",
+            "name": f"Lecture {seed}-{idx}",
+            "startDate": f"2030-05-{1 + idx % 28:02d}T18:00",
+            "location": {"name": "Rackham Auditorium"},
+        }
+        for idx in range(20)
+    ]
+    listing = "".join(
+        f"<div class='event-row'><a href='/e/{idx}'><span class='title'>Event {idx}</span></a>"
+        f"<span class='when'>May {1 + idx % 28}</span><p>{'Lorem ipsum dolor sit amet. ' * 6}</p></div>"
+        for idx in range(rows)
+    )
+    return (
+        "<!DOCTYPE html><html><head><title>Events</title>"
+        "<script>window.dataLayer = [];</script>"
+        f'<script type="application/ld+json">{json.dumps({"@graph": events})}</script>'
+        f"</head><body><!-- listing -->{listing}</body></html>"
+    ).encode("utf-8")
+
+
+def _load_corpus(args: argparse.Namespace) -> list[bytes]:
+    if args.corpus:
+        pages = [path.read_bytes() for path in sorted(args.corpus.glob("*.html"))]
+        if not pages:
+            raise SystemExit(f"no *.html pages in {args.corpus}")
+        return pages
+    return [_synthetic_page(args.rows, seed) for seed in range(args.pages)]
+
+
+def _time(extract, pages: list[bytes], rounds: int) -> list[float]:
+    timings = []
+    for _ in range(rounds):
+        for page in pages:
+            started = time.perf_counter()
+            extract(page)
+            timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, default=None)
+    parser.add_argument("--pages", type=int, default=20, help="Synthetic pages when no --corpus is given")
+    parser.add_argument("--rows", type=int, default=500, help="Listing rows per synthetic page")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = _load_corpus(args)
+    fallbacks = sum(jsonld_pull._script_payloads_fast(page) is None for page in pages)
+    results = {
+        "soup": _time(jsonld_pull._script_payloads_soup, pages, args.rounds),
+        "scan": _time(jsonld_pull._script_payloads, pages, args.rounds),
+    }
+
+    total_kb = sum(len(page) for page in pages) / 1024
+    print(f"{len(pages)} pages ({total_kb:.0f} KiB), {args.rounds} rounds, {fallbacks} fell back to soup")
+    for label, timings in results.items():
+        ms = [t * 1000 for t in timings]
+        print(f"{label:>5}: median {statistics.median(ms):.2f} ms/page, total {sum(ms):.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Time near-duplicate detection: MinHash/LSH vs. all pairs within each day.
+
+Generates ``--events`` listings over ``--days`` days from a vocabulary of
+talk, workshop and show titles; ``--variants`` of them are re-listed on the
+same day by a second "site" with a reworded title and a longer venue.
+
+* ``lsh``      — ``util.near_dupes.find_near_duplicates``.
+* ``pairwise`` — Jaccard on every same-day pair, run on ``--pairwise-days``
+  days and extrapolated (it is quadratic per day).
+* ``templated`` — ``--templated`` copies of one recurring listing on a
+  single day, all near-duplicates of each other: one large candidate group.
+
+Usage::
+
+    python benchmarks/bench_near_dupes.py --events 100000 --days 45
+    python benchmarks/bench_near_dupes.py --events 10000 --templated 1000 5000 20000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from util.near_dupes import DEFAULT_THRESHOLD, find_near_duplicates, jaccard, shingles  # noqa: E402
+
+TOPICS = (
+    "climate data ai policy energy jazz quartet yoga poetry film robotics ethics urban housing water "
+    "markets health music theatre dance sculpture coding history justice design transit soil birds"
+).split()
+KINDS = ("Seminar", "Workshop", "Lecture", "Concert", "Reading", "Panel", "Meetup", "Screening")
+VENUES = ("Rackham Amphitheatre", "Dana Building", "Blue Llama", "Michigan Theater", "Ann Arbor District Library", "Hill Auditorium")
+
+
+def _corpus(count: int, days: int, variants: int, seed: int = 11) -> list[dict]:
+    rng = random.Random(seed)
+    # Speaker names and topics make titles mostly distinct, as in real listings.
+    names = ["".join(rng.choice("bcdfghjklmnprstvz") + rng.choice("aeiou") for _ in range(3)) for _ in range(5000)]
+    events = []
+    for idx in range(count):
+        words = f"{rng.choice(names)} on {' '.join(rng.sample(TOPICS, 2))}".title()
+        events.append(
+            {
+                "uid": f"e{idx}",
+                "title": f"{rng.choice(KINDS)}: {words}",
+                "location": rng.choice(VENUES),
+                "start_local": f"2030-03-{1 + idx % days:02d}T{17 + idx % 4}:00",
+            }
+        )
+    for idx in rng.sample(range(count), variants):
+        original = events[idx]
+        kind, words = original["title"].split(": ", 1)
+        events.append(
+            {
+                "uid": f"v{idx}",
+                "title": f"{words} ({kind})",
+                "location": f"{original['location']}, Ann Arbor",
+                "start_local": original["start_local"],
+            }
+        )
+    return events
+
+
+def _templated(count: int, seed: int = 13) -> list[dict]:
+    rng = random.Random(seed)
+    rooms = ("Room 1", "Room 1 (Dana)", "Dana Room 1")
+    return [
+        {
+            "uid": f"t{idx}",
+            "title": rng.choice(("Office hours with Prof. Smith", "Office Hours w/ Prof Smith", "Prof. Smith office hours")),
+            "location": rng.choice(rooms),
+            "start_local": f"2030-03-04T{9 + idx % 9:02d}:00",
+        }
+        for idx in range(count)
+    ]
+
+
+def _pairwise(events: list[dict], threshold: float) -> tuple[int, int]:
+    by_day: defaultdict[str, list[frozenset[int]]] = defaultdict(list)
+    for event in events:
+        by_day[event["start_local"][:10]].append(shingles(event))
+    pairs = matches = 0
+    for sets in by_day.values():
+        for pos, left in enumerate(sets):
+            for right in sets[pos + 1 :]:
+                pairs += 1
+                matches += jaccard(left, right) >= threshold
+    return pairs, matches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=45)
+    parser.add_argument("--variants", type=int, default=2_000)
+    parser.add_argument("--pairwise-days", type=int, default=2)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--templated", type=int, nargs="*", default=[1000, 5000, 20000])
+    args = parser.parse_args()
+
+    events = _corpus(args.events, args.days, args.variants)
+    print(f"{len(events)} events over {args.days} days, {args.variants} re-listed variants")
+
+    started = time.perf_counter()
+    clusters = find_near_duplicates(events, threshold=args.threshold)
+    elapsed = time.perf_counter() - started
+    merged = sum(len(cluster.members) for cluster in clusters)
+    print(f"     lsh: {elapsed:8.2f} s, {len(clusters)} clusters, {merged} merged")
+
+    sample_days = {f"2030-03-{day + 1:02d}" for day in range(args.pairwise_days)}
+    sample = [event for event in events if event["start_local"][:10] in sample_days]
+    started = time.perf_counter()
+    pairs, _ = _pairwise(sample, args.threshold)
+    elapsed = (time.perf_counter() - started) * args.days / args.pairwise_days
+    print(f"pairwise: {elapsed:8.2f} s (extrapolated from {args.pairwise_days} days, {pairs} pairs)")
+
+    for count in args.templated:
+        events = _templated(count)
+        started = time.perf_counter()
+        clusters = find_near_duplicates(events, threshold=args.threshold)
+        elapsed = time.perf_counter() - started
+        merged = sum(len(cluster.members) for cluster in clusters)
+        print(f"templated: {count:>6} copies of one listing in {elapsed:6.2f} s, {len(clusters)} clusters, {merged} merged")
+
+
+if __name__ == "__main__":
+    main()
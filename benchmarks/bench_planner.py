@@ -0,0 +1,112 @@
+"""Compare the greedy and optimal portfolio planners on objective and solve time.
+
+Candidates are synthetic evening events over a 45-day horizon (the
+``run_all`` default), scored in [-0.1, 1.2], with categories from the
+shipped category map and a mix of free and paid tickets. They are planned
+against ``src/scoring_config.json`` and ``src/preferences.yaml``. The
+shipped quota keys (``career_tech_min`` …) do not name mapped goals and
+would never count, so quotas keyed by the mapped goals are used instead.
+
+Both portfolios are rated with :func:`plan.optimal.portfolio_objective`.
+Greedy ignores the weekly spend cap, so the number of weeks where it
+overspends is reported as well.
+
+Usage::
+
+    python benchmarks/bench_planner.py
+    python benchmarks/bench_planner.py --sizes 600 6000 --time-budget 5 --quota-mode hard
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import yaml
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT / "src"))
+
+from plan.choose import choose_portfolio, event_window  # noqa: E402
+from plan.optimal import event_cost, portfolio_objective, weekly_spend_cap  # noqa: E402
+from util.timez import week_key  # noqa: E402
+
+QUOTAS = {
+    "weekly": {"career_learning": 2, "social_connection": 2, "wellbeing_fitness": 1},
+    "monthly": {"outdoors_nature": 2},
+}
+CATEGORIES = ["Lecture", "Tech", "Arts", "Music", "Wellness", "Outdoors", "Community", "Film"]
+COSTS = ["", "Free", "Free", "$10", "$25", "$40", "$75"]
+
+
+def _candidates(count: int, seed: int = 8) -> list[dict]:
+    rng = random.Random(seed)
+    base = datetime(2030, 5, 6)
+    events = []
+    for idx in range(count):
+        day = base + timedelta(days=rng.randrange(45))
+        hour = rng.randrange(11, 20) if day.weekday() >= 5 else rng.randrange(17, 21)
+        start = day.replace(hour=hour, minute=rng.choice([0, 30]))
+        end = start + timedelta(minutes=rng.choice([60, 90, 120, 180]))
+        events.append(
+            {
+                "uid": f"e{idx}",
+                "start_local": start.isoformat(timespec="minutes"),
+                "end_local": end.isoformat(timespec="minutes"),
+                "score": round(rng.uniform(-0.1, 1.2), 3),
+                "category": rng.choice(CATEGORIES),
+                "cost": rng.choice(COSTS),
+            }
+        )
+    return events
+
+
+def _overspent_weeks(selected: list[dict], cap: float | None) -> int:
+    if cap is None:
+        return 0
+    spend: defaultdict[tuple[int, int], float] = defaultdict(float)
+    for event in selected:
+        spend[week_key(event_window(event)[0])] += event_cost(event)
+    return sum(1 for total in spend.values() if total > cap)
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    argparser.add_argument("--sizes", type=int, nargs="+", default=[600, 6000])
+    argparser.add_argument("--time-budget", type=float, default=2.0)
+    argparser.add_argument("--quota-mode", choices=["soft", "hard"], default="soft")
+    args = argparser.parse_args()
+
+    config = json.loads((ROOT / "src" / "scoring_config.json").read_text())
+    preferences = yaml.safe_load((ROOT / "src" / "preferences.yaml").read_text())
+    preferences["quotas"] = QUOTAS
+    cap = weekly_spend_cap(config, preferences)
+
+    for size in args.sizes:
+        events = _candidates(size)
+        started = time.perf_counter()
+        greedy = choose_portfolio(events, config, preferences)
+        greedy_seconds = time.perf_counter() - started
+        optimal = choose_portfolio(
+            events, config, preferences, planner="optimal", time_budget=args.time_budget, quota_mode=args.quota_mode
+        )
+        planner = optimal["summary"]["planner"]
+        greedy_objective = portfolio_objective(greedy["selected"], config, preferences, quota_mode=args.quota_mode)
+        optimal_objective = planner["objective"]
+        gain = (optimal_objective - greedy_objective) / abs(greedy_objective) if greedy_objective else 0.0
+        weeks = len(planner["weeks_optimal"]) + len(planner["weeks_timed_out"])
+        print(
+            f"{size:>6} candidates: greedy {greedy_objective:9.3f} ({greedy_seconds:5.2f} s,"
+            f" {_overspent_weeks(greedy['selected'], cap)} weeks over budget)"
+            f" | optimal {optimal_objective:9.3f} ({planner['solve_seconds']:5.2f} s,"
+            f" {len(planner['weeks_optimal'])}/{weeks} weeks proven) | gain {gain:+.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Time ``dedupe_events`` against a large registry: legacy JSON vs. SQLite store.
+
+Builds a registry of ``--registry-size`` UIDs, then dedupes ``--incoming``
+events of which ``--overlap`` (a fraction) are already registered.
+
+* ``json``   — the previous load-everything / rewrite-everything registry.
+* ``sqlite`` — ``util.dedupe.dedupe_events`` over ``util.registry_store``.
+
+Peak Python memory is measured with ``tracemalloc`` on the timed pass, so
+both timings include its overhead.
+
+Usage::
+
+    python benchmarks/bench_registry.py --registry-size 1000000 --incoming 100000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from util.dedupe import dedupe_events  # noqa: E402
+from util.registry_store import RegistryStore, registry_db_path  # noqa: E402
+from util.timez import DEFAULT_TIMEZONE  # noqa: E402
+
+
+def _legacy_dedupe(events: list[dict], path: Path) -> int:
+    registry = json.loads(path.read_text())
+    unique: dict[str, dict] = {}
+    for event in events:
+        uid = event["uid"]
+        if uid in unique or uid in registry:
+            continue
+        unique[uid] = event
+        registry[uid] = {"first_seen": event.get("start_local")}
+    path.write_text(json.dumps(registry, indent=2, sort_keys=True))
+    return len(unique)
+
+
+def _measure(label: str, run) -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = run()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:>6}: {elapsed:7.2f} s, peak {peak / 2**20:7.1f} MiB, {count} new")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--registry-size", type=int, default=1_000_000)
+    parser.add_argument("--incoming", type=int, default=100_000)
+    parser.add_argument("--overlap", type=float, default=0.5)
+    args = parser.parse_args()
+
+    today = datetime.now(DEFAULT_TIMEZONE)
+
+    def first_seen(idx: int) -> str:
+        return (today + timedelta(minutes=idx % 40_000)).strftime("%Y-%m-%dT%H:%M")
+
+    registered = args.registry_size
+    overlap = int(args.incoming * args.overlap)
+    events = [
+        {"uid": f"event-{idx}", "title": f"Event {idx}", "start_local": first_seen(idx), "location": f"Venue {idx}"}
+        for idx in range(registered - overlap, registered - overlap + args.incoming)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = Path(tmp) / "legacy" / "registry.json"
+        legacy.parent.mkdir()
+        legacy.write_text(json.dumps({f"event-{idx}": {"first_seen": first_seen(idx)} for idx in range(registered)}))
+        store_json = Path(tmp) / "registry.json"
+        store = RegistryStore(registry_db_path(store_json))
+        store.add((f"event-{idx}", first_seen(idx)) for idx in range(registered))
+        store.close()
+        print(f"{registered} registered UIDs, {args.incoming} incoming ({overlap} already seen)")
+
+        _measure("json", lambda: _legacy_dedupe([dict(event) for event in events], legacy))
+        _measure("sqlite", lambda: len(dedupe_events([dict(event) for event in events], store_json)[0]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Time event scoring: ``score_event`` per event vs. a compiled ``ScoringModel``.
+
+Events are synthetic listings with ~500 characters of notes, scored against
+the checked-in ``src/scoring_config.json`` and ``src/preferences.yaml``.
+
+* ``score_event`` — rebuilds weights, keywords and windows for every event.
+* ``model``       — :class:`plan.score.ScoringModel` compiled once (compile time included).
+
+Usage::
+
+    python benchmarks/bench_scoring.py --events 20000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT / "src"))
+
+from plan.score import ScoringModel, score_event  # noqa: E402
+
+WORDS = (
+    "climate energy lecture workshop community music jazz running yoga brunch networking "
+    "startup policy science panel film art gallery family kids outdoor hike garden"
+).split()
+CATEGORIES = ["lecture", "music", "sports", "community", "art", None]
+
+
+def _events(count: int, seed: int = 11) -> list[dict]:
+    rng = random.Random(seed)
+    events = []
+    for idx in range(count):
+        events.append(
+            {
+                "uid": f"e{idx}",
+                "title": " ".join(rng.choices(WORDS, k=5)).title(),
+                "notes": " ".join(rng.choices(WORDS, k=70)),
+                "category": rng.choice(CATEGORIES),
+                "org": "Org " + rng.choice(WORDS),
+                "url": f"https://example.test/{idx}",
+                "start_local": f"2030-05-{1 + idx % 28:02d}T{17 + idx % 6}:{rng.choice(['00', '30'])}",
+                "cost": rng.choice(["", "Free", "$10"]),
+                "source": rng.choice(["a2gov", "umich", "aadl"]),
+                "travel_minutes": rng.choice([None, 15, 40, 60]),
+            }
+        )
+    return events
+
+
+def _time(run, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    argparser.add_argument("--events", type=int, default=20_000)
+    argparser.add_argument("--rounds", type=int, default=3)
+    args = argparser.parse_args()
+
+    config = json.loads((ROOT / "src" / "scoring_config.json").read_text())
+    preferences = yaml.safe_load((ROOT / "src" / "preferences.yaml").read_text())
+    events = _events(args.events)
+
+    model = ScoringModel(config, preferences)
+    same = [model.score(event) for event in events] == [score_event(event, config, preferences) for event in events]
+    print(f"{len(events)} events, {len(model.patterns)} distinct keywords; scores {'identical' if same else 'DIFFER'}")
+
+    baseline = _time(lambda: [score_event(event, config, preferences) for event in events], args.rounds)
+    compiled = _time(lambda: list(map(ScoringModel(config, preferences).score, events)), args.rounds)
+    for label, seconds in (("score_event", baseline), ("model", compiled)):
+        per = seconds / len(events) * 1e6
+        print(f"{label:>11}: {seconds * 1000:8.1f} ms ({per:6.2f} µs/event, {baseline / seconds:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
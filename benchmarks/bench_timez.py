@@ -0,0 +1,114 @@
+"""Time ``parse_datetime``: dateutil for everything vs. the tiered parser.
+
+The corpus mimics the date strings scrapers hand over: JSON-LD ISO
+timestamps, HTML listing text ("Friday, May 3, 2030 7:30 PM"), US
+``5/3/2030`` dates and a tail of free-form text only dateutil understands.
+Point ``--corpus`` at a text file with one scraped string per line to use
+real data instead.
+
+* ``dateutil`` — the previous ``parser.parse`` + ``ensure_timezone``.
+* ``cold``     — tiered parser with the memo cleared before each round.
+* ``warm``     — tiered parser with the memo already populated.
+
+Usage::
+
+    python benchmarks/bench_timez.py --strings 20000
+    python benchmarks/bench_timez.py --corpus dates.txt
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from dateutil import parser
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from util import timez  # noqa: E402
+from util.timez import ensure_timezone, parse_datetime  # noqa: E402
+
+
+def _synthetic(count: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    base = datetime(2030, 1, 1, 9, 0)
+    values = []
+    for _ in range(count):
+        dt = base + timedelta(days=rng.randrange(60), minutes=30 * rng.randrange(24))
+        hour12 = dt.hour % 12 or 12
+        ampm = "PM" if dt.hour >= 12 else "AM"
+        style = rng.random()
+        if style < 0.45:
+            values.append(dt.strftime("%Y-%m-%dT%H:%M:%S") + rng.choice(["", "-04:00", "-05:00", "Z"]))
+        elif style < 0.75:
+            values.append(f"{dt:%A, %B} {dt.day}, {dt.year} {hour12}:{dt:%M} {ampm}")
+        elif style < 0.9:
+            values.append(f"{dt.month}/{dt.day}/{dt.year} {hour12}:{dt:%M} {ampm}")
+        else:
+            values.append(f"{dt.day} {dt:%b} {dt.year}, doors {hour12}{ampm.lower()}")
+    return values
+
+
+def _dateutil(values: list[str]) -> list[datetime | None]:
+    out = []
+    for value in values:
+        try:
+            out.append(ensure_timezone(parser.parse(value)))
+        except (ValueError, OverflowError):
+            out.append(None)
+    return out
+
+
+def _tiered(values: list[str]) -> list[datetime | None]:
+    out = []
+    for value in values:
+        try:
+            out.append(parse_datetime(value))
+        except (ValueError, OverflowError):
+            out.append(None)
+    return out
+
+
+def _time(run, rounds: int, before=None) -> float:
+    samples = []
+    for _ in range(rounds):
+        if before:
+            before()
+        started = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    argparser.add_argument("--corpus", type=Path)
+    argparser.add_argument("--strings", type=int, default=20_000)
+    argparser.add_argument("--rounds", type=int, default=5)
+    args = argparser.parse_args()
+
+    if args.corpus:
+        values = [line.strip() for line in args.corpus.read_text().splitlines() if line.strip()]
+    else:
+        values = _synthetic(args.strings)
+    print(f"{len(values)} strings, {len(set(values))} distinct")
+
+    timez._parse_memo.cache_clear()
+    same = _dateutil(values) == _tiered(values)
+    print(f"results {'identical' if same else 'DIFFER'}")
+
+    clear = timez._parse_memo.cache_clear
+    baseline = _time(lambda: _dateutil(values), args.rounds)
+    cold = _time(lambda: _tiered(values), args.rounds, before=clear)
+    warm = _time(lambda: _tiered(values), args.rounds)
+    for label, seconds in (("dateutil", baseline), ("cold", cold), ("warm", warm)):
+        per = seconds / len(values) * 1e6
+        print(f"{label:>8}: {seconds * 1000:8.1f} ms ({per:6.2f} µs/string, {baseline / seconds:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
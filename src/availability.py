@@ -1,18 +1,28 @@
 """Availability parsing and summarisation utilities."""
 from __future__ import annotations
 
-from collections import defaultdict
+import hashlib
 from datetime import date, datetime, timedelta
 from pathlib import Path
 from typing import Dict, Iterable, List, Tuple
 
 from icalendar import Calendar
 
-from preferences import load_preferences
+from preferences import evening_windows_from_preferences, load_preferences
+from util import http_cache
+from util.artifacts import write_artifact
+from util.calendar_snapshot import SNAPSHOT_SLACK_DAYS, entries_in_window, read_snapshot, snapshot_path, write_snapshot
+from util.freebusy import FreeBusy
+from util.ics_stream import iter_occurrences
+from util.time_windows import MINUTES_PER_DAY, TimeWindows
 from util.timez import DEFAULT_TIMEZONE, ensure_timezone
 
 
-def _iter_events(cal: Calendar) -> Iterable[Tuple[datetime, datetime, str]]:
+def _transparent(component) -> bool:
+    return str(component.get("transp", "")).upper() == "TRANSPARENT"
+
+
+def _iter_events(cal: Calendar) -> Iterable[Tuple[datetime, datetime, str, bool]]:
     for component in cal.walk():
         if component.name != "VEVENT":
             continue
@@ -24,9 +34,11 @@ def _iter_events(cal: Calendar) -> Iterable[Tuple[datetime, datetime, str]]:
         start = _to_datetime(dtstart.dt)
         if dtend is not None:
             end = _to_datetime(dtend.dt)
+        elif not isinstance(dtstart.dt, datetime):
+            end = start + timedelta(days=1)
         else:
             end = start + timedelta(hours=1)
-        yield start, end, str(summary)
+        yield start, end, str(summary), _transparent(component)
 
 
 def _to_datetime(value: datetime | date) -> datetime:
@@ -35,13 +47,63 @@ def _to_datetime(value: datetime | date) -> datetime:
     return ensure_timezone(datetime.combine(value, datetime.min.time()))
 
 
-def load_calendar_events(path: Path) -> List[Dict[str, datetime]]:
+def _window_entries(content: bytes, first: date, last: date) -> List[Dict]:
+    """Entries touching ``[first, last]``, with recurring series expanded."""
+
+    window_start = datetime.combine(first, datetime.min.time(), DEFAULT_TIMEZONE)
+    window_end = datetime.combine(last + timedelta(days=1), datetime.min.time(), DEFAULT_TIMEZONE)
+    entries: List[Dict] = []
+    for occurrence in iter_occurrences(content, window_start, window_end):
+        component = occurrence.component
+        if str(component.get("status", "")).upper() == "CANCELLED":
+            continue
+        start, end = occurrence.start, occurrence.end
+        if end <= start:
+            end = start + (timedelta(days=1) if occurrence.all_day else timedelta(hours=1))
+        entries.append(
+            {"start": start, "end": end, "summary": str(component.get("summary", "")), "transparent": _transparent(component)}
+        )
+    entries.sort(key=lambda entry: entry["start"])
+    return entries
+
+
+def load_calendar_events(
+    path: Path,
+    *,
+    horizon_days: int | None = None,
+    today: date | None = None,
+    snapshot_dir: Path | None = None,
+) -> List[Dict[str, datetime]]:
+    """Busy entries (``start``, ``end``, ``summary``, ``transparent``) from an exported calendar.
+
+    With ``horizon_days`` only the planning window (a day either side of
+    ``today`` … ``today + horizon_days``) is read: recurring series are
+    expanded inside it, honouring EXDATE and RECURRENCE-ID overrides, and
+    a window ``SNAPSHOT_SLACK_DAYS`` wider is snapshotted in ``snapshot_dir``
+    (the HTTP cache directory by default), so later runs reuse it while the
+    export is unchanged and their window still fits. Without it the
+    whole file is parsed and recurrences are not expanded.
+    """
+
     if not path.exists():
         return []
+    if horizon_days is not None:
+        today = today or datetime.now(DEFAULT_TIMEZONE).date()
+        first, last = today - timedelta(days=1), today + timedelta(days=horizon_days + 1)
+        snapshot = snapshot_path(snapshot_dir or http_cache.CACHE_DIR, path)
+        entries = read_snapshot(snapshot, path, first, last)
+        if entries is None:
+            content = path.read_bytes()
+            stored_last = last + timedelta(days=SNAPSHOT_SLACK_DAYS)
+            entries = _window_entries(content, first, stored_last)
+            write_snapshot(snapshot, path, first, stored_last, entries, digest=hashlib.sha256(content).digest())
+            entries = entries_in_window(entries, first, last)
+        return entries
+
     cal = Calendar.from_ical(path.read_bytes())
     events: List[Dict[str, datetime]] = []
-    for start, end, summary in _iter_events(cal):
-        events.append({"start": start, "end": end, "summary": summary})
+    for start, end, summary, transparent in _iter_events(cal):
+        events.append({"start": start, "end": end, "summary": summary, "transparent": transparent})
     return events
 
 
@@ -50,31 +112,42 @@ def summarise_evenings(
     *,
     preferences: Dict,
     horizon_days: int,
+    windows: TimeWindows | None = None,
+    freebusy: FreeBusy | None = None,
 ) -> Dict[str, Dict[str, str]]:
-    today = datetime.now(DEFAULT_TIMEZONE).date()
-    windows = _evening_windows(preferences)
+    """Free/busy status of each evening window over the horizon.
 
-    by_day: Dict[date, List[Tuple[datetime, datetime, str]]] = defaultdict(list)
-    for entry in events:
-        start = entry["start"]
-        end = entry["end"]
-        if start.date() < today or start.date() > today + timedelta(days=horizon_days):
-            continue
-        by_day[start.date()].append((start, end, entry.get("summary", "")))
+    Entries marked ``TRANSP:TRANSPARENT`` never make an evening busy. Pass
+    ``freebusy`` to reuse a map already built from ``events``.
+    """
+
+    today = datetime.now(DEFAULT_TIMEZONE).date()
+    if windows is None:
+        windows = TimeWindows(evenings=evening_windows_from_preferences(preferences))
+    horizon_start = datetime.combine(today, datetime.min.time(), tzinfo=DEFAULT_TIMEZONE)
+    horizon_end = horizon_start + timedelta(days=horizon_days + 2)
+    busy = [
+        entry
+        for entry in events
+        if not entry.get("transparent") and entry["start"] < horizon_end and entry["end"] > horizon_start
+    ]
+    if freebusy is None:
+        freebusy = FreeBusy.from_calendar_events(busy)
 
     summary: Dict[str, Dict[str, str]] = {}
     for offset in range(horizon_days + 1):
         current = today + timedelta(days=offset)
-        window = windows.get(current.weekday())
-        if not window:
+        window = windows.evenings.get(current.weekday())
+        if window is None:
             continue
         window_start, window_end = window
-        free = True
+        if window_end <= window_start:
+            window_end += MINUTES_PER_DAY
+        start, end = freebusy.at(current, window_start), freebusy.at(current, window_end)
+        free = freebusy.is_free(start, end)
         notes: List[str] = []
-        for start, end, title in by_day.get(current, []):
-            if _overlaps_window(start, end, window_start, window_end):
-                free = False
-                notes.append(title or "Busy")
+        if not free:
+            notes = [entry.get("summary") or "Busy" for entry in busy if entry["start"] < end and entry["end"] > start]
         summary[current.isoformat()] = {
             "status": "free" if free else "busy",
             "notes": "; ".join(notes) if notes else "",
@@ -82,50 +155,6 @@ def summarise_evenings(
     return summary
 
 
-def _evening_windows(preferences: Dict) -> Dict[int, Tuple[datetime, datetime]]:
-    result: Dict[int, Tuple[datetime, datetime]] = {}
-    evenings = preferences.get("time_windows", {}).get("evenings", {})
-    weekday_window = evenings.get("weekdays")
-    if isinstance(weekday_window, (list, tuple)) and len(weekday_window) == 2:
-        start = _parse_time(weekday_window[0])
-        end = _parse_time(weekday_window[1])
-        for idx in range(0, 5):
-            result[idx] = (start, end)
-    for key in ("saturday", "sunday"):
-        value = evenings.get(key)
-        if isinstance(value, (list, tuple)) and len(value) == 2:
-            result[_weekday_index(key)] = (_parse_time(value[0]), _parse_time(value[1]))
-    return result
-
-
-def _parse_time(label: str) -> datetime:
-    hour, minute = map(int, label.split(":"))
-    return ensure_timezone(datetime.now(DEFAULT_TIMEZONE).replace(hour=hour, minute=minute, second=0, microsecond=0))
-
-
-def _weekday_index(name: str) -> int:
-    mapping = {
-        "monday": 0,
-        "tuesday": 1,
-        "wednesday": 2,
-        "thursday": 3,
-        "friday": 4,
-        "saturday": 5,
-        "sunday": 6,
-    }
-    return mapping[name.lower()]
-
-
-def _overlaps_window(start: datetime, end: datetime, w_start: datetime, w_end: datetime) -> bool:
-    start_minutes = start.hour * 60 + start.minute
-    end_minutes = end.hour * 60 + end.minute
-    w_start_minutes = w_start.hour * 60 + w_start.minute
-    w_end_minutes = w_end.hour * 60 + w_end.minute
-    if w_start_minutes <= w_end_minutes:
-        return not (end_minutes <= w_start_minutes or start_minutes >= w_end_minutes)
-    return start_minutes >= w_start_minutes or end_minutes <= w_end_minutes
-
-
 def write_availability_markdown(path: Path, summary: Dict[str, Dict[str, str]]) -> None:
     lines = ["# Evening Availability Snapshot", ""]
     for day, payload in sorted(summary.items()):
@@ -135,8 +164,7 @@ def write_availability_markdown(path: Path, summary: Dict[str, Dict[str, str]])
         if notes:
             line += f" — {notes}"
         lines.append(line)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text("\n".join(lines) + "\n")
+    write_artifact(path, "\n".join(lines) + "\n")
 
 
 __all__ = [
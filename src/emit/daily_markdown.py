@@ -6,6 +6,7 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, Iterable, List
 
+from util.artifacts import write_artifact
 from util.timez import DEFAULT_TIMEZONE
 
 
@@ -71,7 +72,7 @@ def write_daily_markdowns(
             lines.append("No events returned for this day. Consider sourcing new options or adjusting preferences.")
         lines.append("")
 
-        path.write_text("\n".join(lines))
+        write_artifact(path, "\n".join(lines))
 
         daily_summaries.append(
             {
@@ -150,8 +151,7 @@ def write_changes_summary(path: Path, daily_summaries: List[dict]) -> None:
     if len(lines) == 2:
         lines.append("All days have primary suggestions aligned with current availability.")
     lines.append("")
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text("\n".join(lines))
+    write_artifact(path, "\n".join(lines))
 
 
 __all__ = ["write_daily_markdowns", "write_changes_summary"]
@@ -1,24 +1,63 @@
-"""ICS writing helpers."""
+"""ICS writing helpers.
+
+One run writes the same events into several calendars: each source's batch
+ICS, the merged feed, ``winners.ics`` and its rollback twin. Each VEVENT is
+rendered once, the first time an event is written, and cached as bytes
+under its UID and a hash of the exported fields. Every later calendar file
+is then the header, the cached bodies and the footer, streamed straight to
+disk without building a ``Calendar`` in memory. Files whose events are
+unchanged apart from ``DTSTAMP`` are not rewritten.
+
+A cached body leaves out the properties that differ between outputs:
+``STATUS`` (the rollback file's ``CANCELLED``) or the all-day ``TRANSP``
+line is spliced in per write. icalendar sorts non-canonical properties by
+name, so the line goes before ``URL``, where the per-file ``Calendar``
+rebuild put it; files keep the same layout.
+
+The cache lives for one process. ``run_all`` clears it at the start of a
+run with :func:`clear_vevent_cache`.
+"""
 from __future__ import annotations
 
+import hashlib
+import json
+import re
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator
 
 from icalendar import Calendar, Event
 
+from util.artifacts import write_artifact
 from util.timez import DEFAULT_TIMEZONE, ensure_timezone
 from util.uid import generate_uid
 
+# Event fields that end up in the VEVENT; a change to any of them re-renders it.
+RENDERED_FIELDS = ("uid", "title", "start_local", "end_local", "location", "url", "notes")
+END_VEVENT = b"END:VEVENT\r\n"
+END_VCALENDAR = b"END:VCALENDAR\r\n"
+TRANSPARENT = b"TRANSP:TRANSPARENT\r\n"
+# DTSTAMP is the render time, so it differs every run even when nothing else does.
+DTSTAMP_LINE = re.compile(rb"^DTSTAMP:[^\r\n]*\r?\n", re.MULTILINE)
+# The only rendered property icalendar sorts after STATUS and TRANSP; overrides go before it.
+AFTER_OVERRIDES = re.compile(rb"^URL[:;]", re.MULTILINE)
 
-def _event_component(event: dict, *, cancelled: bool = False) -> Event:
-    component = Event()
-    uid = event.get("uid") or generate_uid(
+_bodies: dict[tuple[str, str], tuple[bytes, bytes]] = {}
+_lock = threading.Lock()
+
+
+def _event_uid(event: dict) -> str:
+    return event.get("uid") or generate_uid(
         event.get("title"),
         event.get("start_local"),
         event.get("url") or event.get("location"),
     )
-    component.add("uid", uid)
+
+
+def _event_component(event: dict) -> Event:
+    component = Event()
+    component.add("uid", _event_uid(event))
     component.add("summary", event.get("title", "Untitled Event"))
     start_value = event.get("start_local")
     if not start_value:
@@ -38,19 +77,61 @@ def _event_component(event: dict, *, cancelled: bool = False) -> Event:
         component.add("url", url)
     if description := event.get("notes"):
         component.add("description", description)
-    if cancelled:
-        component.add("status", "CANCELLED")
-    elif event.get("all_day"):
-        component.add("transp", "TRANSPARENT")
     return component
 
 
-def write_ics(events: Iterable[dict], path: Path, *, calendar_name: str = "Spiceflow Social", cancelled: bool = False) -> None:
+def _content_key(event: dict) -> tuple[str, str]:
+    payload = json.dumps([event.get(field) for field in RENDERED_FIELDS], default=str, ensure_ascii=False)
+    return _event_uid(event), hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def render_vevent(event: dict, *, status: str | None = None) -> bytes:
+    """The event's VEVENT bytes, rendered once per UID and content.
+
+    ``status`` (e.g. ``"CANCELLED"``) is added as an override; events with
+    a status are never marked transparent.
+    """
+
+    key = _content_key(event)
+    parts = _bodies.get(key)
+    if parts is None:
+        body = _event_component(event).to_ical()[: -len(END_VEVENT)]
+        match = AFTER_OVERRIDES.search(body)
+        split = match.start() if match else len(body)
+        parts = (body[:split], body[split:] + END_VEVENT)
+        with _lock:
+            _bodies[key] = parts
+    head, tail = parts
+    if status:
+        return head + b"STATUS:" + status.encode("ascii") + b"\r\n" + tail
+    if event.get("all_day"):
+        return head + TRANSPARENT + tail
+    return head + tail
+
+
+def clear_vevent_cache() -> None:
+    with _lock:
+        _bodies.clear()
+
+
+def iter_ics(events: Iterable[dict], *, calendar_name: str = "Spiceflow Social", status: str | None = None) -> Iterator[bytes]:
+    """A calendar file as byte chunks: header, one VEVENT per event, footer."""
+
     calendar = Calendar()
     calendar.add("prodid", "-//Spiceflow Social//EN")
     calendar.add("version", "2.0")
     calendar.add("X-WR-CALNAME", calendar_name)
+    yield calendar.to_ical()[: -len(END_VCALENDAR)]
     for event in events:
-        calendar.add_component(_event_component(event, cancelled=cancelled))
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_bytes(calendar.to_ical())
+        yield render_vevent(event, status=status)
+    yield END_VCALENDAR
+
+
+def write_ics(events: Iterable[dict], path: Path, *, calendar_name: str = "Spiceflow Social", cancelled: bool = False) -> None:
+    """Stream ``events`` to ``path``; ``cancelled`` marks every VEVENT ``STATUS:CANCELLED`` (rollback files).
+
+    The file is left untouched when only DTSTAMPs would change.
+    """
+
+    chunks = iter_ics(events, calendar_name=calendar_name, status="CANCELLED" if cancelled else None)
+    write_artifact(path, chunks, volatile=DTSTAMP_LINE)
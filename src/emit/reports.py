@@ -5,6 +5,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Iterable, List, Optional, Dict
 
+from util.artifacts import write_artifact
 from util.timez import DEFAULT_TIMEZONE
 
 
@@ -17,6 +18,10 @@ def write_run_report(
     portfolio_summary: Optional[dict] = None,
     research_summaries: Optional[List[dict]] = None,
     availability_summary: Optional[Dict[str, Dict[str, str]]] = None,
+    cache_stats: Optional[Dict[str, int]] = None,
+    parse_stats: Optional[Dict[str, Dict[str, int]]] = None,
+    score_stats: Optional[Dict[str, int]] = None,
+    artifact_stats: Optional[Dict[str, int]] = None,
 ) -> None:
     now = datetime.now(DEFAULT_TIMEZONE)
     lines = [
@@ -36,6 +41,22 @@ def write_run_report(
             f"- Selected events: {portfolio_summary.get('total_selected', 0)}",
             f"- Weeks scheduled: {portfolio_summary.get('weeks_scheduled', 0)}",
         ])
+        planner = portfolio_summary.get("planner")
+        if planner:
+            lines.append(
+                f"- Planner: {planner.get('mode')} ({planner.get('quota_mode')} quotas), objective {planner.get('objective')},"
+                f" solved in {planner.get('solve_seconds')} s"
+            )
+            if planner.get("weeks_timed_out"):
+                lines.append("  * Time budget hit (best found kept): " + ", ".join(planner["weeks_timed_out"]))
+        replan = portfolio_summary.get("replan")
+        if replan:
+            lines.append(
+                f"- Rolling update: {replan.get('pinned', 0)} picks pinned, {len(replan.get('resolved_days', []))} days"
+                f" re-planned ({len(replan.get('new_days', []))} new), {sum(replan.get('changes', {}).values())} changes"
+            )
+            if replan.get("reverted_days"):
+                lines.append("  * Over change budget, kept previous picks: " + ", ".join(replan["reverted_days"]))
         quota_progress = portfolio_summary.get("quota_progress", {})
         if quota_progress:
             lines.append("- Quota Progress:")
@@ -54,14 +75,58 @@ def write_run_report(
         free_days = [day for day, payload in availability_summary.items() if payload.get("status") == "free"]
         lines.extend(["", "## Availability Overview", f"- Free evenings: {len(free_days)}", f"- Total tracked evenings: {len(availability_summary)}"])
 
+    if cache_stats:
+        lines.extend([
+            "",
+            "## Fetch Cache",
+            f"- Fresh hits: {cache_stats.get('hits', 0)}",
+            f"- Served stale: {cache_stats.get('stale', 0)}",
+            f"- Revalidated (304): {cache_stats.get('revalidated', 0)}",
+            f"- Downloaded: {cache_stats.get('misses', 0)}",
+        ])
+        if cache_stats.get("offline_misses"):
+            lines.append(f"- Offline misses: {cache_stats['offline_misses']}")
+
+    if parse_stats:
+        lines.extend(["", "## Parse Cache"])
+        for scraper, counts in parse_stats.items():
+            hits, misses = counts.get("hits", 0), counts.get("misses", 0)
+            rate = hits / (hits + misses) if hits + misses else 0.0
+            lines.append(f"- {scraper}: {hits} reused, {misses} parsed ({rate:.0%} hit rate)")
+
+    if score_stats:
+        cached, computed = score_stats.get("cached", 0), score_stats.get("computed", 0)
+        lines.extend(["", "## Score Cache", f"- Scores from cache: {cached}", f"- Scores computed: {computed}"])
+
+    if artifact_stats:
+        lines.extend([
+            "",
+            "## Outputs",
+            f"- Unchanged (left as is): {artifact_stats.get('unchanged', 0)}",
+            f"- Changed: {artifact_stats.get('changed', 0)}",
+            f"- New: {artifact_stats.get('created', 0)}",
+        ])
+
     if research_summaries:
         lines.extend(["", "## LLM Research Highlights"])
         for entry in research_summaries:
             lines.append(f"- {entry.get('slug')}: {entry.get('summary', 'n/a')}")
 
+    near_duplicates: Dict[str, List[dict]] = {}
+    for dup in duplicates:
+        if dup.get("duplicate_of"):
+            near_duplicates.setdefault(dup["duplicate_of"], []).append(dup)
+    if near_duplicates:
+        kept_by_uid = {event.get("uid"): event for event in events}
+        lines.extend(["", "## Near-duplicate clusters"])
+        for uid, members in near_duplicates.items():
+            keeper = kept_by_uid.get(uid, {})
+            lines.append(f"- {keeper.get('title', uid)} ({keeper.get('source') or 'unknown'}, {keeper.get('start_local', '')})")
+            for dup in members:
+                lines.append(f"  * {dup.get('title')} ({dup.get('source') or 'unknown'}) — similarity {dup.get('similarity', 0):.2f}")
+
     if duplicates:
         lines.append('\n## Duplicate keys')
         for dup in duplicates:
             lines.append(f"- {dup.get('uid')} — {dup.get('title')}")
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text('\n'.join(lines))
+    write_artifact(path, '\n'.join(lines))
@@ -4,6 +4,8 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Iterable
 
+from util.artifacts import write_artifact
+
 
 def write_research_summary(path: Path, results: Iterable[dict]) -> None:
     lines = ["# Research Summary", ""]
@@ -26,8 +28,7 @@ def write_research_summary(path: Path, results: Iterable[dict]) -> None:
         had_entries = True
     if not had_entries:
         lines.append("No research results captured. Enable --use-llm-research to populate this report.")
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text("\n".join(lines).strip() + "\n")
+    write_artifact(path, "\n".join(lines).strip() + "\n")
 
 
 __all__ = ["write_research_summary"]
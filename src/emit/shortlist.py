@@ -4,6 +4,8 @@ from __future__ import annotations
 from pathlib import Path
 from typing import List
 
+from util.artifacts import write_artifact
+
 
 def write_shortlist_report(path: Path, events: List[dict], *, limit: int = 10) -> None:
     lines = ["# Event Shortlist", ""]
@@ -29,8 +31,7 @@ def write_shortlist_report(path: Path, events: List[dict], *, limit: int = 10) -
             if reason:
                 lines.append(f"- Notes: {reason}")
             lines.append("")
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text("\n".join(lines))
+    write_artifact(path, "\n".join(lines))
 
 
 __all__ = ["write_shortlist_report"]
@@ -4,6 +4,8 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Dict, Iterable
 
+from util.artifacts import write_artifact
+
 
 def write_source_performance_report(
     counts_by_slug: Dict[str, int], skipped_slugs: Iterable[str], output_path: Path
@@ -20,7 +22,6 @@ def write_source_performance_report(
             lines.append(f"- {slug}")
         lines.append("")
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text("\n".join(lines), encoding="utf-8")
+    write_artifact(output_path, "\n".join(lines))
 
 
@@ -6,6 +6,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List
 
+from util.artifacts import write_artifact
 from util.timez import DEFAULT_TIMEZONE
 
 
@@ -156,8 +157,7 @@ def write_weekly_research_markdown(
     ])
 
     # Write the file
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text("\\n".join(lines))
+    write_artifact(output_path, "\\n".join(lines))
 
     print(f"Weekly research markdown written to: {output_path}")
     print(f"- {len(successful_research)} sources with events")
@@ -6,6 +6,7 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from util.artifacts import write_artifact
 from util.timez import DEFAULT_TIMEZONE
 
 def write_weekly_review(
@@ -103,4 +104,4 @@ def write_weekly_review(
     lines.append("- Flag any newly discovered conflicts or cancellations.")
     lines.append("")
 
-    output_path.write_text("\n".join(lines))
\ No newline at end of file
+    write_artifact(output_path, "\n".join(lines))
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""Maintenance commands for Spiceflow Social's on-disk state.
+
+Usage::
+
+    python src/manage.py cache stats
+    python src/manage.py cache gc --max-bytes 256MB
+    python src/manage.py registry stats
+    python src/manage.py registry compact --retention-days 60
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any
+
+from util import http_cache
+from util.blob_store import parse_size
+from util.parse_cache import get_parse_cache, prune_parse_cache
+from util.registry_store import REGISTRY_RETENTION_DAYS, open_registry
+
+
+def _print(payload: dict[str, Any]) -> None:
+    print(json.dumps(payload, indent=2, sort_keys=True))
+
+
+def cache_stats(args: argparse.Namespace) -> None:
+    _print({**http_cache.get_blob_store().stats(), "parsed_entries": len(get_parse_cache())})
+
+
+def cache_gc(args: argparse.Namespace) -> None:
+    max_bytes = parse_size(args.max_bytes) if args.max_bytes else None
+    _print({**http_cache.gc_cache(max_bytes), "parsed_entries_pruned": prune_parse_cache()})
+
+
+def registry_stats(args: argparse.Namespace) -> None:
+    registry = open_registry(args.registry)
+    try:
+        _print(registry.stats())
+    finally:
+        registry.close()
+
+
+def registry_compact(args: argparse.Namespace) -> None:
+    registry = open_registry(args.registry)
+    try:
+        _print(registry.compact(args.retention_days))
+    finally:
+        registry.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Spiceflow Social maintenance commands")
+    groups = parser.add_subparsers(dest="group", required=True)
+
+    cache = groups.add_parser("cache", help="Inspect or shrink the HTTP cache in data/cache")
+    cache_commands = cache.add_subparsers(dest="command", required=True)
+    cache_commands.add_parser("stats", help="Show entry, blob and byte counts").set_defaults(func=cache_stats)
+    gc = cache_commands.add_parser("gc", help="Drop orphaned blobs and evict least recently used ones")
+    gc.add_argument("--max-bytes", help=f"Byte budget (default {http_cache.CACHE_MAX_BYTES}); accepts 512MB, 2g, ...")
+    gc.set_defaults(func=cache_gc)
+
+    registry = groups.add_parser("registry", help="Inspect or prune the dedupe registry")
+    registry.add_argument("--registry", type=Path, default=Path("src/registry.json"), help="Same path as run_all --registry")
+    registry_commands = registry.add_subparsers(dest="command", required=True)
+    registry_commands.add_parser("stats", help="Show entry count, first_seen range and file size").set_defaults(
+        func=registry_stats
+    )
+    compact = registry_commands.add_parser("compact", help="Prune old entries and vacuum the database")
+    compact.add_argument("--retention-days", type=float, default=REGISTRY_RETENTION_DAYS)
+    compact.set_defaults(func=registry_compact)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
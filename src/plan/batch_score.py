@@ -0,0 +1,166 @@
+"""Batch event scoring over a NumPy feature matrix.
+
+Every term :func:`plan.score.score_event` adds is a weight times something
+that depends only on the event: keyword hits per goal, a category match, a
+travel or cost bucket, a novelty-source, late-start or must-see flag. The
+:class:`BatchScorer` extracts those into one row per event once, after
+which scoring the whole pool is a matrix-vector product with a weight
+vector — and trying another weight setting is just another product.
+
+Features depend on what was compiled: the goal keywords, category map and
+``category_weights`` keys, novelty sources, late-start hour and must-see
+keywords. Weight vectors only change the weights, so rebuild the scorer
+when any of those lists change.
+"""
+from __future__ import annotations
+
+from itertools import chain
+from typing import Iterable, Sequence
+
+from plan.score import ScoringModel, _event_goal_keys, _event_text, _starts_late
+from preferences import expand_goal_weights, time_windows_from_config
+from util.time_windows import TimeWindows
+from util.uid import normalize
+
+try:  # Optional: batch scoring is only offered when numpy is installed.
+    import numpy
+except ImportError:  # pragma: no cover - exercised only without the extra
+    numpy = None
+
+TRAVEL_FAR = "travel_far"
+TRAVEL_NEAR = "travel_near"
+COST_FREE = "cost_free"
+COST_PAID = "cost_paid"
+NOVELTY = "novelty"
+LATE_START = "late_start"
+MUST_SEE = "must_see"
+FLAG_COLUMNS = (TRAVEL_FAR, TRAVEL_NEAR, COST_FREE, COST_PAID, NOVELTY, LATE_START, MUST_SEE)
+
+
+class BatchScorer:
+    """Feature extraction plus weight vectors for one config and preferences pair.
+
+    Columns are ``goals.<goal>`` hit counts (keyword matches plus category-map
+    hits), one ``category:<name>`` one-hot per ``category_weights`` key, then
+    :data:`FLAG_COLUMNS`. ``scores(features(events))`` equals ``score_event``
+    for every event: the products sum in a different order, which only
+    moves results in the last bits, and both are rounded to four decimals.
+    """
+
+    def __init__(self, config: dict, preferences: dict, *, windows: TimeWindows | None = None) -> None:
+        if numpy is None:  # pragma: no cover - exercised only without the extra
+            raise ImportError("batch scoring requires numpy")
+        self.config = config
+        self.preferences = preferences
+        self.model = ScoringModel(config, preferences, windows=windows)
+
+        goals = list(self.model.goal_keys)
+        for derived in chain.from_iterable(self.model.category_map.values()):
+            if derived not in goals:
+                goals.append(derived)
+        self.goals = goals
+        self.categories = list(self.model.category_weights)
+        self.columns = [f"goals.{goal}" for goal in goals] + [f"category:{name}" for name in self.categories]
+        self.columns += FLAG_COLUMNS
+
+        self._goal_index = {goal: idx for idx, goal in enumerate(goals)}
+        self._keyword_columns = [self._goal_index[goal] for goal in self.model.goal_keys]
+        offset = len(goals)
+        self._category_index = {name: offset + idx for idx, name in enumerate(self.categories)}
+        self._flag_index = {name: self.columns.index(name) for name in FLAG_COLUMNS}
+
+    def _row(self, event: dict) -> list[float]:
+        model = self.model
+        flags = self._flag_index
+        row = [0.0] * len(self.columns)
+
+        hits = model.goal_matches(normalize(_event_text(event)))
+        for column, count in zip(self._keyword_columns, hits):
+            row[column] += count
+        for derived in _event_goal_keys(event, model.category_map):
+            row[self._goal_index[derived]] += 1
+
+        category = event.get("category")
+        if category and isinstance(category, str):
+            column = self._category_index.get(category.lower())
+            if column is not None:
+                row[column] = 1.0
+
+        travel_minutes = event.get("travel_minutes")
+        if isinstance(travel_minutes, (int, float)):
+            if travel_minutes > 45:
+                row[flags[TRAVEL_FAR]] = 1.0
+            elif travel_minutes <= 30:
+                row[flags[TRAVEL_NEAR]] = 1.0
+
+        cost_text = event.get("cost", "")
+        if cost_text:
+            row[flags[COST_FREE] if "free" in cost_text.lower() else flags[COST_PAID]] = 1.0
+
+        if event.get("source") in model.novelty_sources:
+            row[flags[NOVELTY]] = 1.0
+        if _starts_late(event, model.windows):
+            row[flags[LATE_START]] = 1.0
+        if model.is_must_see(event):
+            row[flags[MUST_SEE]] = 1.0
+        return row
+
+    def features(self, events: Iterable[dict]) -> "numpy.ndarray":
+        """``(len(events), len(columns))`` float64 feature matrix."""
+
+        rows = [self._row(event) for event in events]
+        width = len(self.columns)
+        matrix = numpy.fromiter(chain.from_iterable(rows), dtype=numpy.float64, count=len(rows) * width)
+        return matrix.reshape(len(rows), width)
+
+    def weight_vector(self, config: dict | None = None, preferences: dict | None = None) -> "numpy.ndarray":
+        """Weights for :attr:`columns`, from this scorer's config or another weight setting."""
+
+        config = self.config if config is None else config
+        preferences = self.preferences if preferences is None else preferences
+        weights = expand_goal_weights(config, preferences)
+        category_weights = config.get("category_weights", {})
+        if config is self.config and preferences is self.preferences:
+            late_start_penalty = self.model.windows.late_start_penalty
+        else:
+            late_start_penalty = time_windows_from_config(config, preferences).late_start_penalty
+        travel_penalty = weights.get("travel_time_penalty", -0.1)
+
+        values = [weights.get(f"goals.{goal}", 0.0) for goal in self.goals]
+        values += [category_weights.get(name, 0.0) for name in self.categories]
+        values += [
+            travel_penalty,
+            abs(travel_penalty) * 0.3,
+            config.get("cost_preferences", {}).get("free_bonus", 0.0),
+            weights.get("cost_penalty", 0.0),
+            weights.get("novelty", 0.0),
+            late_start_penalty,
+            weights.get("must_see_bonus", 0.0),
+        ]
+        return numpy.array(values, dtype=numpy.float64)
+
+    def scores(self, features: "numpy.ndarray", weights: "numpy.ndarray | None" = None) -> "numpy.ndarray":
+        """One score per feature row, rounded like ``score_event``."""
+
+        if weights is None:
+            weights = self.weight_vector()
+        return numpy.round(features @ weights, 4)
+
+    def score_many(self, features: "numpy.ndarray", weight_vectors: Sequence["numpy.ndarray"]) -> "numpy.ndarray":
+        """``(events, settings)`` scores for several weight vectors in one product."""
+
+        return numpy.round(features @ numpy.column_stack(weight_vectors), 4)
+
+
+def attach_batch_scores(
+    events: list[dict], config: dict, preferences: dict, *, windows: TimeWindows | None = None
+) -> list[dict]:
+    """:func:`plan.score.attach_scores` computed through a :class:`BatchScorer`."""
+
+    scorer = BatchScorer(config, preferences, windows=windows)
+    for event, score in zip(events, scorer.scores(scorer.features(events)).tolist()):
+        event["score"] = score
+    return events
+
+
+__all__ = ["BatchScorer", "FLAG_COLUMNS", "attach_batch_scores"]
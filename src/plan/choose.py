@@ -4,99 +4,158 @@ from __future__ import annotations
 from collections import defaultdict
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
-
-from preferences import category_goals_map, quiet_windows_from_preferences
-from util.timez import ensure_timezone, in_quiet_hours, week_key
-
-WEEKDAY_INDICES = {
-    "monday": 0,
-    "tuesday": 1,
-    "wednesday": 2,
-    "thursday": 3,
-    "friday": 4,
-    "saturday": 5,
-    "sunday": 6,
-}
-
-
-def _overlaps(existing: list[tuple[datetime, datetime]], start: datetime, end: datetime) -> bool:
-    for other_start, other_end in existing:
-        latest_start = max(start, other_start)
-        earliest_end = min(end, other_end)
-        if latest_start < earliest_end:
-            return True
-    return False
-
-
-def _build_evening_windows(preferences: dict) -> Dict[int, Tuple[str, str]]:
-    windows: Dict[int, Tuple[str, str]] = {}
-    evenings = preferences.get("time_windows", {}).get("evenings", {})
-    weekdays = evenings.get("weekdays")
-    if isinstance(weekdays, (list, tuple)) and len(weekdays) == 2:
-        for day in range(0, 5):
-            windows[day] = (str(weekdays[0]), str(weekdays[1]))
-    for key in ("saturday", "sunday"):
-        value = evenings.get(key)
-        if isinstance(value, (list, tuple)) and len(value) == 2:
-            windows[WEEKDAY_INDICES[key]] = (str(value[0]), str(value[1]))
-    return windows
-
-
-def _within_window(start: datetime, windows: Dict[int, Tuple[str, str]]) -> bool:
-    if not windows:
-        return True
-    day_index = start.weekday()
-    if day_index not in windows:
-        return True
-    start_str, end_str = windows[day_index]
-    start_hour, start_minute = map(int, start_str.split(":"))
-    end_hour, end_minute = map(int, end_str.split(":"))
-    start_minutes = start.hour * 60 + start.minute
-    window_start = start_hour * 60 + start_minute
-    window_end = end_hour * 60 + end_minute
-    if window_start <= window_end:
-        return window_start <= start_minutes <= window_end
-    # Window wraps around midnight.
-    return start_minutes >= window_start or start_minutes <= window_end
-
-
-def choose_portfolio(events: list[dict], config: dict, preferences: dict) -> dict:
+from typing import Iterable
+
+from plan.intervals import IntervalIndex
+from preferences import category_goals_map, time_windows_from_config
+from util.artifacts import write_artifact
+from util.freebusy import FreeBusy
+from util.time_windows import TimeWindows
+from util.timez import ensure_timezone, week_key
+
+PLANNERS = ("greedy", "optimal")
+
+
+def event_window(event: dict) -> tuple[datetime, datetime]:
+    """``(start, end)`` of a candidate; events without an end last 90 minutes."""
+
+    start = ensure_timezone(datetime.fromisoformat(event["start_local"]))
+    end_str = event.get("end_local")
+    end = ensure_timezone(datetime.fromisoformat(end_str)) if end_str else start + timedelta(hours=1, minutes=30)
+    return start, end
+
+
+def event_goals(event: dict, goal_map: dict[str, list[str]]) -> list[str]:
+    """Quota goals an event counts towards: its category's, else the first tag match."""
+
+    mapped_goals = goal_map.get(event.get("category", "").lower(), [])
+    if not mapped_goals and event.get("tags"):
+        tags = event.get("tags")
+        tag_list = tags if isinstance(tags, (list, tuple)) else [tags]
+        for key, goals in goal_map.items():
+            if any(key in str(tag).lower() for tag in tag_list):
+                mapped_goals = goals
+                break
+    return mapped_goals
+
+
+def portfolio_caps(config: dict, preferences: dict) -> dict[str, int]:
     hard_rules = config.get("hard_rules", {})
     prefs_caps = preferences.get("caps", {})
-    evening_windows = _build_evening_windows(preferences)
-    quiet_pairs = quiet_windows_from_preferences(preferences)
-    if not quiet_pairs:
-        quiet_pairs = hard_rules.get("evening_quiet_hours", [])
+    return {
+        "per_week": prefs_caps.get("max_per_week", hard_rules.get("max_events_per_week", 6)),
+        "per_day": prefs_caps.get("max_per_day", 2),
+        "weekend": prefs_caps.get("max_weekend_total", 4),
+    }
+
+
+def quota_progress(
+    preferences: dict,
+    weekly_goal_counts: dict[tuple[int, int], dict[str, int]],
+    monthly_goal_counts: dict[str, int],
+) -> dict:
+    weekly_goal_targets = preferences.get("quotas", {}).get("weekly", {})
+    monthly_goal_targets = preferences.get("quotas", {}).get("monthly", {})
+    return {
+        "weekly": {
+            goal: {
+                "target": weekly_goal_targets.get(goal, 0),
+                "max_count": max((counts.get(goal, 0) for counts in weekly_goal_counts.values()), default=0),
+            }
+            for goal in weekly_goal_targets
+        },
+        "monthly": {
+            goal: {
+                "target": monthly_goal_targets.get(goal, 0),
+                "count": monthly_goal_counts.get(goal, 0),
+            }
+            for goal in monthly_goal_targets
+        },
+    }
 
-    max_events_per_week = prefs_caps.get("max_per_week", hard_rules.get("max_events_per_week", 6))
-    max_events_per_day = prefs_caps.get("max_per_day", 2)
-    max_weekend_total = prefs_caps.get("max_weekend_total", 4)
+
+def choose_portfolio(
+    events: list[dict],
+    config: dict,
+    preferences: dict,
+    *,
+    windows: TimeWindows | None = None,
+    planner: str = "greedy",
+    pinned: Iterable[dict] = (),
+    busy: FreeBusy | None = None,
+    **planner_options,
+) -> dict:
+    """Pick the portfolio with ``planner``: ``"greedy"`` (by score) or ``"optimal"``.
+
+    ``pinned`` events are kept unconditionally and placed first: they use up
+    caps and block overlapping candidates, and candidates sharing their UID
+    are skipped. Candidates that collide with ``busy`` time on the personal
+    calendar are rejected. ``planner_options`` are passed to
+    :func:`plan.optimal.optimal_portfolio`.
+    """
+
+    if windows is None:
+        windows = time_windows_from_config(config, preferences)
+    if planner == "optimal":
+        from plan.optimal import optimal_portfolio
+
+        return optimal_portfolio(
+            events, config, preferences, windows=windows, pinned=pinned, busy=busy, **planner_options
+        )
+    if planner != "greedy":
+        raise ValueError(f"Unknown planner {planner!r}; expected one of {', '.join(PLANNERS)}")
+    if planner_options:
+        raise TypeError(f"The greedy planner takes no options, got {', '.join(sorted(planner_options))}")
+
+    hard_rules = config.get("hard_rules", {})
+    caps = portfolio_caps(config, preferences)
+    max_events_per_week = caps["per_week"]
+    max_events_per_day = caps["per_day"]
+    max_weekend_total = caps["weekend"]
 
     selections: list[dict] = []
     per_week_counts: defaultdict[tuple[int, int], int] = defaultdict(int)
     per_day_counts: defaultdict[str, int] = defaultdict(int)
     weekend_counts: defaultdict[tuple[int, int], int] = defaultdict(int)
-    scheduled_windows: list[tuple[datetime, datetime]] = []
+    scheduled_windows = IntervalIndex()
 
-    weekly_goal_targets = preferences.get("quotas", {}).get("weekly", {})
-    monthly_goal_targets = preferences.get("quotas", {}).get("monthly", {})
     goal_map = category_goals_map(preferences)
     weekly_goal_counts: defaultdict[tuple[int, int], defaultdict[str, int]] = defaultdict(lambda: defaultdict(int))
     monthly_goal_counts: defaultdict[str, int] = defaultdict(int)
 
+    def place(event: dict, start: datetime, end: datetime) -> None:
+        wk = week_key(start)
+        selections.append(event)
+        per_week_counts[wk] += 1
+        per_day_counts[start.date().isoformat()] += 1
+        if start.weekday() >= 5:
+            weekend_counts[wk] += 1
+        scheduled_windows.add(start, end)
+
+        for goal in event_goals(event, goal_map):
+            weekly_goal_counts[wk][goal] += 1
+            monthly_goal_counts[goal] += 1
+
+    pinned = list(pinned)
+    for event in pinned:
+        place(event, *event_window(event))
+    pinned_uids = {event.get("uid") for event in pinned} - {None}
+    if pinned_uids:
+        events = [event for event in events if event.get("uid") not in pinned_uids]
+
     for event in sorted(events, key=lambda e: e.get("score", 0.0), reverse=True):
-        start = ensure_timezone(datetime.fromisoformat(event["start_local"]))
-        end_str = event.get("end_local")
-        end = ensure_timezone(datetime.fromisoformat(end_str)) if end_str else start + timedelta(hours=1, minutes=30)
+        start, end = event_window(event)
 
-        if hard_rules.get("no_overlap") and _overlaps(scheduled_windows, start, end):
+        if hard_rules.get("no_overlap") and scheduled_windows.overlaps(start, end):
             continue
 
-        if quiet_pairs and in_quiet_hours(start, end, quiet_pairs):
+        if busy is not None and not busy.is_free(start, end):
             continue
 
-        if not _within_window(start, evening_windows):
+        if windows.in_quiet_hours(start, end):
+            continue
+
+        if not windows.in_evening_window(start):
             continue
 
         wk = week_key(start)
@@ -108,54 +167,19 @@ def choose_portfolio(events: list[dict], config: dict, preferences: dict) -> dic
         if start.weekday() >= 5 and weekend_counts[wk] >= max_weekend_total:
             continue
 
-        selections.append(event)
-        per_week_counts[wk] += 1
-        per_day_counts[day_key] += 1
-        if start.weekday() >= 5:
-            weekend_counts[wk] += 1
-        scheduled_windows.append((start, end))
-
-        mapped_goals = goal_map.get(event.get("category", "").lower(), [])
-        if not mapped_goals and event.get("tags"):
-            tags = event.get("tags")
-            tag_list = tags if isinstance(tags, (list, tuple)) else [tags]
-            for key, goals in goal_map.items():
-                if any(key in str(tag).lower() for tag in tag_list):
-                    mapped_goals = goals
-                    break
-        for goal in mapped_goals:
-            weekly_goal_counts[wk][goal] += 1
-            monthly_goal_counts[goal] += 1
-
-    quota_progress = {
-        "weekly": {
-            goal: {
-                "target": weekly_goal_targets.get(goal, 0),
-                "max_count": max((counts.get(goal, 0) for counts in weekly_goal_counts.values()), default=0),
-            }
-            for goal in weekly_goal_targets
-        },
-        "monthly": {
-            goal: {
-                "target": monthly_goal_targets.get(goal, 0),
-                "count": monthly_goal_counts.get(goal, 0),
-            }
-            for goal in monthly_goal_targets
-        },
-    }
+        place(event, start, end)
 
     return {
         "selected": selections,
         "summary": {
             "total_selected": len(selections),
             "weeks_scheduled": len({week for week, count in per_week_counts.items() if count}),
-            "quota_progress": quota_progress,
+            "quota_progress": quota_progress(preferences, weekly_goal_counts, monthly_goal_counts),
         },
     }
 
 
 def write_portfolio(portfolio: dict, path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
     import json
 
-    path.write_text(json.dumps(portfolio, indent=2, sort_keys=True))
+    write_artifact(path, json.dumps(portfolio, indent=2, sort_keys=True))
@@ -0,0 +1,70 @@
+"""Interval index for time-conflict checks.
+
+The planner asks one question per candidate — does ``[start, end)`` overlap
+anything already booked? — and used to answer it by scanning every booked
+window. :class:`IntervalIndex` keeps the *union* of the booked intervals
+as sorted, disjoint runs, which is all an overlap test needs: a query
+overlaps some booked interval exactly when it overlaps the union. Queries
+are one binary search; inserts binary-search the runs they touch and merge
+them.
+
+Endpoints only need to be mutually comparable: aware datetimes for
+planner picks and calendar busy blocks, or plain numbers.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from typing import Any, Iterable, Iterator
+
+
+class IntervalIndex:
+    """Union of half-open ``[start, end)`` intervals with O(log n) overlap queries.
+
+    Empty or inverted intervals (``end <= start``) never overlap anything,
+    matching the ``max(starts) < min(ends)`` test they replace, so they are
+    ignored on insert and answered ``False`` on query. Intervals that touch
+    end-to-start do not overlap.
+    """
+
+    def __init__(self, intervals: Iterable[tuple[Any, Any]] = ()) -> None:
+        self._starts: list[Any] = []
+        self._ends: list[Any] = []
+        for start, end in sorted(interval for interval in intervals if interval[0] < interval[1]):
+            if self._ends and start <= self._ends[-1]:
+                if end > self._ends[-1]:
+                    self._ends[-1] = end
+            else:
+                self._starts.append(start)
+                self._ends.append(end)
+
+    @classmethod
+    def from_calendar_events(cls, events: Iterable[dict]) -> "IntervalIndex":
+        """Busy blocks from :func:`availability.load_calendar_events`."""
+
+        return cls((event["start"], event["end"]) for event in events)
+
+    def overlaps(self, start: Any, end: Any) -> bool:
+        if not start < end:
+            return False
+        # The last run starting before ``end`` has the largest end of all such runs.
+        idx = bisect_left(self._starts, end) - 1
+        return idx >= 0 and self._ends[idx] > start
+
+    def add(self, start: Any, end: Any) -> None:
+        if not start < end:
+            return
+        lo = bisect_left(self._ends, start)
+        hi = bisect_right(self._starts, end)
+        if lo < hi:
+            start = min(start, self._starts[lo])
+            end = max(end, self._ends[hi - 1])
+        self._starts[lo:hi] = [start]
+        self._ends[lo:hi] = [end]
+
+    def __iter__(self) -> Iterator[tuple[Any, Any]]:
+        """The merged runs, in order."""
+
+        return zip(self._starts, self._ends)
+
+
+__all__ = ["IntervalIndex"]
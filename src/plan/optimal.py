@@ -0,0 +1,427 @@
+"""Constrained portfolio selection by branch-and-bound.
+
+The greedy planner takes events by score and never looks back, so one
+high-scoring pick can block two picks that are better together, and the
+weekly spend cap and goal quotas are only reported after the fact.
+:func:`optimal_portfolio` maximises
+
+    total score + quota bonus × (quota units met)
+
+subject to no overlap, the per-day, per-week and weekend caps, and the
+weekly spend cap. A quota unit is one event towards a weekly or monthly
+``quotas`` minimum, counted up to the target. With ``quota_mode="soft"``
+each unit is worth :data:`SOFT_QUOTA_BONUS`. With ``"hard"`` it
+outweighs any score difference, so quotas are met whenever the caps allow.
+
+Every constraint except the monthly quotas is local to an ISO week, so
+weeks are solved one at a time in date order. Monthly quotas carry over:
+each week is credited only for the monthly units still missing.
+
+Each week is a depth-first search over candidates ordered by best possible
+contribution, pruned with an upper bound. The search is seeded with the
+week's greedy picks and shares a wall-clock ``time_budget`` across weeks.
+When a week runs out of time the best portfolio found so far is kept,
+which is never worse than greedy; the summary records which weeks were
+proven optimal.
+"""
+from __future__ import annotations
+
+import re
+import time
+from bisect import insort
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import accumulate
+from typing import Iterable
+
+from plan.choose import event_goals, event_window, portfolio_caps, quota_progress
+from plan.intervals import IntervalIndex
+from preferences import category_goals_map, time_windows_from_config
+from util.freebusy import FreeBusy
+from util.time_windows import TimeWindows
+from util.timez import week_key
+
+# Seconds for the whole horizon unless the caller passes ``time_budget``.
+DEFAULT_TIME_BUDGET = 2.0
+SOFT_QUOTA_BONUS = 0.25
+HARD_QUOTA_BONUS = 1000.0
+QUOTA_MODES = ("soft", "hard")
+# Search nodes between wall-clock checks.
+CLOCK_EVERY = 512
+PRICE_RE = re.compile(r"\d+(?:\.\d+)?")
+
+
+def event_cost(event: dict) -> float:
+    """Lowest price listed in ``cost`` ("$10 students / $20" → 10); free or unknown is 0."""
+
+    text = str(event.get("cost") or "")
+    if not text or "free" in text.lower():
+        return 0.0
+    prices = [float(value) for value in PRICE_RE.findall(text.replace(",", ""))]
+    return min(prices) if prices else 0.0
+
+
+def weekly_spend_cap(config: dict, preferences: dict) -> float | None:
+    budgets = preferences.get("budgets", {})
+    cap = budgets.get("weekly_spend_cap_usd", config.get("hard_rules", {}).get("budget_cap_per_week"))
+    return float(cap) if cap is not None else None
+
+
+def quota_bonus(quota_mode: str) -> float:
+    if quota_mode not in QUOTA_MODES:
+        raise ValueError(f"Unknown quota mode {quota_mode!r}; expected one of {', '.join(QUOTA_MODES)}")
+    return HARD_QUOTA_BONUS if quota_mode == "hard" else SOFT_QUOTA_BONUS
+
+
+@dataclass
+class _Candidate:
+    event: dict
+    order: int
+    start: datetime
+    end: datetime
+    day: str
+    weekend: bool
+    score: float
+    cost: float
+    goals: tuple[int, ...]
+    upper: float = 0.0
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+class _WeekSearch:
+    """Branch-and-bound over one week's candidates.
+
+    ``targets`` holds the units still worth a bonus for each quota goal
+    (weekly goals first, then monthly); a candidate counts once per goal.
+    Candidates are ordered by ``upper`` = score⁺ + bonus × quota goals, so
+    the bound for "pick at most ``k`` more from position ``j`` on" is the
+    sum of the next ``k`` uppers.
+    This is capped by the best ``k`` scores plus the bonus for deficits the
+    remaining candidates can still fill. Both terms only shrink as ``j``
+    grows, so a failed bound ends the loop.
+    """
+
+    def __init__(
+        self,
+        candidates: list[_Candidate],
+        *,
+        caps: dict[str, int],
+        spend_cap: float | None,
+        targets: list[int],
+        bonus: float,
+        no_overlap: bool,
+        deadline: float,
+        fixed: Iterable[_Candidate] = (),
+    ) -> None:
+        for candidate in candidates:
+            candidate.upper = max(candidate.score, 0.0) + bonus * sum(1 for goal in candidate.goals if targets[goal] > 0)
+        self.candidates = sorted(candidates, key=lambda c: (-c.upper, c.order))
+        self.caps = caps
+        self.spend_cap = spend_cap
+        self.targets = targets
+        self.bonus = bonus
+        self.no_overlap = no_overlap
+        self.deadline = deadline
+        self.nodes = 0
+
+        count = len(self.candidates)
+        self.upper_prefix = [0.0, *accumulate(candidate.upper for candidate in self.candidates)]
+        # suffix[j][g]: candidates from position j on that count towards goal g;
+        # top_scores[j][k]: sum of the k best positive scores from position j on.
+        width = max(caps["per_week"], 0)
+        suffix = [[0] * len(targets) for _ in range(count + 1)]
+        best: list[float] = []
+        top_scores = [[0.0] * (width + 1) for _ in range(count + 1)]
+        for pos in range(count - 1, -1, -1):
+            candidate = self.candidates[pos]
+            row = suffix[pos] = list(suffix[pos + 1])
+            for goal in candidate.goals:
+                row[goal] += 1
+            if candidate.score > 0 and width:
+                insort(best, -candidate.score)
+                del best[width:]
+            top_scores[pos] = [0.0, *accumulate(-value for value in best)]
+        self.suffix = suffix
+        self.top_scores = top_scores
+
+        self.picked: list[_Candidate] = []
+        self.day_counts: defaultdict[str, int] = defaultdict(int)
+        self.weekend_count = 0
+        self.spend = 0.0
+        self.goal_counts = [0] * len(targets)
+        self.best_value = float("-inf")
+        self.best: list[_Candidate] = []
+        for candidate in fixed:
+            self._push(candidate)
+        self.fixed_count = len(self.picked)
+
+    def value(self, picked: Iterable[_Candidate]) -> float:
+        counts = [0] * len(self.targets)
+        total = 0.0
+        for candidate in picked:
+            total += candidate.score
+            for goal in candidate.goals:
+                counts[goal] += 1
+        return total + self.bonus * sum(min(count, target) for count, target in zip(counts, self.targets))
+
+    def _fits(self, candidate: _Candidate) -> bool:
+        if self.day_counts[candidate.day] >= self.caps["per_day"]:
+            return False
+        if candidate.weekend and self.weekend_count >= self.caps["weekend"]:
+            return False
+        if self.spend_cap is not None and candidate.cost and self.spend + candidate.cost > self.spend_cap:
+            return False
+        if self.no_overlap:
+            for other in self.picked:
+                if candidate.start < other.end and other.start < candidate.end:
+                    return False
+        return True
+
+    def _push(self, candidate: _Candidate) -> None:
+        self.picked.append(candidate)
+        self.day_counts[candidate.day] += 1
+        self.weekend_count += candidate.weekend
+        self.spend += candidate.cost
+        for goal in candidate.goals:
+            self.goal_counts[goal] += 1
+
+    def _pop(self) -> None:
+        candidate = self.picked.pop()
+        self.day_counts[candidate.day] -= 1
+        self.weekend_count -= candidate.weekend
+        self.spend -= candidate.cost
+        for goal in candidate.goals:
+            self.goal_counts[goal] -= 1
+
+    def _bound(self, position: int, slots: int) -> float:
+        end = min(position + slots, len(self.candidates))
+        by_upper = self.upper_prefix[end] - self.upper_prefix[position]
+        deficits = 0
+        for count, target, available in zip(self.goal_counts, self.targets, self.suffix[position]):
+            if target > count:
+                deficits += min(target - count, available, slots)
+        top = self.top_scores[position]
+        by_parts = top[min(slots, len(top) - 1)] + self.bonus * deficits
+        return min(by_upper, by_parts)
+
+    def seed(self, picked: list[_Candidate]) -> None:
+        self.best, self.best_value = list(picked), self.value(picked)
+
+    def run(self) -> bool:
+        """Search until proven optimal (``True``) or the deadline passes (``False``)."""
+
+        try:
+            self._search(0, self.value(self.picked))
+        except _OutOfTime:
+            return False
+        return True
+
+    def _search(self, position: int, current: float) -> None:
+        slots = self.caps["per_week"] - len(self.picked)
+        if slots <= 0:
+            return
+        for idx in range(position, len(self.candidates)):
+            if current + self._bound(idx, slots) <= self.best_value + 1e-12:
+                return
+            self.nodes += 1
+            if self.nodes % CLOCK_EVERY == 0 and time.perf_counter() > self.deadline:
+                raise _OutOfTime
+            candidate = self.candidates[idx]
+            if not self._fits(candidate):
+                continue
+            before = self._gain_base()
+            self._push(candidate)
+            value = current + candidate.score + self.bonus * (self._gain_base() - before)
+            if value > self.best_value + 1e-12:
+                self.best, self.best_value = list(self.picked), value
+            if slots > 1:
+                self._search(idx + 1, value)
+            self._pop()
+
+    def _gain_base(self) -> int:
+        return sum(min(count, target) for count, target in zip(self.goal_counts, self.targets))
+
+
+def _greedy_week(search: _WeekSearch, candidates: list[_Candidate]) -> list[_Candidate]:
+    """The greedy planner's picks for one week (after the fixed ones), with the spend cap applied."""
+
+    for candidate in sorted(candidates, key=lambda c: (-c.score, c.order)):
+        if len(search.picked) >= search.caps["per_week"]:
+            break
+        if search._fits(candidate):
+            search._push(candidate)
+    picked = list(search.picked)
+    while len(search.picked) > search.fixed_count:
+        search._pop()
+    return picked
+
+
+def optimal_portfolio(
+    events: list[dict],
+    config: dict,
+    preferences: dict,
+    *,
+    windows: TimeWindows | None = None,
+    time_budget: float = DEFAULT_TIME_BUDGET,
+    quota_mode: str = "soft",
+    pinned: Iterable[dict] = (),
+    busy: FreeBusy | None = None,
+) -> dict:
+    """Portfolio maximising score plus quota bonus; same shape as ``choose_portfolio``.
+
+    ``pinned`` events are always selected, whatever their window, and
+    count towards every cap, the spend cap and the quotas. Candidates
+    colliding with ``busy`` calendar time are left out.
+
+    ``summary["planner"]`` reports the objective, solve time, and which
+    weeks were proven optimal versus cut off by ``time_budget`` seconds.
+    """
+
+    started = time.perf_counter()
+    bonus = quota_bonus(quota_mode)
+    if windows is None:
+        windows = time_windows_from_config(config, preferences)
+    caps = portfolio_caps(config, preferences)
+    spend_cap = weekly_spend_cap(config, preferences)
+    no_overlap = bool(config.get("hard_rules", {}).get("no_overlap"))
+    goal_map = category_goals_map(preferences)
+    weekly_targets = preferences.get("quotas", {}).get("weekly", {})
+    monthly_targets = preferences.get("quotas", {}).get("monthly", {})
+    weekly_goals = list(weekly_targets)
+    monthly_goals = list(monthly_targets)
+    weekly_index = {goal: idx for idx, goal in enumerate(weekly_goals)}
+    monthly_index = {goal: len(weekly_goals) + idx for idx, goal in enumerate(monthly_goals)}
+
+    def make_candidate(event: dict, order: int, start: datetime, end: datetime) -> _Candidate:
+        goals = event_goals(event, goal_map)
+        indices = [weekly_index[goal] for goal in goals if goal in weekly_index]
+        indices += [monthly_index[goal] for goal in goals if goal in monthly_index]
+        return _Candidate(
+            event=event,
+            order=order,
+            start=start,
+            end=end,
+            day=start.date().isoformat(),
+            weekend=start.weekday() >= 5,
+            score=float(event.get("score", 0.0)),
+            cost=event_cost(event),
+            goals=tuple(dict.fromkeys(indices)),
+        )
+
+    booked = IntervalIndex()
+    fixed_by_week: defaultdict[tuple[int, int], list[_Candidate]] = defaultdict(list)
+    pinned = list(pinned)
+    for order, event in enumerate(pinned, start=-len(pinned)):
+        start, end = event_window(event)
+        fixed_by_week[week_key(start)].append(make_candidate(event, order, start, end))
+        booked.add(start, end)
+    pinned_uids = {event.get("uid") for event in pinned} - {None}
+
+    by_week: defaultdict[tuple[int, int], list[_Candidate]] = defaultdict(list)
+    for order, event in enumerate(events):
+        if event.get("uid") in pinned_uids:
+            continue
+        start, end = event_window(event)
+        if windows.in_quiet_hours(start, end) or not windows.in_evening_window(start):
+            continue
+        if busy is not None and not busy.is_free(start, end):
+            continue
+        by_week[week_key(start)].append(make_candidate(event, order, start, end))
+
+    monthly_counts = {goal: 0 for goal in monthly_goals}
+    chosen: list[_Candidate] = []
+    objective = 0.0
+    weeks_optimal: list[str] = []
+    weeks_timed_out: list[str] = []
+    weeks = sorted(set(by_week) | set(fixed_by_week))
+    for position, week in enumerate(weeks):
+        candidates = by_week[week]
+        if no_overlap:
+            candidates = [c for c in candidates if not booked.overlaps(c.start, c.end)]
+        targets = [int(weekly_targets[goal] or 0) for goal in weekly_goals]
+        targets += [max(int(monthly_targets[goal] or 0) - monthly_counts[goal], 0) for goal in monthly_goals]
+        remaining = time_budget - (time.perf_counter() - started)
+        deadline = time.perf_counter() + max(remaining, 0.0) / (len(weeks) - position)
+        search = _WeekSearch(
+            candidates,
+            caps=caps,
+            spend_cap=spend_cap,
+            targets=targets,
+            bonus=bonus,
+            no_overlap=no_overlap,
+            deadline=deadline,
+            fixed=fixed_by_week[week],
+        )
+        search.seed(_greedy_week(search, candidates))
+        label = f"{week[0]}-W{week[1]:02d}"
+        (weeks_optimal if search.run() else weeks_timed_out).append(label)
+
+        objective += search.best_value
+        for picked in search.best:
+            chosen.append(picked)
+            booked.add(picked.start, picked.end)
+            for goal in picked.goals:
+                if goal >= len(weekly_goals):
+                    monthly_counts[monthly_goals[goal - len(weekly_goals)]] += 1
+
+    chosen.sort(key=lambda c: (-c.score, c.order))
+    weekly_goal_counts: defaultdict[tuple[int, int], defaultdict[str, int]] = defaultdict(lambda: defaultdict(int))
+    monthly_goal_counts: defaultdict[str, int] = defaultdict(int)
+    for candidate in chosen:
+        for goal in event_goals(candidate.event, goal_map):
+            weekly_goal_counts[week_key(candidate.start)][goal] += 1
+            monthly_goal_counts[goal] += 1
+
+    return {
+        "selected": [candidate.event for candidate in chosen],
+        "summary": {
+            "total_selected": len(chosen),
+            "weeks_scheduled": len({week_key(candidate.start) for candidate in chosen}),
+            "quota_progress": quota_progress(preferences, weekly_goal_counts, monthly_goal_counts),
+            "planner": {
+                "mode": "optimal",
+                "quota_mode": quota_mode,
+                "objective": round(objective, 4),
+                "solve_seconds": round(time.perf_counter() - started, 3),
+                "weeks_optimal": weeks_optimal,
+                "weeks_timed_out": weeks_timed_out,
+            },
+        },
+    }
+
+
+def portfolio_objective(selected: list[dict], config: dict, preferences: dict, *, quota_mode: str = "soft") -> float:
+    """The objective :func:`optimal_portfolio` maximises, for any selection (e.g. greedy's)."""
+
+    bonus = quota_bonus(quota_mode)
+    goal_map = category_goals_map(preferences)
+    weekly_targets = preferences.get("quotas", {}).get("weekly", {})
+    monthly_targets = preferences.get("quotas", {}).get("monthly", {})
+    weekly_counts: defaultdict[tuple[int, int], defaultdict[str, int]] = defaultdict(lambda: defaultdict(int))
+    monthly_counts: defaultdict[str, int] = defaultdict(int)
+    total = 0.0
+    for event in selected:
+        total += float(event.get("score", 0.0))
+        wk = week_key(event_window(event)[0])
+        for goal in dict.fromkeys(event_goals(event, goal_map)):
+            weekly_counts[wk][goal] += 1
+            monthly_counts[goal] += 1
+    units = sum(
+        min(counts.get(goal, 0), int(target or 0)) for counts in weekly_counts.values() for goal, target in weekly_targets.items()
+    )
+    units += sum(min(monthly_counts.get(goal, 0), int(target or 0)) for goal, target in monthly_targets.items())
+    return round(total + bonus * units, 4)
+
+
+__all__ = [
+    "DEFAULT_TIME_BUDGET",
+    "QUOTA_MODES",
+    "event_cost",
+    "optimal_portfolio",
+    "portfolio_objective",
+    "weekly_spend_cap",
+]
@@ -0,0 +1,208 @@
+"""Incremental re-planning for ``--rolling-update``.
+
+A daily rolling run used to re-plan the whole horizon from scratch, so
+picks could churn every day even though almost nothing changed. Instead,
+:func:`replan_portfolio` starts from the previous portfolio:
+
+* picks that are approved (``"approved": true``), start within
+  ``no_change_window_hours``, or fall on a day whose candidates are
+  unchanged are pinned;
+* only days whose candidate set changed since the last run (per-day
+  digests stored in the portfolio summary) and newly opened days are
+  re-solved. Earlier picks on those days get ``sticky_keep_bonus`` when
+  ``stable_plan_bias`` is set;
+* ``daily_change_budget`` and ``weekly_change_budget`` cap the picks added
+  or dropped on days the previous plan already covered. A day that goes
+  over budget is reverted to its previous picks and the rest is re-solved.
+
+Picks whose event disappeared, already started, or (unless approved) now
+clash with the personal calendar leave the plan without counting as
+changes, and new days never count against the budgets.
+
+Nothing in the pipeline sets ``approved``: it is added by hand to a pick
+in the archived portfolio (``data/out/portfolios/portfolio-<date>.json``)
+that the next rolling run starts from, and is carried forward from there.
+A previous portfolio without stored digests (archived before they were
+recorded) has every day re-solved; the days its picks covered still count
+against the change budgets.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from plan.choose import choose_portfolio, event_window
+from preferences import expand_goal_weights
+from util.freebusy import FreeBusy
+from util.time_windows import TimeWindows
+from util.timez import DEFAULT_TIMEZONE, week_key
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NO_CHANGE_HOURS = 24
+# Fields whose change on any candidate marks its day for re-planning.
+DIGEST_FIELDS = ("uid", "start_local", "end_local", "score", "cost", "category", "tags")
+
+
+def _day(event: dict) -> str:
+    return str(event.get("start_local", ""))[:10]
+
+
+def candidate_digests(events: Iterable[dict]) -> dict[str, str]:
+    """``{day: digest}`` of the candidates starting on each day."""
+
+    by_day: defaultdict[str, list[list]] = defaultdict(list)
+    for event in events:
+        by_day[_day(event)].append([event.get(field) for field in DIGEST_FIELDS])
+    return {
+        day: hashlib.sha256(json.dumps(sorted(rows, key=str), default=str).encode("utf-8")).hexdigest()[:16]
+        for day, rows in sorted(by_day.items())
+    }
+
+
+def _change_budgets(preferences: dict) -> tuple[int | None, int | None]:
+    caps = preferences.get("caps", {})
+    return caps.get("daily_change_budget"), caps.get("weekly_change_budget")
+
+
+def _no_change_hours(preferences: dict) -> float:
+    hours = preferences.get("time_windows", {}).get("no_change_window_hours")
+    if hours is None:
+        hours = preferences.get("anti_churn", {}).get("freeze_hours_near_term", DEFAULT_NO_CHANGE_HOURS)
+    return float(hours)
+
+
+def _over_budget(changes: dict[str, int], daily: int | None, weekly: int | None) -> str | None:
+    """The day to revert next: the busiest day over the daily budget, else in a week over budget."""
+
+    over = [day for day, count in changes.items() if daily is not None and count > daily]
+    if not over and weekly is not None:
+        per_week: defaultdict[tuple[int, int], int] = defaultdict(int)
+        for day, count in changes.items():
+            per_week[week_key(datetime.fromisoformat(day))] += count
+        over = [day for day, count in changes.items() if count and per_week[week_key(datetime.fromisoformat(day))] > weekly]
+    if not over:
+        return None
+    return max(over, key=lambda day: (changes[day], day))
+
+
+def replan_portfolio(
+    events: list[dict],
+    previous: dict,
+    config: dict,
+    preferences: dict,
+    *,
+    windows: TimeWindows | None = None,
+    now: datetime | None = None,
+    planner: str = "greedy",
+    busy: FreeBusy | None = None,
+    **planner_options,
+) -> dict:
+    """Update ``previous`` (a portfolio dict) for today's ``events``; same shape as ``choose_portfolio``.
+
+    ``summary["replan"]`` lists pinned, re-solved, new and reverted days and
+    the changes per day; ``summary["candidate_digests"]`` is stored for the
+    next run.
+    """
+
+    now = now or datetime.now(DEFAULT_TIMEZONE)
+    freeze_until = now + timedelta(hours=_no_change_hours(preferences))
+    daily_budget, weekly_budget = _change_budgets(preferences)
+    sticky_bonus = 0.0
+    if preferences.get("meta", {}).get("stable_plan_bias"):
+        sticky_bonus = expand_goal_weights(config, preferences).get("sticky_keep_bonus", 0.0)
+
+    digests = candidate_digests(events)
+    previous_digests = previous.get("summary", {}).get("candidate_digests")
+    if previous_digests is None:
+        # Digests of the old picks alone never match today's, so every day is
+        # re-solved, but the days they cover are not new and stay on budget.
+        previous_digests = candidate_digests(previous.get("selected", []))
+        logger.warning(
+            "Previous portfolio has no candidate digests; re-solving all days, budgets apply to the %d days it covered",
+            len(previous_digests),
+        )
+    dirty_days = {day for day, digest in digests.items() if previous_digests.get(day) != digest}
+    new_days = {day for day in digests if day not in previous_digests}
+    current = {event["uid"]: event for event in events if event.get("uid")}
+
+    # Unapproved picks that now clash with the calendar are dropped and their day re-solved.
+    clashing: set[str] = set()
+    if busy is not None:
+        for old in previous.get("selected", []):
+            event = current.get(old.get("uid"))
+            if event is not None and not old.get("approved") and not busy.is_free(*event_window(event)):
+                clashing.add(event["uid"])
+                dirty_days.add(_day(event))
+
+    # Previous picks still listed and not yet started, by day, in their current version.
+    kept_by_day: defaultdict[str, list[dict]] = defaultdict(list)
+    pinned: list[dict] = []
+    for old in previous.get("selected", []):
+        event = current.get(old.get("uid"))
+        if event is None or event["uid"] in clashing:
+            continue
+        start = event_window(event)[0]
+        if start < now:
+            continue
+        if old.get("approved"):
+            event["approved"] = True
+        kept_by_day[_day(event)].append(event)
+        if event.get("approved") or start <= freeze_until or _day(event) not in dirty_days:
+            pinned.append(event)
+    previous_uids = {event["uid"] for picks in kept_by_day.values() for event in picks}
+    pinned_uids = {event["uid"] for event in pinned}
+
+    candidates: list[dict] = []
+    originals: dict[int, dict] = {}
+    for event in events:
+        if _day(event) not in dirty_days or event.get("uid") in pinned_uids:
+            continue
+        if event_window(event)[0] <= freeze_until:
+            continue
+        if sticky_bonus and event.get("uid") in previous_uids:
+            boosted = dict(event, score=event.get("score", 0.0) + sticky_bonus)
+            originals[id(boosted)] = event
+            event = boosted
+        candidates.append(event)
+
+    reverted: set[str] = set()
+    while True:
+        solve = [event for event in candidates if _day(event) not in reverted]
+        fixed = pinned + [event for day in sorted(reverted) for event in kept_by_day[day] if event["uid"] not in pinned_uids]
+        portfolio = choose_portfolio(
+            solve, config, preferences, windows=windows, planner=planner, pinned=fixed, busy=busy, **planner_options
+        )
+        portfolio["selected"] = [originals.get(id(event), event) for event in portfolio["selected"]]
+
+        selected_by_day: defaultdict[str, set[str]] = defaultdict(set)
+        for event in portfolio["selected"]:
+            selected_by_day[_day(event)].add(event.get("uid"))
+        changes: dict[str, int] = {}
+        for day in sorted(dirty_days - new_days):
+            before = {event["uid"] for event in kept_by_day[day]}
+            count = len(before ^ selected_by_day[day])
+            if count:
+                changes[day] = count
+        day = _over_budget(changes, daily_budget, weekly_budget)
+        if day is None:
+            break
+        reverted.add(day)
+
+    portfolio["summary"]["replan"] = {
+        "pinned": len(pinned),
+        "resolved_days": sorted(dirty_days - reverted),
+        "new_days": sorted(new_days),
+        "reverted_days": sorted(reverted),
+        "candidates": len(candidates),
+        "changes": changes,
+    }
+    portfolio["summary"]["candidate_digests"] = digests
+    return portfolio
+
+
+__all__ = ["candidate_digests", "replan_portfolio"]
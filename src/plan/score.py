@@ -8,9 +8,17 @@ from preferences import (
     expand_goal_weights,
     goal_keywords_from_config,
     must_see_keywords,
+    time_windows_from_config,
 )
+from util.score_cache import ScoreCache, config_fingerprint, event_hash, record_score_stats
+from util.time_windows import TimeWindows
 from util.uid import normalize
 
+# Bump when scoring logic changes so cached scores are recomputed.
+SCORER_VERSION = 1
+# Every event field a score depends on; the score cache keys on exactly these.
+SCORED_FIELDS = ("title", "notes", "category", "tags", "org", "url", "start_local", "travel_minutes", "cost", "source")
+
 
 def _text_matches_keywords(text: str, keywords: Iterable[str]) -> int:
     text_norm = normalize(text)
@@ -53,32 +61,23 @@ def _apply_must_see_bonus(event: dict, keywords: Iterable[str], weight: float) -
     return 0.0
 
 
-def _late_start_penalty(event: dict, preferences: dict, weight: Dict[str, float]) -> float:
+def _starts_late(event: dict, windows: TimeWindows) -> bool:
     start_str = event.get("start_local")
-    if not start_str:
-        return 0.0
-    start_time_pref = preferences.get("preferences", {}).get("start_time", {})
-    penalty_after = start_time_pref.get("late_start_penalty_after")
-    penalty_value = start_time_pref.get("late_start_penalty", weight.get("evening_penalty", -0.05))
-    if not penalty_after:
-        return 0.0
+    if not start_str or windows.late_start_after is None:
+        return False
     try:
         hour = int(start_str.split("T")[1].split(":")[0])
     except Exception:
-        return 0.0
-    penalty_hour = int(penalty_after.split(":")[0])
-    if hour >= penalty_hour:
-        return penalty_value
-    return 0.0
+        return False
+    return windows.starts_late(hour)
 
 
-def score_event(event: dict, config: dict, preferences: dict) -> float:
-    weights = expand_goal_weights(config, preferences)
-    goal_keywords = goal_keywords_from_config(config)
-    category_map = category_goals_map(preferences)
-    must_see_list = must_see_keywords(preferences)
+def _late_start_penalty(event: dict, windows: TimeWindows) -> float:
+    return windows.late_start_penalty if _starts_late(event, windows) else 0.0
+
 
-    text = " ".join(
+def _event_text(event: dict) -> str:
+    return " ".join(
         filter(
             None,
             [
@@ -91,6 +90,17 @@ def score_event(event: dict, config: dict, preferences: dict) -> float:
         )
     )
 
+
+def score_event(event: dict, config: dict, preferences: dict, *, windows: TimeWindows | None = None) -> float:
+    weights = expand_goal_weights(config, preferences)
+    goal_keywords = goal_keywords_from_config(config)
+    category_map = category_goals_map(preferences)
+    must_see_list = must_see_keywords(preferences)
+    if windows is None:
+        windows = time_windows_from_config(config, preferences)
+
+    text = _event_text(event)
+
     score = 0.0
 
     # Goal keyword matches weigh heavily.
@@ -127,13 +137,132 @@ def score_event(event: dict, config: dict, preferences: dict) -> float:
     if event.get("source") in config.get("novelty_sources", []):
         score += weights.get("novelty", 0.0)
 
-    score += _late_start_penalty(event, preferences, weights)
+    score += _late_start_penalty(event, windows)
     score += _apply_must_see_bonus(event, must_see_list, weights.get("must_see_bonus", 0.0))
 
     return round(score, 4)
 
 
-def attach_scores(events: list[dict], config: dict, preferences: dict) -> list[dict]:
-    for event in events:
-        event["score"] = score_event(event, config, preferences)
+class ScoringModel:
+    """``score_event`` with the config and preferences compiled once per run.
+
+    Weights, category map and time windows are resolved up front, and every
+    goal and must-see keyword is normalized once into a deduplicated pattern
+    list, so each event costs one normalization of its text plus one C-level
+    substring scan per distinct pattern. Scores are bit-identical to
+    :func:`score_event`: the same float additions happen in the same order.
+    """
+
+    def __init__(self, config: dict, preferences: dict, *, windows: TimeWindows | None = None) -> None:
+        self.weights = expand_goal_weights(config, preferences)
+        self.category_map = category_goals_map(preferences)
+        self.windows = windows if windows is not None else time_windows_from_config(config, preferences)
+
+        # (weight, normalized keywords) per goal, in config order; repeats count twice as before.
+        self.goal_keys: list[str] = []
+        self.goal_terms: list[tuple[float, tuple[str, ...]]] = []
+        for goal_key, keywords in goal_keywords_from_config(config).items():
+            normalized = tuple(keyword for keyword in map(normalize, keywords) if keyword)
+            self.goal_keys.append(goal_key)
+            self.goal_terms.append((self.weights.get(f"goals.{goal_key}", 0.0), normalized))
+        self.patterns = tuple(dict.fromkeys(keyword for _, keywords in self.goal_terms for keyword in keywords))
+
+        must_see = [normalize(keyword) for keyword in must_see_keywords(preferences)]
+        self.must_see = tuple(dict.fromkeys(must_see))
+        self.must_see_weight = self.weights.get("must_see_bonus", 0.0)
+
+        self.category_weights = config.get("category_weights", {})
+        self.travel_penalty = self.weights.get("travel_time_penalty", -0.1)
+        self.free_bonus = config.get("cost_preferences", {}).get("free_bonus", 0.0)
+        self.cost_penalty = self.weights.get("cost_penalty", 0.0)
+        self.novelty_sources = config.get("novelty_sources", [])
+        self.novelty = self.weights.get("novelty", 0.0)
+
+    def goal_matches(self, text_norm: str) -> list[int]:
+        """Keyword hits per goal (config order) in already-normalized text."""
+
+        found = {pattern for pattern in self.patterns if pattern in text_norm}
+        return [sum(1 for keyword in keywords if keyword in found) for _, keywords in self.goal_terms]
+
+    def is_must_see(self, event: dict) -> bool:
+        if not self.must_see:
+            return False
+        title = normalize(event.get("title", ""))
+        notes = normalize(event.get("notes", ""))
+        return any(keyword in title or keyword in notes for keyword in self.must_see)
+
+    def score(self, event: dict) -> float:
+        score = 0.0
+        for (weight, _), matches in zip(self.goal_terms, self.goal_matches(normalize(_event_text(event)))):
+            score += matches * weight
+
+        for derived_goal in _event_goal_keys(event, self.category_map):
+            score += self.weights.get(f"goals.{derived_goal}", 0.0)
+
+        if category := event.get("category"):
+            if isinstance(category, str):
+                score += self.category_weights.get(category.lower(), 0.0)
+
+        travel_minutes = event.get("travel_minutes")
+        if isinstance(travel_minutes, (int, float)):
+            if travel_minutes > 45:
+                score += self.travel_penalty
+            elif travel_minutes <= 30:
+                score += abs(self.travel_penalty) * 0.3
+
+        cost_text = event.get("cost", "")
+        if cost_text:
+            if "free" in cost_text.lower():
+                score += self.free_bonus
+            else:
+                score += self.cost_penalty
+
+        if event.get("source") in self.novelty_sources:
+            score += self.novelty
+
+        score += _late_start_penalty(event, self.windows)
+        score += self.must_see_weight if self.is_must_see(event) else 0.0
+
+        return round(score, 4)
+
+
+def attach_scores(
+    events: list[dict],
+    config: dict,
+    preferences: dict,
+    *,
+    windows: TimeWindows | None = None,
+    cache: ScoreCache | None = None,
+) -> list[dict]:
+    """Set ``event["score"]`` on every event.
+
+    With a ``cache``, scores of events whose :data:`SCORED_FIELDS` are
+    unchanged under the same config and preferences are read back instead
+    of recomputed; ``windows`` must then be the ones derived from that
+    config. Cached and computed counts go to the run's score stats.
+    """
+
+    if cache is None:
+        scoring = ScoringModel(config, preferences, windows=windows)
+        for event in events:
+            event["score"] = scoring.score(event)
+        return events
+
+    fingerprint = config_fingerprint(config, preferences, version=SCORER_VERSION)
+    keys = [f"{fingerprint}:{event_hash(event, SCORED_FIELDS)}" for event in events]
+    known = cache.get_many(keys)
+    model: ScoringModel | None = None
+    computed: dict[str, float] = {}
+    for event, key in zip(events, keys):
+        score = known.get(key)
+        if score is None:
+            score = computed.get(key)
+        if score is None:
+            model = model or ScoringModel(config, preferences, windows=windows)
+            score = computed[key] = model.score(event)
+        event["score"] = score
+    if computed:
+        cache.put_many(computed.items())
+    hits = sum(1 for key in keys if key in known)
+    record_score_stats(cached=hits, computed=len(events) - hits)
     return events
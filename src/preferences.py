@@ -6,6 +6,8 @@ from typing import Any, Dict, Iterable, List
 
 import yaml
 
+from util.time_windows import TimeWindows
+
 
 def load_preferences(path: Path) -> Dict[str, Any]:
     data = yaml.safe_load(path.read_text()) if path.exists() else {}
@@ -58,6 +60,53 @@ def quiet_windows_from_preferences(preferences: Dict[str, Any]) -> List[tuple[st
     return windows
 
 
+WEEKDAY_INDICES = {
+    "monday": 0,
+    "tuesday": 1,
+    "wednesday": 2,
+    "thursday": 3,
+    "friday": 4,
+    "saturday": 5,
+    "sunday": 6,
+}
+
+
+def evening_windows_from_preferences(preferences: Dict[str, Any]) -> Dict[int, tuple[str, str]]:
+    """Map weekday index (Monday = 0) to its ``("HH:MM", "HH:MM")`` evening window."""
+
+    windows: Dict[int, tuple[str, str]] = {}
+    evenings = preferences.get("time_windows", {}).get("evenings", {})
+    weekdays = evenings.get("weekdays")
+    if isinstance(weekdays, (list, tuple)) and len(weekdays) == 2:
+        for day in range(0, 5):
+            windows[day] = (str(weekdays[0]), str(weekdays[1]))
+    for key in ("saturday", "sunday"):
+        value = evenings.get(key)
+        if isinstance(value, (list, tuple)) and len(value) == 2:
+            windows[WEEKDAY_INDICES[key]] = (str(value[0]), str(value[1]))
+    return windows
+
+
+def time_windows_from_config(scoring_config: Dict[str, Any], preferences: Dict[str, Any]) -> TimeWindows:
+    """Compile evening windows, quiet hours and the late-start rule for a run.
+
+    Quiet hours come from preferences, falling back to the scoring config's
+    ``hard_rules.evening_quiet_hours``.
+    """
+
+    quiet = quiet_windows_from_preferences(preferences)
+    if not quiet:
+        quiet = scoring_config.get("hard_rules", {}).get("evening_quiet_hours", [])
+    start_time = preferences.get("preferences", {}).get("start_time", {})
+    weights = expand_goal_weights(scoring_config, preferences)
+    return TimeWindows(
+        evenings=evening_windows_from_preferences(preferences),
+        quiet=quiet,
+        late_start_after=start_time.get("late_start_penalty_after"),
+        late_start_penalty=start_time.get("late_start_penalty", weights.get("evening_penalty", -0.05)),
+    )
+
+
 def goal_keywords_from_config(scoring_config: Dict[str, Any]) -> Dict[str, Iterable[str]]:
     return scoring_config.get("goal_keywords", {})
 
@@ -78,6 +127,8 @@ __all__ = [
     "category_goals_map",
     "must_see_keywords",
     "quiet_windows_from_preferences",
+    "evening_windows_from_preferences",
+    "time_windows_from_config",
     "goal_keywords_from_config",
     "target_calendar_name",
     "calendar_import_notes",
@@ -42,7 +42,7 @@ def fetch_context_for_source(source: dict[str, Any], *, max_chars: int = MAX_CHA
         return ""
 
     try:
-        response = fetch(url, timeout=20.0)
+        response = fetch(url, timeout=20.0, ttl=source.get("cache_ttl"))
     except Exception:
         return ""
 
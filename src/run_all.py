@@ -3,31 +3,46 @@ from __future__ import annotations
 
 import argparse
 from collections import defaultdict
+from functools import partial
 import json
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Iterable
 
 import yaml
 
-from emit.ics_writer import write_ics
+from emit.ics_writer import clear_vevent_cache, write_ics
 from emit.reports import write_run_report
 from emit.research_report import write_research_summary
 from emit.daily_markdown import write_daily_markdowns, write_changes_summary
 from emit.weekly_review import write_weekly_review
 from emit.source_performance_report import write_source_performance_report
-from plan.choose import choose_portfolio, write_portfolio
+from plan.choose import PLANNERS, choose_portfolio, write_portfolio
+from plan.optimal import DEFAULT_TIME_BUDGET, QUOTA_MODES
+from plan.replan import candidate_digests, replan_portfolio
 from plan.score import attach_scores
-from preferences import load_preferences, target_calendar_name
+from preferences import load_preferences, target_calendar_name, time_windows_from_config
 from research import gather_llm_research
 from availability import load_calendar_events, summarise_evenings, write_availability_markdown
 from emit.shortlist import write_shortlist_report
 from util.dedupe import dedupe_events
+from util.artifacts import artifact_counts, artifact_manifest, reset_artifact_manifest, write_artifact
+from util.blob_store import parse_size
+from util.freebusy import FreeBusy
+from util.near_dupes import DEFAULT_THRESHOLD as NEAR_DUP_THRESHOLD
+from util.http_cache import cache_stats, fetch, configure_cache_policy, configure_scheduler, configure_transport, gc_cache
+from util.parse_cache import parse_cache_stats, prune_parse_cache, reset_parse_stats
+from util.score_cache import get_score_cache, prune_score_cache, reset_score_stats, score_cache_stats
 from util.timez import DEFAULT_TIMEZONE
 
 from scrape import html_pull, ics_pull, jsonld_pull, js_pull
+from scrape.engine import scrape_concurrently
+from scrape.strategy import StrategyMemory
 
 SCRAPER_ORDER = ["ics", "jsonld", "html", "js"]
+# Scrapers that parse the fetched body (js renders the page itself).
+FETCHING_SCRAPERS = {"ics", "jsonld", "html"}
 SCRAPERS = {
     "ics": ics_pull.pull,
     "jsonld": jsonld_pull.pull,
@@ -54,32 +69,73 @@ def load_scoring_config(path: Path) -> dict[str, Any]:
 
 
 def write_jsonl(path: Path, events: Iterable[dict[str, Any]]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as handle:
-        for event in events:
-            handle.write(json.dumps(event, ensure_ascii=False) + "\n")
+    write_artifact(path, ((json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8") for event in events))
 
 
-def process_source(source: dict[str, Any], *, horizon_days: int, include_js: bool) -> tuple[list[dict[str, Any]], str]:
+def process_source(
+    source: dict[str, Any],
+    *,
+    horizon_days: int,
+    include_js: bool,
+    strategy: StrategyMemory | None = None,
+) -> tuple[list[dict[str, Any]], str]:
+    """Scrape one source, sharing a single fetched body across scraper attempts.
+
+    Sources without a ``type`` consult ``strategy``: the scraper that worked
+    last time runs first and the others are only fallbacks, except on a
+    periodic full probe, where every scraper runs and the biggest yield wins.
+    """
+
     slug = source.get("slug")
     preferred_type = source.get("type")
+    candidates = [preferred_type] if preferred_type else SCRAPER_ORDER
+    candidates = [name for name in candidates if name in SCRAPERS and (name != "js" or include_js)]
+    learn = strategy is not None and not preferred_type and bool(slug)
+    order, probe = strategy.plan(slug, candidates) if learn else (candidates, False)
+    if not order:
+        return [], preferred_type or "unknown"
+
+    response = None
+    fetching = [name for name in order if name in FETCHING_SCRAPERS]
+    if fetching:
+        started = time.perf_counter()
+        try:
+            response = fetch(source["url"], ttl=source.get("cache_ttl"))
+        except Exception as exc:
+            print(f"[warn] {slug}: fetch failed — {exc}")
+            if learn:
+                # Charged to the scraper that would have parsed the body; the
+                # preference is kept, since the site rather than the scraper failed.
+                strategy.record(slug, fetching[0], events=0, latency=time.perf_counter() - started, ok=False)
+            return [], order[0]
+
     tried: list[str] = []
-    for type_name in ([preferred_type] if preferred_type else SCRAPER_ORDER):
-        if type_name == "js" and not include_js:
-            continue
-        scraper = SCRAPERS.get(type_name)
-        if not scraper:
-            continue
+    best: tuple[list[dict[str, Any]], str, float] | None = None
+    for type_name in order:
         tried.append(type_name)
+        started = time.perf_counter()
         try:
-            events = scraper(source, horizon_days=horizon_days)
+            events = SCRAPERS[type_name](source, horizon_days=horizon_days, response=response)
         except NotImplementedError:
             continue
         except Exception as exc:
             print(f"[warn] {slug}: {type_name} scraper failed — {exc}")
+            if learn:
+                strategy.record(slug, type_name, events=0, latency=time.perf_counter() - started, ok=False)
             continue
-        if events:
-            return events, type_name
+        latency = time.perf_counter() - started
+        if learn:
+            strategy.record(slug, type_name, events=len(events), latency=latency)
+        if not events:
+            continue
+        if best is None or len(events) > len(best[0]) or (len(events) == len(best[0]) and latency < best[2]):
+            best = (events, type_name, latency)
+        if not probe:
+            break
+    if learn:
+        strategy.choose(slug, best[1] if best else None, probed=probe)
+    if best:
+        return best[0], best[1]
     return [], tried[-1] if tried else (preferred_type or "unknown")
 
 
@@ -92,21 +148,61 @@ def main() -> None:
     parser.add_argument("--llm-overwrite", action="store_true", help="Overwrite LLM snapshots instead of timestamped files")
     parser.add_argument("--rolling-update", action="store_true", help="Daily rolling update mode (preserve approvals, append new day)")
     parser.add_argument("--full-refresh", action="store_true", help="Full 7-day refresh mode (regenerate all selections)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Scrape this many sources in parallel (1 = serial)")
+    parser.add_argument("--per-host", type=int, default=4, help="Max concurrent requests per host when --concurrency > 1")
+    parser.add_argument("--offline", action="store_true", help="Serve every fetch from data/cache; never touch the network")
+    parser.add_argument("--max-stale", default=None, help="Serve cached pages up to this far past freshness without revalidating (e.g. 3600, 90m, 12h)")
+    parser.add_argument("--cache-max-bytes", default=None, help="Evict cached bodies beyond this budget after the run (e.g. 512MB)")
+    parser.add_argument("--host-rate", type=float, default=None, help="Max requests per second to any one host (default 2)")
+    parser.add_argument("--http2", action="store_true", help="Negotiate HTTP/2 on the pooled fetch client (requires h2)")
     parser.add_argument("--sources", type=Path, default=Path("src/sources.yaml"))
     parser.add_argument("--scoring-config", type=Path, default=Path("src/scoring_config.json"))
     parser.add_argument("--preferences", type=Path, default=Path("src/preferences.yaml"))
     parser.add_argument("--registry", type=Path, default=Path("src/registry.json"))
+    parser.add_argument(
+        "--near-dup-threshold",
+        type=float,
+        default=NEAR_DUP_THRESHOLD,
+        help=f"Merge same-day events whose title+venue similarity reaches this Jaccard score (default {NEAR_DUP_THRESHOLD}; 0 disables)",
+    )
+    parser.add_argument("--planner", choices=PLANNERS, default="greedy", help="Portfolio planner: greedy by score, or optimal under caps, spend cap and quotas")
+    parser.add_argument(
+        "--plan-time-budget",
+        type=float,
+        default=DEFAULT_TIME_BUDGET,
+        help=f"Seconds the optimal planner may search before keeping its best portfolio so far (default {DEFAULT_TIME_BUDGET})",
+    )
+    parser.add_argument("--quota-mode", choices=QUOTA_MODES, default="soft", help="Optimal planner: quotas as a bonus (soft) or met whenever possible (hard)")
     parser.add_argument("--availability-ics", type=Path, default=Path("data/availability/calendar.ics"))
     args = parser.parse_args()
 
+    configure_cache_policy(offline=args.offline, max_stale=args.max_stale)
+    reset_parse_stats()
+    reset_score_stats()
+    reset_artifact_manifest()
+    clear_vevent_cache()
+    if args.http2:
+        configure_transport(http2=True)
+    if args.host_rate:
+        configure_scheduler(rate_per_second=args.host_rate)
+
     sources = load_sources(args.sources)
     scoring_config = load_scoring_config(args.scoring_config)
     preferences = load_preferences(args.preferences)
+    time_windows = time_windows_from_config(scoring_config, preferences)
 
     availability_summary = {}
+    freebusy = None
     if args.availability_ics and args.availability_ics.exists():
-        availability_events = load_calendar_events(args.availability_ics)
-        availability_summary = summarise_evenings(availability_events, preferences=preferences, horizon_days=args.horizon_days)
+        availability_events = load_calendar_events(args.availability_ics, horizon_days=args.horizon_days)
+        freebusy = FreeBusy.from_calendar_events(availability_events)
+        availability_summary = summarise_evenings(
+            availability_events,
+            preferences=preferences,
+            horizon_days=args.horizon_days,
+            windows=time_windows,
+            freebusy=freebusy,
+        )
         if availability_summary:
             write_availability_markdown(Path('data/out/availability.md'), availability_summary)
 
@@ -150,11 +246,28 @@ def main() -> None:
             else:
                 skipped_sources.append(slug)
     else:
+        runnable: list[dict[str, Any]] = []
         for source in sources:
             if source.get("type") == "js" and not args.include_js:
                 skipped_sources.append(source.get("slug", "unknown"))
                 continue
-            events, _ = process_source(source, horizon_days=args.horizon_days, include_js=args.include_js)
+            runnable.append(source)
+        strategy = StrategyMemory()
+        if args.concurrency > 1:
+            scraped = scrape_concurrently(
+                runnable,
+                partial(process_source, strategy=strategy),
+                horizon_days=args.horizon_days,
+                include_js=args.include_js,
+                concurrency=args.concurrency,
+                per_host=args.per_host,
+            )
+        else:
+            scraped = (
+                (source, *process_source(source, horizon_days=args.horizon_days, include_js=args.include_js, strategy=strategy))
+                for source in runnable
+            )
+        for source, events, _ in scraped:
             slug = source.get("slug", "source")
             source_jsonl = batch_dir / f"{slug}.jsonl"
             source_ics = batch_dir / f"{slug}.ics"
@@ -165,9 +278,10 @@ def main() -> None:
                 counts_by_slug[slug] = len(events)
             else:
                 skipped_sources.append(slug)
+        strategy.save()
 
-    unique_events, duplicates = dedupe_events(all_events, args.registry)
-    attach_scores(unique_events, scoring_config, preferences)
+    unique_events, duplicates = dedupe_events(all_events, args.registry, near_dup_threshold=args.near_dup_threshold)
+    attach_scores(unique_events, scoring_config, preferences, windows=time_windows, cache=get_score_cache())
 
     if research_entries:
         write_research_summary(Path("data/out/research_summary.md"), research_entries)
@@ -177,7 +291,43 @@ def main() -> None:
     write_jsonl(merged_jsonl, unique_events)
     write_ics(unique_events, merged_ics, calendar_name="Spiceflow Social — merged")
 
-    portfolio = choose_portfolio(unique_events, scoring_config, preferences)
+    # Previous portfolio (rolling updates re-plan from it and preserve approvals)
+    previous_portfolio = None
+    archive_dir = Path("data/out/portfolios")
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    latest_prev = None
+    prev_files = sorted(archive_dir.glob("portfolio-*.json"))
+    if prev_files:
+        latest_prev = prev_files[-1]
+    if latest_prev and args.rolling_update:
+        try:
+            previous_portfolio = json.loads(latest_prev.read_text())
+        except Exception:
+            previous_portfolio = None
+
+    planner_options = {"time_budget": args.plan_time_budget, "quota_mode": args.quota_mode} if args.planner == "optimal" else {}
+    if previous_portfolio is not None:
+        portfolio = replan_portfolio(
+            unique_events,
+            previous_portfolio,
+            scoring_config,
+            preferences,
+            windows=time_windows,
+            planner=args.planner,
+            busy=freebusy,
+            **planner_options,
+        )
+    else:
+        portfolio = choose_portfolio(
+            unique_events,
+            scoring_config,
+            preferences,
+            windows=time_windows,
+            planner=args.planner,
+            busy=freebusy,
+            **planner_options,
+        )
+        portfolio["summary"]["candidate_digests"] = candidate_digests(unique_events)
     portfolio_path = Path("data/out/portfolio.json")
     write_portfolio(portfolio, portfolio_path)
     write_shortlist_report(Path("data/out/shortlist.md"), portfolio["selected"])
@@ -197,18 +347,7 @@ def main() -> None:
     write_changes_summary(Path("data/out/suggested_changes.md"), daily_info)
 
     # Weekly review (preserve approvals if rolling update)
-    previous_selected = None
-    archive_dir = Path("data/out/portfolios")
-    archive_dir.mkdir(parents=True, exist_ok=True)
-    latest_prev = None
-    prev_files = sorted(archive_dir.glob("portfolio-*.json"))
-    if prev_files:
-        latest_prev = prev_files[-1]
-    if latest_prev and args.rolling_update:
-        try:
-            previous_selected = json.loads(latest_prev.read_text()).get("selected", [])
-        except Exception:
-            previous_selected = None
+    previous_selected = previous_portfolio.get("selected", []) if previous_portfolio is not None else None
     write_weekly_review(
         portfolio["selected"],
         portfolio,
@@ -219,7 +358,7 @@ def main() -> None:
     # Archive current portfolio
     archive_path = archive_dir / f"portfolio-{run_date}.json"
     try:
-        archive_path.write_text(json.dumps(portfolio, ensure_ascii=False, indent=2))
+        write_artifact(archive_path, json.dumps(portfolio, ensure_ascii=False, indent=2))
     except Exception:
         pass
 
@@ -232,6 +371,10 @@ def main() -> None:
         portfolio_summary=portfolio.get("summary"),
         research_summaries=research_summaries,
         availability_summary=availability_summary if availability_summary else None,
+        cache_stats=cache_stats(),
+        parse_stats=parse_cache_stats(),
+        score_stats=score_cache_stats(),
+        artifact_stats=artifact_counts(),
     )
 
     # Simple source performance report
@@ -245,11 +388,20 @@ def main() -> None:
         "num_selected": len(portfolio["selected"]),
         "num_duplicates": len(duplicates),
         "skipped_sources": skipped_sources,
+        "cache": cache_stats(),
+        "parse_cache": parse_cache_stats(),
+        "score_cache": score_cache_stats(),
     }
     try:
-        Path("data/out/run_summary.json").write_text(json.dumps(run_summary, ensure_ascii=False, indent=2))
+        write_artifact(Path("data/out/run_summary.json"), json.dumps(run_summary, ensure_ascii=False, indent=2))
     except Exception:
         pass
+    # Per-run record of which outputs changed, for sync/import automation
+    write_artifact(batch_dir / "artifacts.json", json.dumps(artifact_manifest(), ensure_ascii=False, indent=2))
+
+    gc_cache(parse_size(args.cache_max_bytes) if args.cache_max_bytes else None)
+    prune_parse_cache()
+    prune_score_cache()
 
     print(f"Run complete: {len(unique_events)} events, {len(portfolio['selected'])} selected")
 
@@ -0,0 +1,235 @@
+"""Parser backends and compiled extraction plans for the HTML scraper.
+
+A source's ``html:`` block is compiled once into an :class:`ExtractionPlan`:
+``::attr(name)`` suffixes are split off, selectors are compiled for the
+chosen backend, and every item node is then read in a single pass.
+
+Backends are tried in :data:`BACKEND_PREFERENCE` order and skipped when
+their package is missing: selectolax (lexbor) and lxml are several times
+faster than BeautifulSoup on large listing pages. Whatever the backend,
+text is read the way ``Tag.get_text(strip=True)`` reads it — every text
+node stripped and joined, comments and ``script``/``style``/``template``
+contents left out — and bytes are decoded with BeautifulSoup's own
+detector, so the extracted strings do not depend on the backend. A
+source can pin one with ``html.backend`` when tree builders disagree on
+badly broken markup.
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Iterator
+
+import soupsieve
+from bs4 import BeautifulSoup
+from bs4.dammit import UnicodeDammit
+
+BACKEND_PREFERENCE = ("selectolax", "lxml", "bs4")
+# Tags whose text BeautifulSoup's get_text() leaves out.
+SKIPPED_TEXT_TAGS = ("script", "style", "template")
+# Keys of the ``html:`` block that are not field selectors.
+PLAN_OPTIONS = ("item", "backend")
+
+
+def _decode(content: bytes) -> str:
+    return UnicodeDammit(content, is_html=True).unicode_markup or ""
+
+
+class SoupBackend:
+    """Reference backend: BeautifulSoup with the stdlib ``html.parser``."""
+
+    name = "bs4"
+
+    def compile(self, selector: str) -> Any:
+        return soupsieve.compile(selector)
+
+    def items(self, content: bytes, compiled: Any) -> list[Any]:
+        return compiled.select(BeautifulSoup(content, "html.parser"))
+
+    def first(self, node: Any, compiled: Any) -> Any:
+        return compiled.select_one(node)
+
+    def text(self, node: Any) -> str:
+        return node.get_text(strip=True)
+
+    def attr(self, node: Any, name: str) -> str:
+        return node.get(name, "")
+
+
+class LxmlBackend:
+    name = "lxml"
+
+    def __init__(self) -> None:
+        import lxml.etree
+        import lxml.html
+        from cssselect import HTMLTranslator
+
+        self._etree = lxml.etree
+        self._html = lxml.html
+        self._translator = HTMLTranslator()
+
+    def compile(self, selector: str) -> Any:
+        # "descendant::" keeps the context node itself out, as soupsieve does.
+        return self._etree.XPath(self._translator.css_to_xpath(selector, prefix="descendant::"))
+
+    def items(self, content: bytes, compiled: Any) -> list[Any]:
+        text = _decode(content)
+        if not text.strip():
+            return []
+        root = self._html.document_fromstring(text)
+        self._etree.strip_elements(root, *SKIPPED_TEXT_TAGS, self._etree.Comment, with_tail=False)
+        return compiled(root)
+
+    def first(self, node: Any, compiled: Any) -> Any:
+        matches = compiled(node)
+        return matches[0] if matches else None
+
+    def text(self, node: Any) -> str:
+        return "".join(piece.strip() for piece in node.itertext())
+
+    def attr(self, node: Any, name: str) -> str:
+        return node.get(name, "")
+
+
+class SelectolaxBackend:
+    name = "selectolax"
+
+    def __init__(self) -> None:
+        from selectolax.lexbor import LexborHTMLParser
+
+        self._parser = LexborHTMLParser
+        self._probe = LexborHTMLParser("")
+
+    def compile(self, selector: str) -> Any:
+        self._probe.css(selector)  # raises on selectors lexbor cannot parse
+        return selector
+
+    def items(self, content: bytes, compiled: Any) -> list[Any]:
+        tree = self._parser(_decode(content))
+        tree.strip_tags(list(SKIPPED_TEXT_TAGS))
+        return tree.css(compiled)
+
+    def first(self, node: Any, compiled: Any) -> Any:
+        # lexbor matches the context node itself; soupsieve only looks below it.
+        for match in node.css(compiled):
+            if match.mem_id != node.mem_id:
+                return match
+        return None
+
+    def text(self, node: Any) -> str:
+        return "".join(piece.strip() for piece in _selectolax_strings(node))
+
+    def attr(self, node: Any, name: str) -> str:
+        return node.attributes.get(name) or ""
+
+
+def _selectolax_strings(node: Any) -> Iterator[str]:
+    for child in node.traverse(include_text=True):
+        if child.tag == "-text":
+            yield child.text_content or ""
+
+
+BACKENDS = {"bs4": SoupBackend, "lxml": LxmlBackend, "selectolax": SelectolaxBackend}
+
+
+@lru_cache(maxsize=None)
+def get_backend(name: str | None = None) -> Any:
+    """Backend ``name``, or the first importable one in preference order."""
+
+    if name is not None:
+        return BACKENDS[name]()
+    for candidate in BACKEND_PREFERENCE:
+        try:
+            return BACKENDS[candidate]()
+        except ImportError:
+            continue
+    return SoupBackend()
+
+
+def available_backends() -> list[str]:
+    names = []
+    for name in BACKEND_PREFERENCE:
+        try:
+            get_backend(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def split_selector(spec: str | None) -> tuple[str | None, str | None]:
+    """``"a.link::attr(href)"`` -> ``("a.link", "href")``."""
+
+    if spec and "::attr(" in spec:
+        selector, attribute = spec.split("::attr(")
+        return selector, attribute.rstrip(")")
+    return spec, None
+
+
+@dataclass(frozen=True)
+class FieldRule:
+    name: str
+    selector: Any
+    attribute: str | None
+
+
+class ExtractionPlan:
+    """A compiled ``html:`` block: item selector plus one rule per field."""
+
+    def __init__(self, config: dict[str, Any], backend: Any) -> None:
+        self.backend = backend
+        self.item = backend.compile(config["item"])
+        self.fields: list[FieldRule] = []
+        for name, spec in config.items():
+            if name in PLAN_OPTIONS or not spec:
+                continue
+            selector, attribute = split_selector(spec)
+            self.fields.append(FieldRule(name, backend.compile(selector), attribute))
+
+    def extract(self, content: bytes) -> list[dict[str, str]]:
+        """One ``{field: value}`` dict per item node; missing fields are ``""``."""
+
+        backend = self.backend
+        rows: list[dict[str, str]] = []
+        for node in backend.items(content, self.item):
+            values: dict[str, str] = {}
+            for rule in self.fields:
+                target = backend.first(node, rule.selector)
+                if target is None:
+                    values[rule.name] = ""
+                elif rule.attribute:
+                    values[rule.name] = backend.attr(target, rule.attribute)
+                else:
+                    values[rule.name] = backend.text(target)
+            rows.append(values)
+        return rows
+
+
+@lru_cache(maxsize=256)
+def _compile_plan(config_json: str, backend_name: str | None) -> ExtractionPlan:
+    config = json.loads(config_json)
+    backend = get_backend(backend_name)
+    try:
+        return ExtractionPlan(config, backend)
+    except Exception:
+        if backend.name == "bs4":
+            raise
+        # Selector syntax the fast backend does not support; soupsieve may.
+        return ExtractionPlan(config, get_backend("bs4"))
+
+
+def compile_plan(config: dict[str, Any]) -> ExtractionPlan:
+    """Compiled plan for a source's ``html:`` block, cached per distinct block."""
+
+    return _compile_plan(json.dumps(config, sort_keys=True), config.get("backend"))
+
+
+__all__ = [
+    "BACKEND_PREFERENCE",
+    "ExtractionPlan",
+    "available_backends",
+    "compile_plan",
+    "get_backend",
+    "split_selector",
+]
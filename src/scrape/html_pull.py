@@ -1,50 +1,32 @@
 """Configurable HTML scraping fallback."""
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from datetime import date
 from typing import Any
 
-from bs4 import BeautifulSoup
-
-from util.http_cache import fetch
-from util.timez import DEFAULT_TIMEZONE, default_duration_for_event, parse_datetime, to_iso_local
+from scrape.html_extract import compile_plan
+from util.http_cache import CachedFetch, fetch
+from util.parse_cache import memoized_parse, within_horizon
+from util.timez import default_duration_for_event, parse_datetime, to_iso_local
 from util.uid import generate_uid
 
+# Bump when the output of ``_parse`` changes so memoized rows are rebuilt.
+PARSER_VERSION = 2
 
-def _extract_field(node, selector: str | None, *, attribute: str | None = None) -> str:
-    if not selector:
-        return ""
-    target = node.select_one(selector)
-    if not target:
-        return ""
-    if attribute:
-        return target.get(attribute, "")
-    return target.get_text(strip=True)
-
-
-def pull(source: dict[str, Any], *, horizon_days: int) -> list[dict[str, Any]]:
-    config = source.get("html") or {}
-    item_selector = config.get("item")
-    if not item_selector:
-        raise ValueError(f"HTML scraper for {source['slug']} is missing item selector")
 
-    response = fetch(source["url"])
-    soup = BeautifulSoup(response.content, "html.parser")
-    now = datetime.now(DEFAULT_TIMEZONE)
-    horizon = now + timedelta(days=horizon_days)
+def _parse(content: bytes, source: dict[str, Any]) -> list[dict[str, Any]]:
+    plan = compile_plan(source["html"])
 
-    events: list[dict[str, Any]] = []
-    for node in soup.select(item_selector):
-        start_text = _extract_field(node, config.get("datetime"))
+    rows: list[dict[str, Any]] = []
+    for fields in plan.extract(content):
+        start_text = fields.get("datetime", "")
         if not start_text:
             continue
         try:
             start_dt = parse_datetime(start_text)
         except Exception:
             continue
-        if start_dt > horizon:
-            continue
-        end_text = _extract_field(node, config.get("endtime"))
+        end_text = fields.get("endtime", "")
         if end_text:
             try:
                 end_dt = parse_datetime(end_text)
@@ -53,34 +35,41 @@ def pull(source: dict[str, Any], *, horizon_days: int) -> list[dict[str, Any]]:
         else:
             end_dt = start_dt + default_duration_for_event(source.get("category"), False)
 
-        title = _extract_field(node, config.get("title")) or source.get("name", "Untitled Event")
-        location = _extract_field(node, config.get("location")) or source.get("city")
-        url_selector = config.get("url")
-        url_attr = None
-        if url_selector and "::attr(" in url_selector:
-            selector, attr = url_selector.split("::attr(")
-            url_selector = selector
-            url_attr = attr.rstrip(")")
-        url = _extract_field(node, url_selector, attribute=url_attr) or source.get("url")
+        title = fields.get("title") or source.get("name", "Untitled Event")
+        location = fields.get("location") or source.get("city")
+        url = fields.get("url") or source.get("url")
 
         uid = generate_uid(title, to_iso_local(start_dt), url or location)
-        events.append(
-            {
-                "uid": uid,
-                "title": title,
-                "start_local": to_iso_local(start_dt),
-                "end_local": to_iso_local(end_dt),
-                "all_day": False,
-                "timezone": "America/Detroit",
-                "location": location,
-                "city": source.get("city", "Ann Arbor, MI"),
-                "cost": source.get("cost", ""),
-                "category": source.get("category"),
-                "org": source.get("name"),
-                "url": url,
-                "image": source.get("image"),
-                "source": source.get("slug"),
-                "notes": _extract_field(node, config.get("notes")),
-            }
-        )
-    return events
+        event = {
+            "uid": uid,
+            "title": title,
+            "start_local": to_iso_local(start_dt),
+            "end_local": to_iso_local(end_dt),
+            "all_day": False,
+            "timezone": "America/Detroit",
+            "location": location,
+            "city": source.get("city", "Ann Arbor, MI"),
+            "cost": source.get("cost", ""),
+            "category": source.get("category"),
+            "org": source.get("name"),
+            "url": url,
+            "image": source.get("image"),
+            "source": source.get("slug"),
+            "notes": fields.get("notes", ""),
+        }
+        rows.append({"start": start_dt.timestamp(), "end": end_dt.timestamp(), "event": event})
+    return rows
+
+
+def pull(source: dict[str, Any], *, horizon_days: int, response: CachedFetch | None = None) -> list[dict[str, Any]]:
+    config = source.get("html") or {}
+    if not config.get("item"):
+        raise ValueError(f"HTML scraper for {source['slug']} is missing item selector")
+
+    if response is None:
+        response = fetch(source["url"], ttl=source.get("cache_ttl"))
+    # parse_datetime completes year-less or time-only strings from today, so
+    # memoized rows are only reused on the day they were parsed.
+    rows = memoized_parse("html", source, response, _parse, version=PARSER_VERSION, variant=date.today().isoformat())
+    # Listing pages are only bounded by the horizon, not by "now".
+    return within_horizon(rows, horizon_days, drop_past=False)
@@ -1,32 +1,25 @@
 """ICS source ingestion."""
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
+from functools import partial
 from typing import Any
 
-from icalendar import Calendar
-
-from util.http_cache import fetch
-from util.timez import DEFAULT_TIMEZONE, ensure_all_day_bounds, to_iso_local
+from util.http_cache import CachedFetch, fetch
+from util.ics_stream import iter_occurrences
+from util.parse_cache import memoized_parse, within_horizon
+from util.timez import DEFAULT_TIMEZONE, to_iso_local
 from util.uid import generate_uid
 
+# Bump when the output of ``_parse`` changes so memoized rows are rebuilt.
+PARSER_VERSION = 2
 
-def pull(source: dict[str, Any], *, horizon_days: int) -> list[dict[str, Any]]:
-    response = fetch(source["url"])
-    calendar = Calendar.from_ical(response.content)
-
-    now = datetime.now(DEFAULT_TIMEZONE)
-    horizon = now + timedelta(days=horizon_days)
-    events: list[dict[str, Any]] = []
 
-    for component in calendar.walk("VEVENT"):
-        start_raw = component.get("dtstart")
-        end_raw = component.get("dtend") or component.get("dtstart")
-        if not start_raw:
-            continue
-        start_dt, end_dt, all_day = ensure_all_day_bounds(start_raw.dt, end_raw.dt if hasattr(end_raw, "dt") else end_raw)
-        if end_dt < now or start_dt > horizon:
-            continue
+def _parse(content: bytes, source: dict[str, Any], *, window_start: datetime, window_end: datetime) -> list[dict[str, Any]]:
+    rows: list[dict[str, Any]] = []
+    for occurrence in iter_occurrences(content, window_start, window_end):
+        component = occurrence.component
+        start_dt, end_dt = occurrence.start, occurrence.end
         title = str(component.get("summary", "Untitled Event"))
         location = str(component.get("location", "")) or source.get("city")
         notes = str(component.get("description", "")).strip()
@@ -36,24 +29,44 @@ def pull(source: dict[str, Any], *, horizon_days: int) -> list[dict[str, Any]]:
             uid_value = str(uid)
         else:
             uid_value = generate_uid(title, to_iso_local(start_dt), url or location)
+        if occurrence.instance:
+            uid_value = f"{uid_value}-{occurrence.instance}"
+
+        event = {
+            "uid": uid_value,
+            "title": title,
+            "start_local": to_iso_local(start_dt),
+            "end_local": to_iso_local(end_dt),
+            "all_day": occurrence.all_day,
+            "timezone": "America/Detroit",
+            "location": location,
+            "city": source.get("city", "Ann Arbor, MI"),
+            "cost": str(component.get("cost", source.get("cost", ""))),
+            "category": source.get("category"),
+            "org": source.get("name"),
+            "url": url,
+            "image": source.get("image"),
+            "source": source.get("slug"),
+            "notes": notes,
+        }
+        rows.append({"start": start_dt.timestamp(), "end": end_dt.timestamp(), "event": event})
+    return rows
+
 
-        events.append(
-            {
-                "uid": uid_value,
-                "title": title,
-                "start_local": to_iso_local(start_dt),
-                "end_local": to_iso_local(end_dt),
-                "all_day": all_day,
-                "timezone": "America/Detroit",
-                "location": location,
-                "city": source.get("city", "Ann Arbor, MI"),
-                "cost": str(component.get("cost", source.get("cost", ""))),
-                "category": source.get("category"),
-                "org": source.get("name"),
-                "url": url,
-                "image": source.get("image"),
-                "source": source.get("slug"),
-                "notes": notes,
-            }
-        )
-    return events
+def pull(source: dict[str, Any], *, horizon_days: int, response: CachedFetch | None = None) -> list[dict[str, Any]]:
+    if response is None:
+        response = fetch(source["url"], ttl=source.get("cache_ttl"))
+    # Parse a day-aligned window so memoized rows serve every run of the day;
+    # within_horizon trims them to the exact [now, now + horizon] on read.
+    window_start = datetime.combine(datetime.now(DEFAULT_TIMEZONE).date(), time(), DEFAULT_TIMEZONE)
+    window_end = window_start + timedelta(days=horizon_days + 1)
+    parse = partial(_parse, window_start=window_start, window_end=window_end)
+    rows = memoized_parse(
+        "ics",
+        source,
+        response,
+        parse,
+        version=PARSER_VERSION,
+        variant=f"{window_start.date().isoformat()}+{horizon_days}",
+    )
+    return within_horizon(rows, horizon_days)
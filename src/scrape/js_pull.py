@@ -4,7 +4,7 @@ from __future__ import annotations
 from typing import Any
 
 
-def pull(source: dict[str, Any], *, horizon_days: int) -> list[dict[str, Any]]:
+def pull(source: dict[str, Any], *, horizon_days: int, response: Any = None) -> list[dict[str, Any]]:
     raise NotImplementedError(
         "JavaScript-rendered sources require Playwright. Run `run_all.py --include-js` after configuring a browser."
     )
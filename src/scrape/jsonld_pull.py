@@ -2,56 +2,117 @@
 from __future__ import annotations
 
 import json
-from datetime import datetime, timedelta
+import re
+from datetime import date
 from typing import Any
 
 from bs4 import BeautifulSoup
 
-from util.http_cache import fetch
-from util.timez import DEFAULT_TIMEZONE, parse_datetime, to_iso_local
+from util.http_cache import CachedFetch, fetch
+from util.parse_cache import memoized_parse, within_horizon
+from util.timez import parse_datetime, to_iso_local
 from util.uid import generate_uid
 
+# Bump when the output of ``_parse`` changes so memoized rows are rebuilt.
+PARSER_VERSION = 2
+
+# Script bodies are raw text up to the first ``</script``, exactly as
+# html.parser treats them, so a regex scan finds the same payloads as the
+# soup without building a DOM for the rest of the page.
+SCRIPT_OPEN_RE = re.compile(rb"<script\b([^>]*)>", re.IGNORECASE)
+SCRIPT_CLOSE_RE = re.compile(rb"</script\s*>", re.IGNORECASE)
+LD_JSON_TYPE_RE = re.compile(rb"""\btype\s*=\s*(["']?)application/ld\+json\1(?:[\s/]|$)""", re.IGNORECASE)
+COMMENT_RE = re.compile(rb"<!--.*?-->", re.DOTALL)
+# Properties a subEvent inherits from its parent when it leaves them out.
+INHERITED_PROPERTIES = ("location", "organizer", "url", "image", "offers", "eventType")
+
+
+def _script_payloads_fast(content: bytes) -> list[str] | None:
+    """JSON-LD script bodies via a byte scan, or ``None`` if the markup looks off.
+
+    Anything the scan cannot be sure about — an unterminated comment or
+    script, a body that is not UTF-8 — returns ``None`` so the caller can
+    fall back to BeautifulSoup.
+    """
+
+    if b"<!--" in content:
+        content = COMMENT_RE.sub(b"", content)
+        if b"<!--" in content:
+            return None
+    payloads: list[str] = []
+    position = 0
+    while match := SCRIPT_OPEN_RE.search(content, position):
+        close = SCRIPT_CLOSE_RE.search(content, match.end())
+        if close is None:
+            return None
+        if LD_JSON_TYPE_RE.search(match.group(1)):
+            try:
+                payloads.append(content[match.end():close.start()].decode("utf-8"))
+            except UnicodeDecodeError:
+                return None
+        position = close.end()
+    return payloads
+
+
+def _script_payloads_soup(content: bytes) -> list[str]:
+    soup = BeautifulSoup(content, "html.parser")
+    return [script.string or "{}" for script in soup.find_all("script", attrs={"type": "application/ld+json"})]
+
+
+def _script_payloads(content: bytes) -> list[str]:
+    payloads = _script_payloads_fast(content)
+    return payloads if payloads is not None else _script_payloads_soup(content)
+
+
+def _type_names(item: dict[str, Any]) -> list[str]:
+    raw = item.get("@type") or []
+    names = [raw] if isinstance(raw, str) else [name for name in raw if isinstance(name, str)]
+    # "schema:MusicEvent" and "https://schema.org/MusicEvent" name the same type.
+    return [name.rsplit("/", 1)[-1].rsplit(":", 1)[-1] for name in names]
+
+
+def _is_event(item: dict[str, Any]) -> bool:
+    """``Event`` or any schema.org subtype (``MusicEvent``, ``EducationEvent``, ...)."""
+
+    return any(name.endswith("Event") for name in _type_names(item))
+
+
+def _extract_events(payload: Any, parent: dict[str, Any] | None = None) -> list[dict[str, Any]]:
+    """Every Event node in a JSON-LD payload, including ``@graph`` members and ``subEvent``s."""
 
-def _extract_events(payload: Any) -> list[dict[str, Any]]:
-    if isinstance(payload, dict):
-        if payload.get("@type") in {"Event", ["Event"]}:
-            return [payload]
-        if "@graph" in payload:
-            return [item for item in payload["@graph"] if isinstance(item, dict)]
     if isinstance(payload, list):
         events: list[dict[str, Any]] = []
         for item in payload:
-            events.extend(_extract_events(item))
+            events.extend(_extract_events(item, parent))
         return events
-    return []
-
-
-def pull(source: dict[str, Any], *, horizon_days: int) -> list[dict[str, Any]]:
-    response = fetch(source["url"])
-    soup = BeautifulSoup(response.content, "html.parser")
-    scripts = soup.find_all("script", attrs={"type": "application/ld+json"})
+    if not isinstance(payload, dict):
+        return []
+    events = []
+    if "@graph" in payload:
+        events.extend(_extract_events(payload["@graph"]))
+    if _is_event(payload):
+        if parent is not None:
+            inherited = {key: parent[key] for key in INHERITED_PROPERTIES if key in parent and key not in payload}
+            payload = {**inherited, **payload}
+        events.append(payload)
+        if "subEvent" in payload:
+            events.extend(_extract_events(payload["subEvent"], payload))
+    return events
 
-    now = datetime.now(DEFAULT_TIMEZONE)
-    horizon = now + timedelta(days=horizon_days)
 
-    events: list[dict[str, Any]] = []
-    for script in scripts:
+def _parse(content: bytes, source: dict[str, Any]) -> list[dict[str, Any]]:
+    rows: list[dict[str, Any]] = []
+    for script in _script_payloads(content):
         try:
-            payload = json.loads(script.string or "{}")
+            payload = json.loads(script or "{}")
         except json.JSONDecodeError:
             continue
         for item in _extract_events(payload):
-            if item.get("@type") not in ("Event", ["Event"]):
-                continue
             start = item.get("startDate")
             if not start:
                 continue
             start_dt = parse_datetime(start)
             end_dt = parse_datetime(item.get("endDate")) if item.get("endDate") else None
-            if end_dt and end_dt < now:
-                continue
-            if start_dt > horizon:
-                continue
             location = item.get("location", {})
             if isinstance(location, dict):
                 location_str = location.get("name") or location.get("address", {}).get("streetAddress")
@@ -60,23 +121,37 @@ def pull(source: dict[str, Any], *, horizon_days: int) -> list[dict[str, Any]]:
             title = item.get("name", "Untitled Event")
             url = item.get("url") or source.get("url")
             uid = generate_uid(title, to_iso_local(start_dt), url or location_str)
-            events.append(
+            event = {
+                "uid": uid,
+                "title": title,
+                "start_local": to_iso_local(start_dt),
+                "end_local": to_iso_local(end_dt) if end_dt else None,
+                "all_day": False,
+                "timezone": "America/Detroit",
+                "location": location_str,
+                "city": source.get("city", "Ann Arbor, MI"),
+                "cost": item.get("offers", {}).get("price") if isinstance(item.get("offers"), dict) else "",
+                "category": source.get("category") or item.get("eventType"),
+                "org": item.get("organizer", {}).get("name") if isinstance(item.get("organizer"), dict) else item.get("organizer"),
+                "url": url,
+                "image": item.get("image"),
+                "source": source.get("slug"),
+                "notes": item.get("description", ""),
+            }
+            rows.append(
                 {
-                    "uid": uid,
-                    "title": title,
-                    "start_local": to_iso_local(start_dt),
-                    "end_local": to_iso_local(end_dt) if end_dt else None,
-                    "all_day": False,
-                    "timezone": "America/Detroit",
-                    "location": location_str,
-                    "city": source.get("city", "Ann Arbor, MI"),
-                    "cost": item.get("offers", {}).get("price") if isinstance(item.get("offers"), dict) else "",
-                    "category": source.get("category") or item.get("eventType"),
-                    "org": item.get("organizer", {}).get("name") if isinstance(item.get("organizer"), dict) else item.get("organizer"),
-                    "url": url,
-                    "image": item.get("image"),
-                    "source": source.get("slug"),
-                    "notes": item.get("description", ""),
+                    "start": start_dt.timestamp(),
+                    "end": end_dt.timestamp() if end_dt else None,
+                    "event": event,
                 }
             )
-    return events
+    return rows
+
+
+def pull(source: dict[str, Any], *, horizon_days: int, response: CachedFetch | None = None) -> list[dict[str, Any]]:
+    if response is None:
+        response = fetch(source["url"], ttl=source.get("cache_ttl"))
+    # parse_datetime completes year-less or time-only strings from today, so
+    # memoized rows are only reused on the day they were parsed.
+    rows = memoized_parse("jsonld", source, response, _parse, version=PARSER_VERSION, variant=date.today().isoformat())
+    return within_horizon(rows, horizon_days)
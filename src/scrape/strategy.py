@@ -0,0 +1,99 @@
+"""Per-source memory of which scraper works, learned from run history.
+
+Sources without an explicit ``type`` used to walk ``SCRAPER_ORDER`` every
+night. :class:`StrategyMemory` remembers, per slug, the scraper that last
+produced events along with its latency and yield, so the next run tries it
+first. The other scrapers are only re-probed when the preferred one fails
+or comes back empty, or once :data:`REPROBE_AFTER` has passed since the
+last full probe — a site that adds an ICS feed is eventually noticed.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Sequence
+
+STRATEGY_FILE = Path("data/cache/strategy.json")
+REPROBE_AFTER = 14 * 86400.0
+# Weight of the newest sample in the moving latency/yield averages.
+SMOOTHING = 0.3
+
+
+class StrategyMemory:
+    """Thread-safe ``{slug: {"preferred": type, "last_probe": ts, "scrapers": {...}}}``."""
+
+    def __init__(self, path: Path = STRATEGY_FILE, *, reprobe_after: float = REPROBE_AFTER) -> None:
+        self.path = path
+        self.reprobe_after = reprobe_after
+        self._lock = threading.Lock()
+        self._data: dict[str, dict[str, Any]] = {}
+        if path.exists():
+            try:
+                self._data = json.loads(path.read_text()) or {}
+            except (OSError, json.JSONDecodeError):
+                self._data = {}
+
+    def plan(self, slug: str, candidates: Sequence[str], *, now: float | None = None) -> tuple[list[str], bool]:
+        """Scrapers to try for ``slug`` and whether this run is a full probe.
+
+        A probe tries every candidate and keeps the best; otherwise the
+        remembered scraper goes first and the rest are fallbacks.
+        """
+
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._data.get(slug) or {}
+        preferred = entry.get("preferred")
+        if preferred not in candidates:
+            return list(candidates), True
+        if now - entry.get("last_probe", 0.0) >= self.reprobe_after:
+            return list(candidates), True
+        return [preferred] + [name for name in candidates if name != preferred], False
+
+    def record(self, slug: str, scraper: str, *, events: int, latency: float, ok: bool = True) -> None:
+        """Log one attempt; an attempt that raised or found nothing is a failure."""
+
+        with self._lock:
+            entry = self._data.setdefault(slug, {"scrapers": {}})
+            stats = entry["scrapers"].setdefault(
+                scraper, {"successes": 0, "failures": 0, "avg_latency": latency, "avg_events": float(events)}
+            )
+            if ok and events:
+                stats["successes"] += 1
+                stats["last_success"] = time.time()
+            else:
+                stats["failures"] += 1
+            stats["last_latency"] = round(latency, 4)
+            stats["last_events"] = events
+            stats["avg_latency"] = round((1 - SMOOTHING) * stats["avg_latency"] + SMOOTHING * latency, 4)
+            stats["avg_events"] = round((1 - SMOOTHING) * stats["avg_events"] + SMOOTHING * events, 2)
+
+    def choose(self, slug: str, scraper: str | None, *, probed: bool) -> None:
+        """Remember ``scraper`` as the winner for ``slug`` (``None`` when nothing worked)."""
+
+        with self._lock:
+            entry = self._data.setdefault(slug, {"scrapers": {}})
+            if scraper is not None:
+                entry["preferred"] = scraper
+            elif entry.get("preferred"):
+                # Nothing worked even after falling back: probe fully next time.
+                entry.pop("preferred")
+            if probed:
+                entry["last_probe"] = time.time()
+
+    def preferred(self, slug: str) -> str | None:
+        with self._lock:
+            return (self._data.get(slug) or {}).get("preferred")
+
+    def save(self) -> None:
+        with self._lock:
+            payload = json.dumps(self._data, indent=2, sort_keys=True)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(payload)
+        tmp.replace(self.path)
+
+
+__all__ = ["REPROBE_AFTER", "STRATEGY_FILE", "StrategyMemory"]
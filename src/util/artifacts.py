@@ -0,0 +1,142 @@
+"""Atomic, write-if-changed output for run artifacts.
+
+Every run used to rewrite every file under ``data/out``, ``data/merged``
+and the day's batch directory, even when nothing in them had changed. That
+touched mtimes, made calendar apps re-import ``winners.ics`` and woke any
+sync watcher. :func:`write_artifact` writes to a temporary file beside the
+target while hashing the content, then compares that hash with the
+existing file's. The temporary file replaces the target (an atomic rename)
+only when the content differs; otherwise it is discarded and the old file
+is left untouched.
+
+Some formats carry a stamp that changes on every run without changing the
+content, such as ICS ``DTSTAMP``. The ``volatile`` pattern strips those
+lines from both sides before hashing. It is applied per chunk, so writers
+that stream must hand over whole lines.
+
+Each write is recorded in a per-run manifest (:func:`artifact_manifest`)
+listing the artifacts that were created, changed or left unchanged.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import stat
+import tempfile
+import threading
+from pathlib import Path
+from typing import Iterable
+
+DEFAULT_MODE = 0o644
+READ_BLOCK = 1 << 20
+STATUSES = ("created", "changed", "unchanged")
+
+
+class ArtifactManifest:
+    """What happened to each artifact written during the current run."""
+
+    def __init__(self) -> None:
+        self._entries: dict[str, dict[str, int | str]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, path: Path, status: str, digest: str, size: int) -> None:
+        with self._lock:
+            self._entries[str(path)] = {"path": str(path), "status": status, "sha256": digest, "bytes": size}
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            entries = [dict(entry) for _, entry in sorted(self._entries.items())]
+        counts = dict.fromkeys(STATUSES, 0)
+        for entry in entries:
+            counts[entry["status"]] += 1
+        return {"counts": counts, "artifacts": entries}
+
+
+_manifest = ArtifactManifest()
+
+
+def reset_artifact_manifest() -> None:
+    global _manifest
+    _manifest = ArtifactManifest()
+
+
+def artifact_manifest() -> dict:
+    """``{"counts": {status: n}, "artifacts": [{path, status, sha256, bytes}, ...]}`` for this run."""
+
+    return _manifest.snapshot()
+
+
+def artifact_counts() -> dict[str, int]:
+    return _manifest.snapshot()["counts"]
+
+
+def _existing_digest(path: Path, volatile: re.Pattern[bytes] | None) -> str | None:
+    try:
+        if volatile is not None:
+            return hashlib.sha256(volatile.sub(b"", path.read_bytes())).hexdigest()
+        digest = hashlib.sha256()
+        with path.open("rb") as handle:
+            while block := handle.read(READ_BLOCK):
+                digest.update(block)
+        return digest.hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def write_artifact(
+    path: Path,
+    content: str | bytes | Iterable[bytes],
+    *,
+    encoding: str = "utf-8",
+    volatile: re.Pattern[bytes] | None = None,
+) -> bool:
+    """Write ``content`` to ``path`` atomically unless the file already holds it.
+
+    ``content`` is text (encoded with ``encoding``), bytes, or an iterable
+    of byte chunks that is streamed to disk. Returns whether the file was
+    written.
+    """
+
+    path = Path(path)
+    if isinstance(content, str):
+        chunks: Iterable[bytes] = [content.encode(encoding)]
+    elif isinstance(content, (bytes, bytearray)):
+        chunks = [bytes(content)]
+    else:
+        chunks = content
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    tmp = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            for chunk in chunks:
+                handle.write(chunk)
+                size += len(chunk)
+                digest.update(volatile.sub(b"", chunk) if volatile is not None else chunk)
+        new_digest = digest.hexdigest()
+        old_digest = _existing_digest(path, volatile)
+        if old_digest == new_digest:
+            tmp.unlink()
+            _manifest.record(path, "unchanged", new_digest, size)
+            return False
+        mode = stat.S_IMODE(path.stat().st_mode) if old_digest is not None else DEFAULT_MODE
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    _manifest.record(path, "created" if old_digest is None else "changed", new_digest, size)
+    return True
+
+
+__all__ = [
+    "ArtifactManifest",
+    "artifact_counts",
+    "artifact_manifest",
+    "reset_artifact_manifest",
+    "write_artifact",
+]
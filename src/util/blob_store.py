@@ -0,0 +1,158 @@
+"""Content-addressed, compressed blob storage for cached response bodies.
+
+Bodies are always read whole. A memory-mapped read path for uncompressed
+blobs was left out on purpose: every scraper and the parse cache consume
+the body as one ``bytes`` object, so a mapping would be copied straight
+back into memory.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+
+from .cache_index import CacheIndex
+
+try:  # Optional: better ratio and much faster than gzip when available.
+    import zstandard
+except ImportError:  # pragma: no cover - exercised only without the extra
+    zstandard = None
+
+CODEC_SUFFIX = {"zstd": ".zst", "gzip": ".gz", "none": ""}
+SIZE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([kmgt]?i?b?)?\s*$", re.IGNORECASE)
+SIZE_UNITS = {"": 1, "k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4}
+# A blob is written (refcount 0) before the URL row referencing it is; gc
+# leaves orphans this young alone so it cannot collect one in between.
+ORPHAN_GRACE_SECONDS = 15 * 60
+
+
+def default_codec() -> str:
+    return "zstd" if zstandard is not None else "gzip"
+
+
+def parse_size(value: int | str) -> int:
+    """Parse ``536870912``, ``"512MB"`` or ``"2g"`` into bytes (binary units)."""
+
+    if isinstance(value, int):
+        return value
+    match = SIZE_RE.match(str(value))
+    if not match:
+        raise ValueError(f"Unrecognised size: {value!r}")
+    amount, unit = match.groups()
+    return int(float(amount) * SIZE_UNITS[(unit or "")[:1].lower()])
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    return data
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "gzip":
+        return gzip.decompress(data)
+    return data
+
+
+class BlobStore:
+    """Response bodies stored once per SHA-256, referenced from the URL index.
+
+    Identical bodies served from different URLs share one file under
+    ``<root>/<aa>/<digest><suffix>``. Reference counts live in the index
+    database next to the URL rows, so moving a URL onto a new body and
+    releasing the old one happen in a single transaction.
+    """
+
+    def __init__(self, root: Path, index: CacheIndex, *, codec: str | None = None) -> None:
+        codec = codec or default_codec()
+        if codec not in CODEC_SUFFIX or (codec == "zstd" and zstandard is None):
+            raise ValueError(f"Unsupported blob codec: {codec}")
+        self.root = root
+        self.index = index
+        self.codec = codec
+
+    def path_for(self, digest: str, codec: str | None = None) -> Path:
+        return self.root / digest[:2] / f"{digest}{CODEC_SUFFIX[codec or self.codec]}"
+
+    def exists(self, digest: str) -> bool:
+        info = self.index.get_blob(digest)
+        return bool(info) and self.path_for(digest, info["codec"]).exists()
+
+    def put(self, content: bytes) -> str:
+        """Store ``content`` (if new) and return its digest."""
+
+        digest = hashlib.sha256(content).hexdigest()
+        info = self.index.get_blob(digest)
+        if info and self.path_for(digest, info["codec"]).exists():
+            self.index.touch_blob(digest)
+            return digest
+        path = self.path_for(digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        stored = _compress(content, self.codec)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(stored)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self.index.add_blob(digest, codec=self.codec, size=len(content), stored_size=len(stored))
+        return digest
+
+    def read(self, digest: str) -> bytes:
+        info = self.index.get_blob(digest)
+        if info is None:
+            raise KeyError(digest)
+        data = self.path_for(digest, info["codec"]).read_bytes()
+        self.index.touch_blob(digest)
+        return _decompress(data, info["codec"])
+
+    def _remove(self, info: dict) -> None:
+        self.index.drop_blob(info["digest"])
+        self.path_for(info["digest"], info["codec"]).unlink(missing_ok=True)
+
+    def gc(self, max_bytes: int | None = None, *, grace: float = ORPHAN_GRACE_SECONDS) -> dict[str, int]:
+        """Drop unreferenced blobs, then evict least recently used ones.
+
+        Orphans stored or reused within the last ``grace`` seconds are kept:
+        a concurrent fetch may be about to reference them. Eviction stops
+        once the stored (compressed) size fits ``max_bytes``. Evicting a blob
+        forgets the URLs that pointed at it, so those sources are simply
+        downloaded again on their next fetch.
+        """
+
+        removed = evicted = freed = 0
+        cutoff = time.time() - grace
+        survivors: list[dict] = []
+        for info in self.index.blobs_by_access():
+            if info["refcount"] <= 0 and self.index.drop_orphan_blob(info["digest"], accessed_before=cutoff):
+                self.path_for(info["digest"], info["codec"]).unlink(missing_ok=True)
+                removed += 1
+                freed += info["stored_size"]
+            elif info["refcount"] > 0:
+                survivors.append(info)
+        total = sum(info["stored_size"] for info in survivors)
+        if max_bytes is not None:
+            for info in survivors:
+                if total <= max_bytes:
+                    break
+                self._remove(info)
+                evicted += 1
+                total -= info["stored_size"]
+                freed += info["stored_size"]
+        return {"orphans_removed": removed, "evicted": evicted, "bytes_freed": freed, "stored_bytes": total}
+
+    def stats(self) -> dict[str, int | str]:
+        return {**self.index.stats(), "codec": self.codec}
+
+
+__all__ = ["BlobStore", "default_codec", "parse_size"]
@@ -0,0 +1,267 @@
+"""SQLite-backed URL index for the HTTP cache."""
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+from .sqlite_store import SQLiteStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    url TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    response_headers TEXT NOT NULL DEFAULT '{}',
+    updated_at REAL NOT NULL,
+    blob TEXT
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    codec TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL,
+    refcount INTEGER NOT NULL DEFAULT 0,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS blobs_by_access ON blobs (last_access);
+CREATE TABLE IF NOT EXISTS hosts (
+    host TEXT PRIMARY KEY,
+    failures INTEGER NOT NULL DEFAULT 0,
+    opened_until REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+ENTRY_COLUMNS = ("filename", "etag", "last_modified", "response_headers", "updated_at", "blob")
+BLOB_COLUMNS = ("digest", "codec", "size", "stored_size", "refcount", "last_access")
+
+
+class CacheIndex(SQLiteStore):
+    """Per-URL cache metadata with indexed single-row lookups and upserts.
+
+    Every write is its own short transaction, which keeps concurrent runs
+    from losing each other's entries.
+    """
+
+    SCHEMA = SCHEMA
+
+    def __init__(self, path: Path, *, legacy_json: Path | None = None) -> None:
+        super().__init__(path)
+        conn = self._conn()
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(entries)")}
+        if "blob" not in columns:
+            conn.execute("ALTER TABLE entries ADD COLUMN blob TEXT")
+        if legacy_json is not None:
+            self.migrate_json(legacy_json)
+
+    def get(self, url: str) -> dict[str, Any] | None:
+        row = self._conn().execute(
+            "SELECT filename, etag, last_modified, response_headers, updated_at, blob FROM entries WHERE url = ?",
+            (url,),
+        ).fetchone()
+        if row is None:
+            return None
+        entry = dict(zip(ENTRY_COLUMNS, row))
+        entry["response_headers"] = json.loads(entry["response_headers"] or "{}")
+        return entry
+
+    def put(self, url: str, entry: dict[str, Any]) -> None:
+        """Upsert ``url`` and move its blob reference in the same transaction."""
+
+        with self.transaction() as conn:
+            row = conn.execute("SELECT blob FROM entries WHERE url = ?", (url,)).fetchone()
+            previous_blob = row[0] if row else None
+            new_blob = entry.get("blob")
+            conn.execute(
+                """
+                INSERT INTO entries (url, filename, etag, last_modified, response_headers, updated_at, blob)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    filename = excluded.filename,
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    response_headers = excluded.response_headers,
+                    updated_at = excluded.updated_at,
+                    blob = excluded.blob
+                """,
+                (
+                    url,
+                    entry["filename"],
+                    entry.get("etag"),
+                    entry.get("last_modified"),
+                    json.dumps(entry.get("response_headers") or {}),
+                    entry.get("updated_at") or time.time(),
+                    new_blob,
+                ),
+            )
+            if previous_blob != new_blob:
+                if previous_blob:
+                    conn.execute("UPDATE blobs SET refcount = refcount - 1 WHERE digest = ?", (previous_blob,))
+                if new_blob:
+                    conn.execute("UPDATE blobs SET refcount = refcount + 1 WHERE digest = ?", (new_blob,))
+
+    def touch(self, url: str, response_headers: dict[str, Any]) -> None:
+        """Record a successful revalidation (304) and its refreshed headers.
+
+        A 304 may carry a new ``ETag`` or ``Last-Modified``; those replace the
+        stored validators, which are kept when the 304 omits them.
+        """
+
+        lowered = {name.lower(): value for name, value in response_headers.items()}
+        self._conn().execute(
+            """
+            UPDATE entries SET
+                response_headers = ?,
+                etag = COALESCE(?, etag),
+                last_modified = COALESCE(?, last_modified),
+                updated_at = ?
+            WHERE url = ?
+            """,
+            (json.dumps(response_headers), lowered.get("etag"), lowered.get("last-modified"), time.time(), url),
+        )
+
+    def delete(self, url: str) -> None:
+        with self.transaction() as conn:
+            row = conn.execute("SELECT blob FROM entries WHERE url = ?", (url,)).fetchone()
+            conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+            if row and row[0]:
+                conn.execute("UPDATE blobs SET refcount = refcount - 1 WHERE digest = ?", (row[0],))
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def add_blob(self, digest: str, *, codec: str, size: int, stored_size: int) -> None:
+        self._conn().execute(
+            """
+            INSERT INTO blobs (digest, codec, size, stored_size, refcount, last_access)
+            VALUES (?, ?, ?, ?, 0, ?)
+            ON CONFLICT(digest) DO UPDATE SET last_access = excluded.last_access
+            """,
+            (digest, codec, size, stored_size, time.time()),
+        )
+
+    def get_blob(self, digest: str) -> dict[str, Any] | None:
+        row = self._conn().execute(
+            "SELECT digest, codec, size, stored_size, refcount, last_access FROM blobs WHERE digest = ?",
+            (digest,),
+        ).fetchone()
+        return dict(zip(BLOB_COLUMNS, row)) if row else None
+
+    def touch_blob(self, digest: str) -> None:
+        self._conn().execute("UPDATE blobs SET last_access = ? WHERE digest = ?", (time.time(), digest))
+
+    def blobs_by_access(self) -> list[dict[str, Any]]:
+        """All blobs, least recently used first."""
+
+        rows = self._conn().execute(
+            "SELECT digest, codec, size, stored_size, refcount, last_access FROM blobs ORDER BY last_access"
+        ).fetchall()
+        return [dict(zip(BLOB_COLUMNS, row)) for row in rows]
+
+    def drop_blob(self, digest: str) -> int:
+        """Forget a blob and every URL entry pointing at it; returns entries dropped.
+
+        Dropped URLs lose their validators too, so the next fetch is a plain
+        GET rather than a conditional request that could 304 onto nothing.
+        """
+
+        with self.transaction() as conn:
+            dropped = conn.execute("DELETE FROM entries WHERE blob = ?", (digest,)).rowcount
+            conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+        return dropped
+
+    def drop_orphan_blob(self, digest: str, *, accessed_before: float) -> bool:
+        """Forget a blob only if it is still unreferenced and was last used before ``accessed_before``.
+
+        The check and the delete share one statement, so a URL row that
+        started referencing the blob since the caller looked keeps it alive.
+        """
+
+        deleted = self._conn().execute(
+            "DELETE FROM blobs WHERE digest = ? AND refcount <= 0 AND last_access < ?",
+            (digest, accessed_before),
+        ).rowcount
+        return deleted > 0
+
+    def get_host(self, host: str) -> dict[str, Any] | None:
+        row = self._conn().execute("SELECT failures, opened_until FROM hosts WHERE host = ?", (host,)).fetchone()
+        return {"failures": row[0], "opened_until": row[1]} if row else None
+
+    def put_host(self, host: str, *, failures: int, opened_until: float) -> None:
+        self._conn().execute(
+            """
+            INSERT INTO hosts (host, failures, opened_until) VALUES (?, ?, ?)
+            ON CONFLICT(host) DO UPDATE SET failures = excluded.failures, opened_until = excluded.opened_until
+            """,
+            (host, failures, opened_until),
+        )
+
+    def legacy_filenames(self) -> set[str]:
+        """Per-URL body files from before the blob store that are still referenced."""
+
+        rows = self._conn().execute("SELECT filename FROM entries WHERE blob IS NULL").fetchall()
+        return {row[0] for row in rows}
+
+    def stats(self) -> dict[str, int]:
+        conn = self._conn()
+        entries, legacy = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(blob IS NULL), 0) FROM entries"
+        ).fetchone()
+        blobs, size, stored, orphans = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0), COALESCE(SUM(refcount <= 0), 0) FROM blobs"
+        ).fetchone()
+        return {
+            "entries": entries,
+            "legacy_entries": legacy,
+            "blobs": blobs,
+            "orphan_blobs": orphans,
+            "content_bytes": size,
+            "stored_bytes": stored,
+        }
+
+    def migrate_json(self, legacy_json: Path) -> int:
+        """Import a legacy ``index.json`` once, then rename it out of the way.
+
+        Runs inside ``BEGIN IMMEDIATE`` so two processes starting together do
+        not both import. Existing SQLite rows win over legacy entries.
+        Migrated rows get ``updated_at = 0``: the legacy index never recorded
+        when a body was stored, so each one is revalidated on first use.
+        """
+
+        if not legacy_json.exists():
+            return 0
+        with self.transaction() as conn:
+            done = conn.execute("SELECT value FROM meta WHERE key = 'migrated_json'").fetchone()
+            if done or not legacy_json.exists():
+                return 0
+            legacy: dict[str, dict[str, Any]] = json.loads(legacy_json.read_text() or "{}")
+            conn.executemany(
+                """
+                INSERT OR IGNORE INTO entries (url, filename, etag, last_modified, response_headers, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        url,
+                        entry["filename"],
+                        entry.get("etag"),
+                        entry.get("last_modified"),
+                        json.dumps(entry.get("response_headers") or {}),
+                        0.0,
+                    )
+                    for url, entry in legacy.items()
+                    if entry.get("filename")
+                ],
+            )
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_json', ?)", (str(legacy_json),))
+        legacy_json.replace(legacy_json.with_name(legacy_json.name + ".migrated"))
+        return len(legacy)
+
+
+__all__ = ["CacheIndex"]
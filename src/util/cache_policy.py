@@ -0,0 +1,158 @@
+"""Freshness rules and per-run statistics for the HTTP cache."""
+from __future__ import annotations
+
+import re
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Mapping
+
+DURATION_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhdw]?)\s*$", re.IGNORECASE)
+DURATION_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+class OfflineCacheMiss(LookupError):
+    """Raised in offline mode when a URL has never been cached."""
+
+
+@dataclass
+class CachePolicy:
+    """Run-wide cache behaviour.
+
+    ``offline`` serves everything from ``data/cache`` and never touches the
+    network. ``max_stale`` (seconds) lets entries past their freshness
+    lifetime be served without revalidation, like ``Cache-Control:
+    max-stale`` on the request side.
+    """
+
+    offline: bool = False
+    max_stale: float | None = None
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    stale: int = 0
+    revalidated: int = 0
+    misses: int = 0
+    offline_misses: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, kind: str) -> None:
+        with self._lock:
+            setattr(self, kind, getattr(self, kind) + 1)
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "stale": self.stale,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "offline_misses": self.offline_misses,
+        }
+
+
+def parse_duration(value: Any) -> float | None:
+    """Parse ``3600``, ``"90m"``, ``"6h"`` or ``"2d"`` into seconds."""
+
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = DURATION_RE.match(str(value))
+    if not match:
+        raise ValueError(f"Unrecognised duration: {value!r}")
+    amount, unit = match.groups()
+    return float(amount) * DURATION_UNITS[unit.lower()]
+
+
+def _header(headers: Mapping[str, Any], name: str) -> str | None:
+    lowered = name.lower()
+    for key, value in headers.items():
+        if key.lower() == lowered:
+            return str(value)
+    return None
+
+
+def cache_control(headers: Mapping[str, Any]) -> dict[str, str | None]:
+    directives: dict[str, str | None] = {}
+    raw = _header(headers, "Cache-Control") or ""
+    for part in raw.split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') if value else None
+    return directives
+
+
+def freshness_lifetime(headers: Mapping[str, Any], *, stored_at: float | None = None) -> float:
+    """Seconds a stored response stays fresh per RFC 9111 (shared-cache view).
+
+    Responses without explicit freshness information get zero, so they are
+    always revalidated — the pre-policy behaviour.
+    """
+
+    directives = cache_control(headers)
+    if "no-store" in directives or "no-cache" in directives:
+        return 0.0
+    for name in ("s-maxage", "max-age"):
+        if directives.get(name):
+            try:
+                return max(float(directives[name]), 0.0)
+            except ValueError:
+                return 0.0
+    expires = _header(headers, "Expires")
+    if expires:
+        date_header = _header(headers, "Date")
+        if not date_header and stored_at is None:
+            return 0.0
+        try:
+            expires_at = parsedate_to_datetime(expires)
+            if date_header:
+                served_at = parsedate_to_datetime(date_header)
+            else:
+                served_at = datetime.fromtimestamp(stored_at, timezone.utc)
+            return max((expires_at - served_at).total_seconds(), 0.0)
+        except (TypeError, ValueError):
+            return 0.0
+    return 0.0
+
+
+def initial_age(headers: Mapping[str, Any], *, response_time: float | None = None) -> float:
+    """The corrected initial age of a response (RFC 9111 §4.2.3).
+
+    The larger of the ``Age`` header and the apparent age,
+    ``max(0, response_time - date_value)``, which catches upstream caches
+    that serve old copies without sending ``Age``. The request time is not
+    stored, so the response delay is taken as zero.
+    """
+
+    try:
+        age_value = max(float(_header(headers, "Age") or 0), 0.0)
+    except ValueError:
+        age_value = 0.0
+    date_header = _header(headers, "Date")
+    if response_time is None or not date_header:
+        return age_value
+    try:
+        date_value = parsedate_to_datetime(date_header).timestamp()
+    except (TypeError, ValueError):
+        return age_value
+    return max(age_value, response_time - date_value, 0.0)
+
+
+def must_revalidate(headers: Mapping[str, Any]) -> bool:
+    directives = cache_control(headers)
+    return "must-revalidate" in directives or "proxy-revalidate" in directives
+
+
+__all__ = [
+    "CachePolicy",
+    "CacheStats",
+    "OfflineCacheMiss",
+    "cache_control",
+    "freshness_lifetime",
+    "initial_age",
+    "must_revalidate",
+    "parse_duration",
+]
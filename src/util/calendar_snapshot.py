@@ -0,0 +1,131 @@
+"""Binary snapshot of the busy intervals loaded from a calendar export.
+
+Expanding a multi-year personal export is the slow part of loading
+availability, and the export rarely changes between runs. The normalized
+entries for one planning window are packed into a small binary file next
+to the other caches and reused while the export is unchanged.
+
+The stored window is wider than one run needs (``SNAPSHOT_SLACK_DAYS``
+past the horizon), so the next day's run, whose window has moved on by a
+day, still falls inside it. Any snapshot whose window covers the requested
+one is used, and its entries are trimmed to that window on read.
+
+The header records the export's mtime, size and SHA-256 along with the
+window's first and last day. A matching mtime and size is trusted without
+reading the export. Otherwise the export is hashed, and a matching digest
+(a touched but unchanged file) still reuses the snapshot. Entries follow
+as fixed-width records — start and end as POSIX seconds, a flags byte —
+each followed by its UTF-8 summary.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import struct
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from .timez import DEFAULT_TIMEZONE
+
+MAGIC = b"SFCAL\x00\x00\x01"
+HEADER = struct.Struct("<8sqq32siiI")
+RECORD = struct.Struct("<qqBH")
+FLAG_TRANSPARENT = 1
+MAX_SUMMARY_BYTES = 0xFFFF
+# Days stored past the requested window, so daily runs keep reusing one snapshot.
+SNAPSHOT_SLACK_DAYS = 7
+
+
+def snapshot_path(directory: Path, source: Path) -> Path:
+    """Where the snapshot for ``source`` lives; one per export path."""
+
+    name = hashlib.sha256(str(source.resolve()).encode("utf-8")).hexdigest()[:16]
+    return directory / f"calendar-{name}.bin"
+
+
+def file_digest(path: Path) -> bytes:
+    return hashlib.sha256(path.read_bytes()).digest()
+
+
+def entries_in_window(entries: list[dict], first: date, last: date) -> list[dict]:
+    """The entries touching the days ``[first, last]``."""
+
+    start = datetime.combine(first, datetime.min.time(), DEFAULT_TIMEZONE)
+    end = datetime.combine(last + timedelta(days=1), datetime.min.time(), DEFAULT_TIMEZONE)
+    return [entry for entry in entries if entry["start"] < end and entry["end"] > start]
+
+
+def read_snapshot(path: Path, source: Path, first: date, last: date) -> list[dict] | None:
+    """Entries for ``source`` in the ``[first, last]`` window, or ``None`` when stale, missing or too narrow."""
+
+    try:
+        data = path.read_bytes()
+        magic, mtime_ns, size, digest, first_day, last_day, count = HEADER.unpack_from(data)
+    except (OSError, struct.error):
+        return None
+    if magic != MAGIC or first_day > first.toordinal() or last_day < last.toordinal():
+        return None
+    stat = source.stat()
+    if (stat.st_mtime_ns, stat.st_size) != (mtime_ns, size):
+        if stat.st_size != size or file_digest(source) != digest:
+            return None
+        # Same bytes under a new mtime: refresh the header so the next run skips the hash.
+        _write_header(path, data, stat.st_mtime_ns)
+
+    entries: list[dict] = []
+    offset = HEADER.size
+    try:
+        for _ in range(count):
+            start, end, flags, length = RECORD.unpack_from(data, offset)
+            offset += RECORD.size
+            summary = data[offset:offset + length].decode("utf-8")
+            offset += length
+            entries.append(
+                {
+                    "start": datetime.fromtimestamp(start, DEFAULT_TIMEZONE),
+                    "end": datetime.fromtimestamp(end, DEFAULT_TIMEZONE),
+                    "summary": summary,
+                    "transparent": bool(flags & FLAG_TRANSPARENT),
+                }
+            )
+    except (struct.error, UnicodeDecodeError):
+        return None
+    return entries_in_window(entries, first, last)
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _write_header(path: Path, data: bytes, mtime_ns: int) -> None:
+    magic, _, size, digest, first_day, last_day, count = HEADER.unpack_from(data)
+    header = HEADER.pack(magic, mtime_ns, size, digest, first_day, last_day, count)
+    _atomic_write(path, header + data[HEADER.size:])
+
+
+def write_snapshot(path: Path, source: Path, first: date, last: date, entries: list[dict], *, digest: bytes) -> None:
+    """Store ``entries`` for ``source`` (whose bytes hash to ``digest``) and the window."""
+
+    stat = source.stat()
+    parts = [HEADER.pack(MAGIC, stat.st_mtime_ns, stat.st_size, digest, first.toordinal(), last.toordinal(), len(entries))]
+    for entry in entries:
+        summary = str(entry.get("summary", "")).encode("utf-8")
+        if len(summary) > MAX_SUMMARY_BYTES:
+            summary = summary[:MAX_SUMMARY_BYTES].decode("utf-8", "ignore").encode("utf-8")
+        flags = FLAG_TRANSPARENT if entry.get("transparent") else 0
+        parts.append(RECORD.pack(int(entry["start"].timestamp()), int(entry["end"].timestamp()), flags, len(summary)))
+        parts.append(summary)
+    _atomic_write(path, b"".join(parts))
+
+
+__all__ = [
+    "SNAPSHOT_SLACK_DAYS",
+    "entries_in_window",
+    "file_digest",
+    "read_snapshot",
+    "snapshot_path",
+    "write_snapshot",
+]
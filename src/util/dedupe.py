@@ -1,41 +1,55 @@
 """Deduplication helpers for event lists."""
 from __future__ import annotations
 
-import json
 from pathlib import Path
 from typing import Iterable, Tuple
 
+from .near_dupes import collapse_near_duplicates
+from .registry_store import REGISTRY_RETENTION_DAYS, open_registry
 from .uid import generate_uid, normalize
 
 
-def load_registry(path: Path) -> dict[str, dict]:
-    if path.exists():
-        return json.loads(path.read_text())
-    return {}
+def dedupe_events(
+    events: Iterable[dict],
+    registry_path: Path,
+    *,
+    retention_days: float = REGISTRY_RETENTION_DAYS,
+    near_dup_threshold: float | None = None,
+) -> Tuple[list[dict], list[dict]]:
+    """Return (unique_events, duplicates) updating the registry.
 
+    ``registry_path`` names the legacy JSON registry; the entries live in the
+    SQLite store beside it (see :mod:`util.registry_store`). Entries neither
+    started nor scraped within ``retention_days`` are pruned once the run's
+    UIDs are recorded.
 
-def save_registry(path: Path, registry: dict[str, dict]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(registry, indent=2, sort_keys=True))
+    With ``near_dup_threshold`` set, same-day events whose title and venue
+    are that similar are merged too (see :mod:`util.near_dupes`); those
+    duplicates carry ``duplicate_of`` and ``similarity``.
+    """
 
-
-def dedupe_events(events: Iterable[dict], registry_path: Path) -> Tuple[list[dict], list[dict]]:
-    """Return (unique_events, duplicates) updating the registry file."""
-
-    registry = load_registry(registry_path)
-    unique: dict[str, dict] = {}
-    duplicates: list[dict] = []
+    events = list(events)
     for event in events:
-        uid = event.get("uid") or generate_uid(event.get("title"), event.get("start_local"), event.get("url") or event.get("location"))
-        event["uid"] = uid
-        if uid in unique:
-            duplicates.append(event)
-            continue
-        if uid in registry:
-            duplicates.append(event)
-            continue
-        unique[uid] = event
-        registry[uid] = {"first_seen": event.get("start_local")}
+        event["uid"] = event.get("uid") or generate_uid(
+            event.get("title"), event.get("start_local"), event.get("url") or event.get("location")
+        )
+
+    registry = open_registry(registry_path)
+    try:
+        known = registry.known(event["uid"] for event in events)
+        registry.mark_seen(known)
+        unique: dict[str, dict] = {}
+        duplicates: list[dict] = []
+        for event in events:
+            uid = event["uid"]
+            if uid in unique or uid in known:
+                duplicates.append(event)
+                continue
+            unique[uid] = event
+        registry.add((uid, event.get("start_local")) for uid, event in unique.items())
+        registry.prune(retention_days)
+    finally:
+        registry.close()
     unique_events = list(unique.values())
 
     # Collapse near-duplicates that share title/date/location even if the UID differs
@@ -57,7 +71,9 @@ def dedupe_events(events: Iterable[dict], registry_path: Path) -> Tuple[list[dic
 
     deduped_events = list(by_similarity.values())
     duplicates.extend(same_day_duplicates)
-    save_registry(registry_path, registry)
+    if near_dup_threshold:
+        deduped_events, near_duplicates = collapse_near_duplicates(deduped_events, threshold=near_dup_threshold)
+        duplicates.extend(near_duplicates)
     return deduped_events, duplicates
 
 
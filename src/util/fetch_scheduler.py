@@ -0,0 +1,217 @@
+"""Per-host politeness for the fetch layer: rate limits, retries, circuit breaking."""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Callable, Protocol
+
+import httpx
+
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+
+class HostCircuitOpen(RuntimeError):
+    """Raised instead of requesting a host whose breaker is open."""
+
+
+class BreakerStateStore(Protocol):
+    def get_host(self, host: str) -> dict | None: ...
+
+    def put_host(self, host: str, *, failures: int, opened_until: float) -> None: ...
+
+
+@dataclass
+class SchedulerConfig:
+    rate_per_second: float = 2.0
+    burst: int = 4
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_cap: float = 30.0
+    max_retry_after: float = 120.0
+    breaker_threshold: int = 5
+    breaker_cooldown: float = 15 * 60.0
+
+
+class TokenBucket:
+    """Classic token bucket; ``acquire`` blocks until a token is available."""
+
+    def __init__(self, rate: float, burst: int, *, clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep) -> None:
+        self.rate = rate
+        self.capacity = float(max(burst, 1))
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller for ``seconds`` (used for host-wide ``Retry-After``)."""
+
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = self._clock()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self.tokens >= 1.0:
+                        self.tokens -= 1.0
+                        return
+                    wait = (1.0 - self.tokens) / self.rate
+            self._sleep(wait)
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a half-open trial after the cooldown.
+
+    State is loaded from and written back to ``store`` so a host that was
+    dead at the end of last night's run is not hammered again at the start
+    of tonight's.
+    """
+
+    def __init__(self, host: str, config: SchedulerConfig, store: BreakerStateStore | None, *, clock: Callable[[], float] = time.time) -> None:
+        self.host = host
+        self.config = config
+        self.store = store
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._trial_in_flight = False
+        saved = store.get_host(host) if store is not None else None
+        self.failures = saved["failures"] if saved else 0
+        self.opened_until = saved["opened_until"] if saved else 0.0
+
+    def _save(self) -> None:
+        if self.store is not None:
+            self.store.put_host(self.host, failures=self.failures, opened_until=self.opened_until)
+
+    def before_request(self) -> None:
+        with self._lock:
+            if self.failures < self.config.breaker_threshold:
+                return
+            if self._clock() < self.opened_until or self._trial_in_flight:
+                raise HostCircuitOpen(f"{self.host} circuit open after {self.failures} consecutive failures")
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._trial_in_flight = False
+            if self.failures or self.opened_until:
+                self.failures = 0
+                self.opened_until = 0.0
+                self._save()
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._trial_in_flight = False
+            self.failures += 1
+            if self.failures >= self.config.breaker_threshold:
+                self.opened_until = self._clock() + self.config.breaker_cooldown
+            self._save()
+
+
+def retry_after_seconds(response: httpx.Response, *, now: float | None = None) -> float | None:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(when.timestamp() - (now if now is not None else time.time()), 0.0)
+
+
+class FetchScheduler:
+    """Run requests through per-host buckets, retries and breakers."""
+
+    def __init__(
+        self,
+        config: SchedulerConfig | None = None,
+        store: BreakerStateStore | None = None,
+        *,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.config = config or SchedulerConfig()
+        self.store = store
+        self._sleep = sleep
+        self._buckets: dict[str, TokenBucket] = {}
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.config.rate_per_second, self.config.burst, sleep=self._sleep)
+            return self._buckets[host]
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(host, self.config, self.store)
+            return self._breakers[host]
+
+    def _backoff(self, attempt: int) -> float:
+        ceiling = min(self.config.backoff_cap, self.config.backoff_base * (2**attempt))
+        return random.uniform(0, ceiling)
+
+    def request(self, host: str, send: Callable[[], httpx.Response]) -> httpx.Response:
+        """Call ``send`` politely for ``host``.
+
+        429/502/503/504 and transport errors are retried with full-jitter
+        exponential backoff, or after ``Retry-After`` when the server sends
+        one (which also pauses other requests to that host). Only exhausted
+        retries count against the breaker; ordinary 4xx answers do not.
+        """
+
+        breaker = self.breaker(host)
+        bucket = self.bucket(host)
+        breaker.before_request()
+        attempt = 0
+        while True:
+            bucket.acquire()
+            last_attempt = attempt >= self.config.max_retries
+            try:
+                response = send()
+            except httpx.TransportError:
+                if last_attempt:
+                    breaker.record_failure()
+                    raise
+                self._sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+            if response.status_code not in RETRY_STATUSES:
+                breaker.record_success()
+                return response
+            if last_attempt:
+                breaker.record_failure()
+                return response
+            delay = retry_after_seconds(response)
+            if delay is not None:
+                # The bucket holds every caller for this host, not just us.
+                bucket.pause(min(delay, self.config.max_retry_after))
+            else:
+                self._sleep(self._backoff(attempt))
+            attempt += 1
+
+
+__all__ = [
+    "CircuitBreaker",
+    "FetchScheduler",
+    "HostCircuitOpen",
+    "RETRY_STATUSES",
+    "SchedulerConfig",
+    "TokenBucket",
+    "retry_after_seconds",
+]
@@ -0,0 +1,119 @@
+"""Minute-resolution free/busy map of the personal calendar.
+
+The availability summary used to compare each busy block's hour and minute
+with the evening window of the day it *started*, so blocks spanning midnight
+or several days were judged on the wrong day (an all-day entry ending at
+00:00 never counted at all), and the planner never looked at the calendar.
+:class:`FreeBusy` rasterises busy blocks into one bitmask per local day —
+bit ``m`` set means minute ``m`` after midnight is busy — so a block is
+split at each midnight it crosses, and "is ``[start, end)`` free" is one
+AND per day touched.
+
+Python ints serve as the 1440-bit masks: ORing a block in and testing a
+query are a couple of big-int operations, and a year of calendar entries
+builds in milliseconds. Times are converted to ``DEFAULT_TIMEZONE`` and
+read off the wall clock; busy blocks are widened and queries rounded out to
+whole minutes.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Iterator
+from zoneinfo import ZoneInfo
+
+from .time_windows import MINUTES_PER_DAY, minute_of_day
+from .timez import DEFAULT_TIMEZONE, ensure_timezone
+
+
+def _span_mask(first: int, last: int) -> int:
+    """Bits ``first`` … ``last - 1`` set."""
+
+    return ((1 << (last - first)) - 1) << first
+
+
+class FreeBusy:
+    """Per-day minute bitmasks of busy time."""
+
+    def __init__(self, busy: Iterable[tuple[datetime, datetime]] = (), *, tz: ZoneInfo = DEFAULT_TIMEZONE) -> None:
+        self.tz = tz
+        self._days: dict[date, int] = {}
+        for start, end in busy:
+            self.add_busy(start, end)
+
+    @classmethod
+    def from_calendar_events(cls, events: Iterable[dict], *, tz: ZoneInfo = DEFAULT_TIMEZONE) -> "FreeBusy":
+        """Busy blocks from :func:`availability.load_calendar_events`, skipping ``TRANSP:TRANSPARENT`` entries."""
+
+        return cls(((event["start"], event["end"]) for event in events if not event.get("transparent")), tz=tz)
+
+    def at(self, day: date, minute: int) -> datetime:
+        """The local datetime ``minute`` minutes after midnight on ``day`` (1440 is the next midnight)."""
+
+        days, minute = divmod(minute, MINUTES_PER_DAY)
+        return datetime.combine(day + timedelta(days=days), time(minute // 60, minute % 60), tzinfo=self.tz)
+
+    def _pieces(self, start: datetime, end: datetime) -> Iterator[tuple[date, int, int]]:
+        """``[start, end)`` split at local midnights into ``(day, first_minute, end_minute)``."""
+
+        start = ensure_timezone(start, self.tz)
+        end = ensure_timezone(end, self.tz)
+        if end <= start:
+            return
+        day, first = start.date(), minute_of_day(start)
+        last_day = end.date()
+        last = minute_of_day(end) + (1 if end.second or end.microsecond else 0)
+        while day < last_day:
+            yield day, first, MINUTES_PER_DAY
+            day, first = day + timedelta(days=1), 0
+        if first < last:
+            yield day, first, last
+
+    def add_busy(self, start: datetime, end: datetime) -> None:
+        for day, first, last in self._pieces(start, end):
+            self._days[day] = self._days.get(day, 0) | _span_mask(first, last)
+
+    def is_free(self, start: datetime, end: datetime) -> bool:
+        """Whether no busy minute falls in ``[start, end)``."""
+
+        return not any(
+            self._days.get(day, 0) & _span_mask(first, last) for day, first, last in self._pieces(start, end)
+        )
+
+    def busy_mask(self, day: date) -> int:
+        return self._days.get(day, 0)
+
+    def free_minutes(self, day: date, window: tuple[int, int] = (0, MINUTES_PER_DAY)) -> int:
+        """Free minutes on ``day`` within the ``[first, last)`` minute-of-day ``window``."""
+
+        first, last = window
+        if last <= first:
+            return 0
+        return (last - first) - (self._days.get(day, 0) & _span_mask(first, last)).bit_count()
+
+    def free_slots(self, start: datetime, end: datetime, *, min_minutes: int = 1) -> list[tuple[datetime, datetime]]:
+        """Maximal free ``(start, end)`` runs within ``[start, end)`` lasting at least ``min_minutes``.
+
+        Runs are joined across midnight, so a free night is one slot.
+        """
+
+        slots: list[list[datetime]] = []
+        for day, first, last in self._pieces(start, end):
+            free = ~self._days.get(day, 0) & _span_mask(first, last)
+            while free:
+                low = (free & -free).bit_length() - 1
+                run = free >> low
+                length = (~run & (run + 1)).bit_length() - 1
+                free &= ~_span_mask(low, low + length)
+                slot_start, slot_end = self.at(day, low), self.at(day, low + length)
+                if slots and slots[-1][1] == slot_start:
+                    slots[-1][1] = slot_end
+                else:
+                    slots.append([slot_start, slot_end])
+        return [
+            (slot_start, slot_end)
+            for slot_start, slot_end in slots
+            if slot_end - slot_start >= timedelta(minutes=min_minutes)
+        ]
+
+
+__all__ = ["FreeBusy"]
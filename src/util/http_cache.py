@@ -1,16 +1,49 @@
 """HTTP helper with light-weight conditional request caching."""
 from __future__ import annotations
 
+import atexit
 import hashlib
-import json
+import re
+import threading
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 import httpx
 
+from .blob_store import BlobStore
+from .cache_index import CacheIndex
+from .fetch_scheduler import FetchScheduler, HostCircuitOpen, SchedulerConfig
+from .cache_policy import (
+    CachePolicy,
+    CacheStats,
+    OfflineCacheMiss,
+    freshness_lifetime,
+    initial_age,
+    must_revalidate,
+    parse_duration,
+)
+
 CACHE_DIR = Path("data/cache")
+INDEX_DB_NAME = "index.sqlite3"
+# Legacy whole-file index; imported into SQLite on first use.
 INDEX_FILE = CACHE_DIR / "index.json"
+BLOB_DIR_NAME = "blobs"
+# None picks zstd when installed, else gzip; "none" stores bodies uncompressed.
+BLOB_CODEC: str | None = None
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+LEGACY_BODY_RE = re.compile(r"^[0-9a-f]{64}$")
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Pool sizing for the shared client. Many sources live on the same host
+# (events.umich.edu), so keep-alive connections are reused across sources.
+MAX_CONNECTIONS = 32
+MAX_KEEPALIVE_CONNECTIONS = 16
+KEEPALIVE_EXPIRY = 30.0
+MAX_CONNECTIONS_PER_HOST = 6
 
 
 @dataclass
@@ -19,49 +52,318 @@ class CachedFetch:
     headers: dict[str, Any]
     from_cache: bool
     status_code: int
+    digest: str | None = None
+
 
+@dataclass
+class TransportConfig:
+    max_connections: int = MAX_CONNECTIONS
+    max_keepalive_connections: int = MAX_KEEPALIVE_CONNECTIONS
+    keepalive_expiry: float = KEEPALIVE_EXPIRY
+    max_per_host: int = MAX_CONNECTIONS_PER_HOST
+    http2: bool = False
 
-def _load_index() -> dict[str, dict[str, Any]]:
-    if INDEX_FILE.exists():
-        return json.loads(INDEX_FILE.read_text())
-    return {}
 
+_transport_config = TransportConfig()
+_client: httpx.Client | None = None
+_client_lock = threading.Lock()
+_host_slots: dict[str, threading.BoundedSemaphore] = {}
+_indexes: dict[Path, CacheIndex] = {}
+_blob_stores: dict[Path, BlobStore] = {}
+_scheduler_config = SchedulerConfig()
+_scheduler: FetchScheduler | None = None
+_index_lock = threading.Lock()
+_policy = CachePolicy()
+_stats = CacheStats()
 
-def _save_index(index: dict[str, dict[str, Any]]) -> None:
-    CACHE_DIR.mkdir(parents=True, exist_ok=True)
-    INDEX_FILE.write_text(json.dumps(index, indent=2, sort_keys=True))
+# Headers a 304 may refresh on the stored response (RFC 9111 §4.3.4).
+REVALIDATION_HEADERS = ("Cache-Control", "Expires", "Date", "Age", "ETag", "Last-Modified")
+
+
+def _http2_supported() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def configure_transport(
+    *,
+    max_connections: int | None = None,
+    max_keepalive_connections: int | None = None,
+    keepalive_expiry: float | None = None,
+    max_per_host: int | None = None,
+    http2: bool | None = None,
+) -> TransportConfig:
+    """Adjust the shared connection pool. Takes effect on the next request.
+
+    HTTP/2 is only enabled when the optional ``h2`` package is installed;
+    otherwise the pool silently stays on HTTP/1.1 keep-alive.
+    """
+
+    global _transport_config
+    close_client()
+    config = _transport_config
+    _transport_config = TransportConfig(
+        max_connections=max_connections or config.max_connections,
+        max_keepalive_connections=max_keepalive_connections or config.max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry if keepalive_expiry is not None else config.keepalive_expiry,
+        max_per_host=max_per_host or config.max_per_host,
+        http2=(http2 if http2 is not None else config.http2) and _http2_supported(),
+    )
+    return _transport_config
+
+
+def get_client() -> httpx.Client:
+    """Return the process-wide pooled client, creating it on first use."""
+
+    global _client
+    with _client_lock:
+        if _client is None or _client.is_closed:
+            config = _transport_config
+            _client = httpx.Client(
+                follow_redirects=True,
+                http2=config.http2,
+                headers={"User-Agent": USER_AGENT},
+                limits=httpx.Limits(
+                    max_connections=config.max_connections,
+                    max_keepalive_connections=config.max_keepalive_connections,
+                    keepalive_expiry=config.keepalive_expiry,
+                ),
+            )
+        return _client
+
+
+def close_client() -> None:
+    """Close pooled connections. Registered with ``atexit``; safe to call twice."""
+
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+        _host_slots.clear()
+
+
+atexit.register(close_client)
+
+
+@contextmanager
+def _host_slot(url: str) -> Iterator[None]:
+    """Cap in-flight requests per host so one busy host cannot drain the pool."""
+
+    host = httpx.URL(url).host
+    with _client_lock:
+        slot = _host_slots.get(host)
+        if slot is None:
+            slot = _host_slots[host] = threading.BoundedSemaphore(_transport_config.max_per_host)
+    with slot:
+        yield
+
+
+def get_index() -> CacheIndex:
+    """Return the URL index for the current ``CACHE_DIR``."""
+
+    path = CACHE_DIR / INDEX_DB_NAME
+    with _index_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = _indexes[path] = CacheIndex(path, legacy_json=INDEX_FILE)
+        return index
+
+
+def get_blob_store() -> BlobStore:
+    """Return the blob store for the current ``CACHE_DIR``."""
+
+    index = get_index()
+    root = CACHE_DIR / BLOB_DIR_NAME
+    with _index_lock:
+        store = _blob_stores.get(root)
+        if store is None or store.index is not index:
+            store = _blob_stores[root] = BlobStore(root, index, codec=BLOB_CODEC)
+        return store
+
+
+def configure_scheduler(**overrides: Any) -> SchedulerConfig:
+    """Override :class:`SchedulerConfig` fields (rate, retries, breaker)."""
 
+    global _scheduler_config, _scheduler
+    with _index_lock:
+        _scheduler_config = SchedulerConfig(**{**_scheduler_config.__dict__, **overrides})
+        _scheduler = None
+    return _scheduler_config
 
-def fetch(url: str, *, timeout: float = 30.0, force_refresh: bool = False) -> CachedFetch:
-    """Fetch a URL with conditional headers based on the cache index."""
+
+def get_scheduler() -> FetchScheduler:
+    """Per-host rate limiter/retry/breaker; breaker state lives in the index DB."""
+
+    global _scheduler
+    index = get_index()
+    with _index_lock:
+        if _scheduler is None or _scheduler.store is not index:
+            _scheduler = FetchScheduler(_scheduler_config, index)
+        return _scheduler
+
+
+def close_index() -> None:
+    global _scheduler
+    with _index_lock:
+        for index in _indexes.values():
+            index.close()
+        _indexes.clear()
+        _blob_stores.clear()
+        _scheduler = None
+
+
+atexit.register(close_index)
+
+
+def configure_cache_policy(*, offline: bool = False, max_stale: float | str | None = None) -> CachePolicy:
+    """Set the run-wide cache policy and reset the per-run statistics."""
+
+    global _policy, _stats
+    _policy = CachePolicy(offline=offline, max_stale=parse_duration(max_stale))
+    _stats = CacheStats()
+    return _policy
+
+
+def cache_stats() -> dict[str, int]:
+    """Hit/miss/revalidate counters since the last ``configure_cache_policy``."""
+
+    return _stats.as_dict()
+
+
+def _has_body(entry: dict[str, Any] | None, store: BlobStore) -> bool:
+    if not entry:
+        return False
+    if entry.get("blob"):
+        return store.exists(entry["blob"])
+    return (CACHE_DIR / entry["filename"]).exists()
+
+
+def _load_body(url: str, entry: dict[str, Any], store: BlobStore) -> tuple[bytes, str]:
+    """Read a cached body, moving pre-blob-store files into the store on the way."""
+
+    if digest := entry.get("blob"):
+        return store.read(digest), digest
+    legacy = CACHE_DIR / entry["filename"]
+    content = legacy.read_bytes()
+    digest = store.put(content)
+    get_index().put(url, {**entry, "blob": digest})
+    legacy.unlink(missing_ok=True)
+    return content, digest
+
+
+def _serve_cached(url: str, entry: dict[str, Any], store: BlobStore, kind: str) -> CachedFetch:
+    content, digest = _load_body(url, entry, store)
+    _stats.record(kind)
+    return CachedFetch(content=content, headers=entry.get("response_headers", {}), from_cache=True, status_code=200, digest=digest)
+
+
+def gc_cache(max_bytes: int | None = None) -> dict[str, int]:
+    """Drop orphaned blobs and stray legacy files, then LRU-evict to the budget."""
+
+    store = get_blob_store()
+    result = store.gc(CACHE_MAX_BYTES if max_bytes is None else max_bytes)
+    referenced = store.index.legacy_filenames()
+    stray = 0
+    for path in CACHE_DIR.iterdir():
+        if path.is_file() and LEGACY_BODY_RE.match(path.name) and path.name not in referenced:
+            path.unlink(missing_ok=True)
+            stray += 1
+    result["legacy_files_removed"] = stray
+    return result
+
+
+def fetch(
+    url: str,
+    *,
+    timeout: float = 30.0,
+    force_refresh: bool = False,
+    ttl: float | str | None = None,
+) -> CachedFetch:
+    """Fetch a URL, serving fresh cache entries without touching the network.
+
+    Network requests go through the per-host scheduler, which may retry
+    429/5xx answers or raise :class:`HostCircuitOpen` for a dead host.
+    Freshness comes from ``ttl`` (a per-source override such as ``"6h"``)
+    or else the stored ``Cache-Control``/``Expires`` headers. Stale entries
+    are revalidated with conditional headers unless the run policy allows
+    serving them (``--max-stale``) or forbids the network (``--offline``).
+    """
 
     CACHE_DIR.mkdir(parents=True, exist_ok=True)
-    index = _load_index()
+    index = get_index()
+    store = get_blob_store()
     entry = index.get(url)
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    }
+    filename = entry.get("filename") if entry else hashlib.sha256(url.encode("utf-8")).hexdigest()
+    cached = _has_body(entry, store)
+
+    if cached and not force_refresh:
+        stored_headers = entry.get("response_headers", {})
+        stored_at = entry.get("updated_at") or 0.0
+        age = time.time() - stored_at + initial_age(stored_headers, response_time=stored_at)
+        override = parse_duration(ttl)
+        lifetime = override if override is not None else freshness_lifetime(stored_headers, stored_at=stored_at)
+        if age <= lifetime:
+            return _serve_cached(url, entry, store, "hits")
+        if _policy.offline:
+            return _serve_cached(url, entry, store, "stale")
+        if _policy.max_stale is not None and age <= lifetime + _policy.max_stale and not must_revalidate(stored_headers):
+            return _serve_cached(url, entry, store, "stale")
+    elif _policy.offline:
+        if cached:
+            return _serve_cached(url, entry, store, "stale")
+        _stats.record("offline_misses")
+        raise OfflineCacheMiss(f"{url} is not in the cache and the run is offline")
+
+    headers: dict[str, str] = {}
     if entry and not force_refresh:
         if etag := entry.get("etag"):
             headers["If-None-Match"] = etag
         if last_modified := entry.get("last_modified"):
             headers["If-Modified-Since"] = last_modified
-    filename = entry.get("filename") if entry else hashlib.sha256(url.encode("utf-8")).hexdigest()
-    path = CACHE_DIR / filename
 
-    with httpx.Client(follow_redirects=True, timeout=timeout) as client:
-        response = client.get(url, headers=headers)
+    client = get_client()
+
+    def send() -> httpx.Response:
+        # A slot per attempt: backoff and Retry-After waits hold none.
+        with _host_slot(url):
+            return client.get(url, headers=headers, timeout=timeout)
+
+    response = get_scheduler().request(httpx.URL(url).host, send)
 
-    if response.status_code == 304 and entry and path.exists():
-        return CachedFetch(content=path.read_bytes(), headers=entry.get("response_headers", {}), from_cache=True, status_code=304)
+    if response.status_code == 304 and cached:
+        refreshed = dict(entry.get("response_headers", {}))
+        for name in REVALIDATION_HEADERS:
+            if name in response.headers:
+                refreshed = {key: value for key, value in refreshed.items() if key.lower() != name.lower()}
+                refreshed[name.lower()] = response.headers[name]
+        content, digest = _load_body(url, entry, store)
+        index.touch(url, refreshed)
+        _stats.record("revalidated")
+        return CachedFetch(content=content, headers=refreshed, from_cache=True, status_code=304, digest=digest)
 
     response.raise_for_status()
-    path.write_bytes(response.content)
-    index[url] = {
-        "filename": filename,
-        "etag": response.headers.get("ETag"),
-        "last_modified": response.headers.get("Last-Modified"),
-        "response_headers": dict(response.headers),
-    }
-    _save_index(index)
-    return CachedFetch(content=response.content, headers=dict(response.headers), from_cache=False, status_code=response.status_code)
+    digest = store.put(response.content)
+    index.put(
+        url,
+        {
+            "filename": filename,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "response_headers": dict(response.headers),
+            "blob": digest,
+        },
+    )
+    if entry and not entry.get("blob"):
+        (CACHE_DIR / filename).unlink(missing_ok=True)
+    _stats.record("misses")
+    return CachedFetch(
+        content=response.content,
+        headers=dict(response.headers),
+        from_cache=False,
+        status_code=response.status_code,
+        digest=digest,
+    )
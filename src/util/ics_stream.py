@@ -0,0 +1,322 @@
+"""Horizon-bounded, streaming VEVENT reader with recurrence expansion.
+
+``Calendar.from_ical`` builds a component tree for every VEVENT in a feed,
+including years of history on big institutional calendars. This module
+instead scans the raw bytes for ``BEGIN:VEVENT``/``END:VEVENT`` blocks,
+throws away blocks whose DTSTART/DTEND/UNTIL put them clearly outside the
+window (a text-level check with a day of slack for time zones), and parses
+the survivors in small batches alongside the feed's VTIMEZONE blocks.
+
+Recurring events (RRULE/RDATE) are expanded only within the window, with
+EXDATEs removed and RECURRENCE-ID overrides replacing the instances they
+name. Memory stays bounded by what falls inside the window, not by the
+size of the feed.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, tzinfo
+from typing import Any, Iterable, Iterator
+
+from dateutil.rrule import rrulestr, rruleset
+from icalendar import Calendar, vRecur
+
+from .timez import DEFAULT_TIMEZONE, ensure_all_day_bounds, ensure_timezone
+
+VEVENT_RE = re.compile(rb"^BEGIN:VEVENT\r?\n.*?^END:VEVENT\r?$\n?", re.MULTILINE | re.DOTALL | re.IGNORECASE)
+VTIMEZONE_RE = re.compile(rb"^BEGIN:VTIMEZONE\r?\n.*?^END:VTIMEZONE\r?$\n?", re.MULTILINE | re.DOTALL | re.IGNORECASE)
+PREFILTER_PROPERTIES = (b"DTSTART", b"DTEND", b"DURATION", b"RRULE", b"RDATE", b"RECURRENCE-ID")
+VALUE_DATE_RE = re.compile(rb":(\d{4})(\d{2})(\d{2})")
+UNTIL_RE = re.compile(rb"UNTIL=(\d{4})(\d{2})(\d{2})", re.IGNORECASE)
+
+BATCH_SIZE = 500
+# Rules this fine-grained are treated as a single event rather than expanded.
+UNEXPANDED_FREQUENCIES = frozenset({"SECONDLY", "MINUTELY"})
+MAX_OCCURRENCES_PER_SERIES = 1000
+# Text-level prefilter slack: a local date can differ from UTC by a day.
+SLACK = timedelta(days=1)
+
+
+@dataclass
+class Occurrence:
+    """One concrete instance of a VEVENT inside the window.
+
+    ``instance`` is ``None`` for one-off events and the local start stamp
+    (``YYYYMMDDTHHMM``) for instances of a recurring series, so callers can
+    build a per-instance uid.
+    """
+
+    component: Any
+    start: datetime
+    end: datetime
+    all_day: bool
+    instance: str | None = None
+
+
+def instance_stamp(start: datetime) -> str:
+    return ensure_timezone(start).strftime("%Y%m%dT%H%M")
+
+
+def iter_vevent_blocks(content: bytes) -> Iterator[bytes]:
+    """Raw ``BEGIN:VEVENT`` ... ``END:VEVENT`` byte blocks, in feed order."""
+
+    if b"BEGIN:VEVENT" not in content:
+        # Lower- or mixed-case feeds are legal, just rare; take the slow path.
+        for match in VEVENT_RE.finditer(content):
+            yield match.group(0)
+        return
+    position = 0
+    while (start := content.find(b"BEGIN:VEVENT", position)) != -1:
+        end = content.find(b"END:VEVENT", start)
+        if end == -1:
+            return
+        position = end + len(b"END:VEVENT")
+        yield content[start:position] + b"\r\n"
+
+
+def _properties(block: bytes) -> dict[bytes, bytes]:
+    """First line of each prefilter property, unfolded lines not required.
+
+    A folded or lower-case property simply is not found (or its date does
+    not parse), which makes the prefilter keep the block.
+    """
+
+    props: dict[bytes, bytes] = {}
+    for name in PREFILTER_PROPERTIES:
+        index = block.find(b"\n" + name)
+        if index == -1:
+            continue
+        rest = index + 1 + len(name)
+        if block[rest:rest + 1] not in (b";", b":"):
+            continue
+        line_end = block.find(b"\n", rest)
+        props[name] = block[rest:line_end if line_end != -1 else len(block)]
+    return props
+
+
+def _value_date(raw: bytes | None) -> date | None:
+    if not raw:
+        return None
+    match = VALUE_DATE_RE.search(raw)
+    if not match:
+        return None
+    try:
+        return date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+    except ValueError:
+        return None
+
+
+def block_in_window(block: bytes, first: date, last: date) -> bool:
+    """Cheap text check: could this VEVENT produce anything in ``[first, last]``?
+
+    Errs on the side of keeping a block whenever the answer is unclear.
+    """
+
+    props = _properties(block)
+    start = _value_date(props.get(b"DTSTART"))
+    if start is None:
+        return True
+    first, last = first - SLACK, last + SLACK
+    if b"RECURRENCE-ID" in props:
+        # An override must also survive when it moves its instance out of
+        # the window, so the series does not resurrect the original slot.
+        recurrence = _value_date(props[b"RECURRENCE-ID"])
+        return (recurrence is not None and first <= recurrence <= last) or first <= start <= last
+    if b"RDATE" in props:
+        return True
+    if start > last:
+        return False
+    if b"RRULE" in props:
+        until = UNTIL_RE.search(props[b"RRULE"])
+        if not until:
+            return True
+        return date(int(until.group(1)), int(until.group(2)), int(until.group(3))) >= first
+    if b"DURATION" in props:
+        return True
+    end = _value_date(props.get(b"DTEND")) or start
+    return end >= first
+
+
+def _parse_batch(prefix: bytes, blocks: list[bytes]) -> Iterator[Any]:
+    try:
+        calendar = Calendar.from_ical(prefix + b"".join(blocks) + b"END:VCALENDAR\r\n")
+    except Exception:
+        if len(blocks) == 1:
+            return
+        # One bad VEVENT should not cost the rest of the batch.
+        for block in blocks:
+            yield from _parse_batch(prefix, [block])
+        return
+    yield from calendar.walk("VEVENT")
+
+
+def iter_components(content: bytes, first: date, last: date, *, batch_size: int = BATCH_SIZE) -> Iterator[Any]:
+    """Parsed VEVENT components that may touch ``[first, last]``."""
+
+    prefix = b"BEGIN:VCALENDAR\r\nVERSION:2.0\r\n" + b"".join(
+        match.group(0) for match in VTIMEZONE_RE.finditer(content)
+    )
+    batch: list[bytes] = []
+    for block in iter_vevent_blocks(content):
+        if not block_in_window(block, first, last):
+            continue
+        batch.append(block)
+        if len(batch) >= batch_size:
+            yield from _parse_batch(prefix, batch)
+            batch = []
+    if batch:
+        yield from _parse_batch(prefix, batch)
+
+
+def _as_datetime(value: date | datetime, tz: tzinfo) -> datetime:
+    if not isinstance(value, datetime):
+        return datetime.combine(value, time(), tz)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=tz)
+    return value
+
+
+def _date_values(prop: Any) -> Iterator[date | datetime]:
+    """Values of an RDATE/EXDATE property that may repeat and hold lists or periods."""
+
+    for item in prop if isinstance(prop, list) else [prop]:
+        for value in getattr(item, "dts", []):
+            dt = value.dt
+            yield dt[0] if isinstance(dt, tuple) else dt
+
+
+def _bounds(component: Any) -> tuple[date | datetime, date | datetime] | None:
+    start_raw = component.get("dtstart")
+    if not start_raw:
+        return None
+    start = start_raw.dt
+    if component.get("dtend") is not None:
+        end = component["dtend"].dt
+    elif component.get("duration") is not None:
+        end = start + component["duration"].dt
+    else:
+        end = start
+    return start, end
+
+
+def _single(component: Any, instance: str | None = None) -> Occurrence | None:
+    bounds = _bounds(component)
+    if bounds is None:
+        return None
+    start, end, all_day = ensure_all_day_bounds(*bounds)
+    return Occurrence(component, start, end, all_day, instance)
+
+
+def _rule_set(component: Any, start: datetime) -> rruleset | None:
+    rules = component.get("rrule")
+    rule_set = rruleset()
+    for rule in rules if isinstance(rules, list) else [rules] if rules is not None else []:
+        spec = vRecur(rule)
+        if any(freq in UNEXPANDED_FREQUENCIES for freq in spec.get("FREQ", [])):
+            return None
+        until = spec.pop("UNTIL", [None])[0]
+        parsed = rrulestr(spec.to_ical().decode("ascii"), dtstart=start)
+        if until is not None:
+            if not isinstance(until, datetime):
+                until = datetime.combine(until, time(23, 59, 59))
+            parsed = parsed.replace(until=_as_datetime(until, start.tzinfo))
+        rule_set.rrule(parsed)
+    rdates = component.get("rdate")
+    if rdates is not None:
+        for value in _date_values(rdates):
+            rule_set.rdate(_as_datetime(value, start.tzinfo))
+    exdates = component.get("exdate")
+    if exdates is not None:
+        for value in _date_values(exdates):
+            rule_set.exdate(_as_datetime(value, start.tzinfo))
+    return rule_set
+
+
+def expand(component: Any, window_start: datetime, window_end: datetime, *, skip: Iterable[float] = ()) -> list[Occurrence]:
+    """Instances of a recurring VEVENT overlapping the window.
+
+    ``skip`` holds POSIX timestamps of instances replaced by RECURRENCE-ID
+    overrides. The series' own DTSTART counts as its first instance.
+    """
+
+    bounds = _bounds(component)
+    if bounds is None:
+        return []
+    raw_start, raw_end = bounds
+    all_day = not isinstance(raw_start, datetime)
+    tz = raw_start.tzinfo if isinstance(raw_start, datetime) and raw_start.tzinfo else DEFAULT_TIMEZONE
+    start = _as_datetime(raw_start, tz)
+    duration = _as_datetime(raw_end, tz) - start
+    try:
+        rule_set = _rule_set(component, start)
+    except (ValueError, TypeError):
+        # An RRULE dateutil cannot make sense of; keep the first instance.
+        rule_set = None
+    if rule_set is None:
+        occurrence = _single(component)
+        return [occurrence] if occurrence else []
+    rule_set.rdate(start)
+
+    skipped = set(skip)
+    occurrences: list[Occurrence] = []
+    for instance in rule_set.xafter(window_start - duration, count=MAX_OCCURRENCES_PER_SERIES, inc=True):
+        if instance > window_end:
+            break
+        if instance.timestamp() in skipped:
+            continue
+        begin = ensure_timezone(instance)
+        occurrences.append(Occurrence(component, begin, ensure_timezone(instance + duration), all_day, instance_stamp(instance)))
+    return occurrences
+
+
+def iter_occurrences(content: bytes, window_start: datetime, window_end: datetime) -> Iterator[Occurrence]:
+    """Every VEVENT instance in ``content`` that overlaps the window.
+
+    One-off events stream out as they are parsed; recurring series are held
+    until the end of the feed so overrides appearing after their master are
+    still honoured.
+    """
+
+    masters: list[Any] = []
+    overridden: dict[str, set[float]] = {}
+    first, last = window_start.date(), window_end.date()
+    for component in iter_components(content, first, last):
+        try:
+            if component.get("recurrence-id") is not None:
+                dtstart = component.get("dtstart")
+                tz = dtstart.dt.tzinfo if dtstart is not None and isinstance(dtstart.dt, datetime) and dtstart.dt.tzinfo else DEFAULT_TIMEZONE
+                recurrence = _as_datetime(component["recurrence-id"].dt, tz)
+                overridden.setdefault(str(component.get("uid", "")), set()).add(recurrence.timestamp())
+                if str(component.get("status", "")).upper() == "CANCELLED":
+                    continue
+                occurrence = _single(component, instance_stamp(recurrence))
+            elif component.get("rrule") is not None or component.get("rdate") is not None:
+                masters.append(component)
+                continue
+            else:
+                occurrence = _single(component)
+        except (ValueError, TypeError, AttributeError):
+            # icalendar parses leniently; an unreadable date surfaces here
+            # and costs only its own VEVENT.
+            continue
+        if occurrence and occurrence.end >= window_start and occurrence.start <= window_end:
+            yield occurrence
+    for component in masters:
+        skip = overridden.get(str(component.get("uid", "")), ())
+        try:
+            occurrences = expand(component, window_start, window_end, skip=skip)
+        except (ValueError, TypeError, AttributeError):
+            continue
+        yield from occurrences
+
+
+__all__ = [
+    "Occurrence",
+    "block_in_window",
+    "expand",
+    "instance_stamp",
+    "iter_components",
+    "iter_occurrences",
+    "iter_vevent_blocks",
+]
@@ -0,0 +1,332 @@
+"""Near-duplicate detection with MinHash signatures and LSH banding.
+
+:func:`util.dedupe.make_similarity_key` only merges events whose
+normalized title, date and venue match exactly, so the same lecture listed
+by two sites under slightly different titles survives. Comparing every
+pair is quadratic; instead each event's title (as character trigrams) and
+venue (as words) are shingled, summarised by a MinHash signature, and split
+into bands. Events on the same day that share any band bucket become
+candidate pairs, which are kept only if the Jaccard similarity of their
+shingle sets reaches the threshold. Work grows with the number of
+candidates, not with the square of the event count.
+"""
+from __future__ import annotations
+
+import random
+import re
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import Iterable, Iterator, Sequence
+
+from .uid import normalize
+
+try:  # Optional: vectorises signatures and banding; results are identical without it.
+    import numpy
+except ImportError:  # pragma: no cover - exercised only without the extra
+    numpy = None
+
+DEFAULT_THRESHOLD = 0.7
+SHINGLE_SIZE = 3
+# 20 bands of 4 rows: pairs at Jaccard 0.7 become candidates >99% of the
+# time, at 0.5 ~72%, at 0.3 ~15%, and unrelated titles almost never.
+BANDS = 20
+ROWS_PER_BAND = 4
+NUM_PERM = BANDS * ROWS_PER_BAND
+# Shingle sets hashed per numpy batch (bounds the temporary perm x shingle matrix).
+SIGNATURE_CHUNK = 1000
+# 64-bit FNV-1 step used to fold a day and a band's rows into one bucket key.
+FNV_PRIME = 0x100000001B3
+MASK64 = 2**64 - 1
+# Buckets up to this size are compared all-pairs; bigger ones against their first member.
+MAX_BUCKET_PAIRWISE = 16
+
+# Shingle -> crc32; titles are normalized to ``[a-z0-9 ]``, so few distinct trigrams exist.
+_GRAM_HASHES: dict[str, int] = {}
+NUMBER_RE = re.compile(r"\d+")
+
+# Each permutation is a multiply-shift hash, ``((a * x + b) mod 2**64) >> 32``
+# with odd ``a``: numpy's wrapping uint64 arithmetic computes it without a
+# modulo, and plain Python gets the same values by masking.
+_rng = random.Random(20240607)
+COEFF_A = tuple(_rng.randrange(1, 2**64, 2) for _ in range(NUM_PERM))
+COEFF_B = tuple(_rng.randrange(0, 2**64) for _ in range(NUM_PERM))
+del _rng
+
+
+def shingles(event: dict) -> frozenset[int]:
+    """Hashed title trigrams plus venue words.
+
+    Venues count per word so a long shared venue ("Ann Arbor District
+    Library") cannot outweigh two different titles, while "Rackham" vs.
+    "Rackham Amphitheatre, Ann Arbor" still overlaps.
+    """
+
+    title = normalize(event.get("title") or "")
+    if len(title) <= SHINGLE_SIZE:
+        grams = {title} if title else set()
+    else:
+        grams = {title[idx : idx + SHINGLE_SIZE] for idx in range(len(title) - SHINGLE_SIZE + 1)}
+    grams.update(f"@{word}" for word in normalize(event.get("location") or "").split())
+    hashes = _GRAM_HASHES
+    return frozenset(hashes.get(gram) or hashes.setdefault(gram, zlib.crc32(gram.encode("utf-8"))) for gram in grams)
+
+
+def numbers(event: dict) -> frozenset[str]:
+    """Digit runs in the title: "Part 1" and "Part 2" are never the same event."""
+
+    return frozenset(NUMBER_RE.findall(event.get("title") or ""))
+
+
+def _signature_py(hashes: Sequence[int]) -> tuple[int, ...]:
+    return tuple(min(((a * x + b) & MASK64) >> 32 for x in hashes) for a, b in zip(COEFF_A, COEFF_B))
+
+
+def minhash(shingle_set: frozenset[int]) -> tuple[int, ...] | None:
+    """MinHash signature of ``shingle_set`` (``None`` when it is empty)."""
+
+    if not shingle_set:
+        return None
+    return _signature_py(sorted(shingle_set))
+
+
+def signatures(shingle_sets: Sequence[frozenset[int]]) -> list[tuple[int, ...] | None]:
+    """:func:`minhash` of every set; vectorised in chunks when numpy is installed."""
+
+    if numpy is None:  # pragma: no cover - exercised only without the extra
+        return [minhash(shingle_set) for shingle_set in shingle_sets]
+    coeff_a = numpy.array(COEFF_A, dtype=numpy.uint64)[:, None]
+    coeff_b = numpy.array(COEFF_B, dtype=numpy.uint64)[:, None]
+    result: list[tuple[int, ...] | None] = [None] * len(shingle_sets)
+    for start in range(0, len(shingle_sets), SIGNATURE_CHUNK):
+        indices = [idx for idx in range(start, min(start + SIGNATURE_CHUNK, len(shingle_sets))) if shingle_sets[idx]]
+        if not indices:
+            continue
+        lengths = [len(shingle_sets[idx]) for idx in indices]
+        values = numpy.fromiter(
+            chain.from_iterable(shingle_sets[idx] for idx in indices), dtype=numpy.uint64, count=sum(lengths)
+        )
+        offsets = numpy.cumsum([0] + lengths[:-1], dtype=numpy.int64)
+        hashed = (coeff_a * values + coeff_b) >> numpy.uint64(32)
+        minima = numpy.minimum.reduceat(hashed, offsets, axis=1)
+        for idx, row in zip(indices, minima.T.tolist()):
+            result[idx] = tuple(row)
+    return result
+
+
+def jaccard(left: frozenset[int], right: frozenset[int]) -> float:
+    if not left or not right:
+        return 0.0
+    common = len(left & right)
+    return common / (len(left) + len(right) - common)
+
+
+@dataclass
+class Cluster:
+    """Events judged to describe the same thing; ``keeper`` survives dedupe."""
+
+    keeper: dict
+    members: list[tuple[dict, float]] = field(default_factory=list)
+
+
+class _UnionFind:
+    def __init__(self, size: int) -> None:
+        self.parent = list(range(size))
+
+    def find(self, idx: int) -> int:
+        while self.parent[idx] != idx:
+            self.parent[idx] = self.parent[self.parent[idx]]
+            idx = self.parent[idx]
+        return idx
+
+    def union(self, left: int, right: int) -> None:
+        left, right = self.find(left), self.find(right)
+        if left != right:
+            self.parent[max(left, right)] = min(left, right)
+
+
+def _band_key(seed: int, rows: Iterable[int]) -> int:
+    key = seed
+    for value in rows:
+        key = ((key * FNV_PRIME) & MASK64) ^ value
+    return key
+
+
+def _buckets(seeds: list[int], rows: list[tuple[int, ...]], band: int, matrix=None) -> Iterator[list[int]]:
+    """Positions sharing a ``(day, band rows)`` key, each group in ascending order.
+
+    ``matrix`` is ``rows`` as a uint64 array when numpy is available.
+    """
+
+    lo, hi = band * ROWS_PER_BAND, (band + 1) * ROWS_PER_BAND
+    if matrix is None:
+        groups: defaultdict[int, list[int]] = defaultdict(list)
+        for pos, (seed, signature) in enumerate(zip(seeds, rows)):
+            groups[_band_key(seed, signature[lo:hi])].append(pos)
+        yield from (members for members in groups.values() if len(members) > 1)
+        return
+    keys = numpy.array(seeds, dtype=numpy.uint64)
+    for column in range(lo, hi):
+        keys = (keys * numpy.uint64(FNV_PRIME)) ^ matrix[:, column]
+    order = numpy.argsort(keys, kind="stable")
+    ordered = keys[order]
+    bounds = numpy.flatnonzero(ordered[1:] != ordered[:-1]) + 1
+    starts = [0] + bounds.tolist()
+    ends = bounds.tolist() + [len(ordered)]
+    for start, end in zip(starts, ends):
+        if end - start > 1:
+            yield order[start:end].tolist()
+
+
+def candidate_pairs(days: Sequence[str], signatures: Sequence[tuple[int, ...] | None]) -> set[tuple[int, int]]:
+    """Index pairs that share a band bucket on the same day.
+
+    Buckets larger than :data:`MAX_BUCKET_PAIRWISE` — templated listings such
+    as "Office hours with …" — pair each member with the bucket's first
+    only, which bounds the work at ``BANDS`` candidates per event; the
+    union-find still joins members that match that leader.
+    """
+
+    day_codes: dict[str, int] = {}
+    indices: list[int] = []
+    seeds: list[int] = []
+    rows: list[tuple[int, ...]] = []
+    for idx, (day, signature) in enumerate(zip(days, signatures)):
+        if signature is None or not day:
+            continue
+        indices.append(idx)
+        seeds.append(day_codes.setdefault(day, len(day_codes) + 1))
+        rows.append(signature)
+
+    matrix = numpy.array(rows, dtype=numpy.uint64) if numpy is not None and rows else None
+    pairs: set[tuple[int, int]] = set()
+    for band in range(BANDS):
+        for positions in _buckets(seeds, rows, band, matrix):
+            members = [indices[pos] for pos in positions]
+            if len(members) > MAX_BUCKET_PAIRWISE:
+                leader = members[0]
+                pairs.update((leader, other) for other in members[1:])
+                continue
+            for pos, left in enumerate(members):
+                for right in members[pos + 1 :]:
+                    pairs.add((left, right))
+    return pairs
+
+
+def find_near_duplicates(events: Iterable[dict], *, threshold: float = DEFAULT_THRESHOLD) -> list[Cluster]:
+    """Group same-day events whose title+venue shingle Jaccard is ≥ ``threshold``.
+
+    A pair also needs compatible numbers in the title: one event's set of
+    digit runs must contain the other's, so "Climate Week" still matches
+    "Climate Week 2030" but "Session 1" never matches "Session 2".
+
+    Matching pairs link candidates into groups; clusters are anchored on a
+    keeper, the earliest-starting event (input order breaks ties). Walking
+    a group in that order, each event joins the first cluster whose keeper
+    it matches, provided its title numbers suit every member and no
+    candidate pair with a member failed; otherwise it becomes a keeper. So
+    "Part" cannot chain "Part 1" and "Part 2" together. Each pair's
+    similarity is computed once and members are checked through set
+    lookups, so one large templated group costs its candidates plus one
+    keeper comparison per event and cluster. Members carry their
+    similarity to the keeper.
+    """
+
+    events = list(events)
+    sets = [shingles(event) for event in events]
+    days = [(event.get("start_local") or "").split("T")[0] for event in events]
+    title_numbers = [numbers(event) for event in events]
+    similarity: dict[tuple[int, int], float | None] = {}
+
+    def compatible(left: frozenset[str], right: frozenset[str]) -> bool:
+        return left <= right or right <= left
+
+    def score(left: int, right: int) -> float | None:
+        """The pair's Jaccard when it matches, else ``None``; each pair is computed once."""
+
+        key = (left, right) if left < right else (right, left)
+        if key not in similarity:
+            value = None
+            if compatible(title_numbers[left], title_numbers[right]):
+                value = jaccard(sets[left], sets[right])
+                if value < threshold:
+                    value = None
+            similarity[key] = value
+        return similarity[key]
+
+    groups = _UnionFind(len(events))
+    linked: set[int] = set()
+    conflicts: defaultdict[int, set[int]] = defaultdict(set)
+    for left, right in candidate_pairs(days, signatures(sets)):
+        if score(left, right) is None:
+            conflicts[left].add(right)
+            conflicts[right].add(left)
+        else:
+            groups.union(left, right)
+            linked.update((left, right))
+
+    keepers: list[int] = []
+    members: list[list[int]] = []
+    member_sets: list[set[int]] = []
+    number_sets: list[set[frozenset[str]]] = []
+    group_clusters: defaultdict[int, list[int]] = defaultdict(list)
+    for idx in sorted(linked, key=lambda idx: (events[idx].get("start_local") or "", idx)):
+        candidates = group_clusters[groups.find(idx)]
+        for cid in candidates:
+            if conflicts[idx] & member_sets[cid]:
+                continue
+            if not all(compatible(title_numbers[idx], seen) for seen in number_sets[cid]):
+                continue
+            if score(idx, keepers[cid]) is not None:
+                members[cid].append(idx)
+                break
+        else:
+            cid = len(keepers)
+            keepers.append(idx)
+            members.append([])
+            member_sets.append(set())
+            number_sets.append(set())
+            candidates.append(cid)
+        member_sets[cid].add(idx)
+        number_sets[cid].add(title_numbers[idx])
+
+    clusters: list[Cluster] = []
+    for keeper, joined in zip(keepers, members):
+        if joined:
+            cluster = Cluster(keeper=events[keeper])
+            for idx in joined:
+                cluster.members.append((events[idx], round(score(keeper, idx), 3)))
+            clusters.append(cluster)
+    return clusters
+
+
+def collapse_near_duplicates(events: list[dict], *, threshold: float = DEFAULT_THRESHOLD) -> tuple[list[dict], list[dict]]:
+    """Return ``(kept, dropped)``; dropped events gain ``duplicate_of`` and ``similarity``.
+
+    ``duplicate_of`` names the cluster's keeper, which is how the run report
+    lists which listing absorbed which.
+    """
+
+    clusters = find_near_duplicates(events, threshold=threshold)
+    dropped_ids: set[int] = set()
+    dropped: list[dict] = []
+    for cluster in clusters:
+        for event, similarity in cluster.members:
+            event["duplicate_of"] = cluster.keeper.get("uid")
+            event["similarity"] = similarity
+            dropped_ids.add(id(event))
+            dropped.append(event)
+    kept = [event for event in events if id(event) not in dropped_ids]
+    return kept, dropped
+
+
+__all__ = [
+    "DEFAULT_THRESHOLD",
+    "Cluster",
+    "collapse_near_duplicates",
+    "find_near_duplicates",
+    "jaccard",
+    "minhash",
+    "shingles",
+]
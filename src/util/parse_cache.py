@@ -0,0 +1,196 @@
+"""Memoized scraper output keyed by the response body it was parsed from.
+
+A source that answers 304 (or is served from a fresh cache entry) hands
+the scraper the same bytes as last run. Parsing those again is wasted
+work, so each scraper stores its normalized rows under
+``(content digest, scraper, source config hash, parser version)`` and
+reuses them until one of those changes. Scrapers whose parse depends on
+the date (a day-aligned ICS window, HTML/JSON-LD dates completed from
+today) add it as a ``variant``, so their rows last one day.
+
+Rows are stored *before* the horizon filter — each one carries its
+``start``/``end`` timestamps next to the event — and :func:`within_horizon`
+is applied on every read, so cached results stay correct as "now" moves.
+"""
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable
+
+from . import http_cache
+from .sqlite_store import SQLiteStore
+from .timez import DEFAULT_TIMEZONE
+
+PARSE_DB_NAME = "parsed.sqlite3"
+# Rows unused for this long are pruned at the end of a run.
+PARSE_CACHE_MAX_AGE = 30 * 86400.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS parsed (
+    key TEXT PRIMARY KEY,
+    scraper TEXT NOT NULL,
+    rows TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS parsed_by_use ON parsed (last_used);
+"""
+
+Row = dict[str, Any]
+
+
+class ParseCache(SQLiteStore):
+    """Normalized scraper rows, one JSON blob per cache key."""
+
+    SCHEMA = SCHEMA
+
+    def get(self, key: str) -> list[Row] | None:
+        conn = self._conn()
+        row = conn.execute("SELECT rows FROM parsed WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE parsed SET last_used = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key: str, scraper: str, rows: list[Row]) -> None:
+        self._conn().execute(
+            "INSERT OR REPLACE INTO parsed (key, scraper, rows, last_used) VALUES (?, ?, ?, ?)",
+            (key, scraper, json.dumps(rows, ensure_ascii=False), time.time()),
+        )
+
+    def prune(self, max_age: float) -> int:
+        cutoff = time.time() - max_age
+        return self._conn().execute("DELETE FROM parsed WHERE last_used < ?", (cutoff,)).rowcount
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM parsed").fetchone()[0]
+
+
+class ParseStats:
+    """Per-scraper hit/miss counters for the current run."""
+
+    def __init__(self) -> None:
+        self._counts: dict[str, dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0})
+        self._lock = threading.Lock()
+
+    def record(self, scraper: str, kind: str) -> None:
+        with self._lock:
+            self._counts[scraper][kind] += 1
+
+    def as_dict(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            return {scraper: dict(counts) for scraper, counts in sorted(self._counts.items())}
+
+
+_caches: dict[Path, ParseCache] = {}
+_lock = threading.Lock()
+_stats = ParseStats()
+
+
+def get_parse_cache() -> ParseCache:
+    """Return the parse cache living next to the HTTP cache index."""
+
+    path = http_cache.CACHE_DIR / PARSE_DB_NAME
+    with _lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = ParseCache(path)
+        return cache
+
+
+def close_parse_cache() -> None:
+    with _lock:
+        for cache in _caches.values():
+            cache.close()
+        _caches.clear()
+
+
+atexit.register(close_parse_cache)
+
+
+def reset_parse_stats() -> None:
+    global _stats
+    _stats = ParseStats()
+
+
+def parse_cache_stats() -> dict[str, dict[str, int]]:
+    """``{scraper: {"hits": n, "misses": n}}`` since the last reset."""
+
+    return _stats.as_dict()
+
+
+def prune_parse_cache(max_age: float = PARSE_CACHE_MAX_AGE) -> int:
+    return get_parse_cache().prune(max_age)
+
+
+def cache_key(scraper: str, source: dict[str, Any], digest: str, version: int, variant: str = "") -> str:
+    config = hashlib.sha256(json.dumps(source, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    key = f"{scraper}:{version}:{digest}:{config}"
+    return f"{key}:{variant}" if variant else key
+
+
+def memoized_parse(
+    scraper: str,
+    source: dict[str, Any],
+    response: "http_cache.CachedFetch",
+    parse: Callable[[bytes, dict[str, Any]], list[Row]],
+    *,
+    version: int,
+    variant: str = "",
+) -> list[Row]:
+    """Return ``parse(response.content, source)``, reusing an earlier result.
+
+    ``parse`` must return rows of ``{"start": ts, "end": ts | None,
+    "event": {...}}`` with POSIX timestamps. Parsers whose output depends on
+    more than the body and source (such as a date window) name that input
+    in ``variant`` so it becomes part of the key.
+    """
+
+    if response.digest is None:
+        _stats.record(scraper, "misses")
+        return parse(response.content, source)
+    cache = get_parse_cache()
+    key = cache_key(scraper, source, response.digest, version, variant)
+    rows = cache.get(key)
+    if rows is not None:
+        _stats.record(scraper, "hits")
+        return rows
+    _stats.record(scraper, "misses")
+    rows = parse(response.content, source)
+    cache.put(key, scraper, rows)
+    return rows
+
+
+def within_horizon(rows: list[Row], horizon_days: int, *, drop_past: bool = True) -> list[dict[str, Any]]:
+    """Events starting before the horizon; with ``drop_past`` also skip ones already over."""
+
+    now = datetime.now(DEFAULT_TIMEZONE)
+    horizon = (now + timedelta(days=horizon_days)).timestamp()
+    now_ts = now.timestamp()
+    events: list[dict[str, Any]] = []
+    for row in rows:
+        if drop_past and row["end"] is not None and row["end"] < now_ts:
+            continue
+        if row["start"] > horizon:
+            continue
+        events.append(row["event"])
+    return events
+
+
+__all__ = [
+    "ParseCache",
+    "cache_key",
+    "close_parse_cache",
+    "get_parse_cache",
+    "memoized_parse",
+    "parse_cache_stats",
+    "prune_parse_cache",
+    "reset_parse_stats",
+    "within_horizon",
+]
@@ -0,0 +1,194 @@
+"""SQLite-backed registry of event UIDs already published.
+
+``dedupe_events`` used to load ``registry.json`` whole and rewrite it on
+every run, and nothing was ever dropped from it. :class:`RegistryStore`
+keeps the same ``uid -> first_seen`` mapping in an indexed table next to
+the JSON file (``registry.json`` → ``registry.sqlite3``): incoming UIDs are
+looked up in batches, new ones are upserted in one transaction, and
+entries whose ``first_seen`` (the event's local start) and ``last_seen``
+(the last run that scraped them) are both older than the retention window
+are pruned.
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from .sqlite_store import SQLiteStore
+from .timez import DEFAULT_TIMEZONE
+
+# Events that started this long ago and have not been scraped for as long
+# only cost space. Listing pages can keep showing past events (html_pull
+# keeps them), so a row is only dropped once no run has seen its UID either.
+REGISTRY_RETENTION_DAYS = 90
+# UIDs per ``IN (...)`` lookup; stays under SQLite's bound-variable limit.
+LOOKUP_BATCH = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS registry (
+    uid TEXT PRIMARY KEY,
+    first_seen TEXT,
+    added_at REAL NOT NULL,
+    last_seen REAL
+);
+CREATE INDEX IF NOT EXISTS registry_by_first_seen ON registry (first_seen);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def registry_db_path(registry_path: Path) -> Path:
+    """``src/registry.json`` → ``src/registry.sqlite3``; other paths are used as given."""
+
+    return registry_path.with_suffix(".sqlite3") if registry_path.suffix == ".json" else registry_path
+
+
+def _chunks(values: list[str], size: int) -> Iterator[list[str]]:
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+class RegistryStore(SQLiteStore):
+    """``uid -> first_seen`` with batched lookups, upserts and TTL pruning."""
+
+    SCHEMA = SCHEMA
+
+    def __init__(self, path: Path, *, legacy_json: Path | None = None) -> None:
+        super().__init__(path)
+        conn = self._conn()
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(registry)")}
+        if "last_seen" not in columns:
+            conn.execute("ALTER TABLE registry ADD COLUMN last_seen REAL")
+        if legacy_json is not None:
+            self.migrate_json(legacy_json)
+
+    def known(self, uids: Iterable[str]) -> set[str]:
+        """The subset of ``uids`` already in the registry."""
+
+        conn = self._conn()
+        found: set[str] = set()
+        for chunk in _chunks(list(dict.fromkeys(uids)), LOOKUP_BATCH):
+            placeholders = ",".join("?" * len(chunk))
+            found.update(row[0] for row in conn.execute(f"SELECT uid FROM registry WHERE uid IN ({placeholders})", chunk))
+        return found
+
+    def add(self, entries: Iterable[tuple[str, str | None]]) -> int:
+        """Insert ``(uid, first_seen)`` pairs in one transaction; existing UIDs keep their row."""
+
+        now = time.time()
+        with self.transaction() as conn:
+            cursor = conn.executemany(
+                "INSERT OR IGNORE INTO registry (uid, first_seen, added_at, last_seen) VALUES (?, ?, ?, ?)",
+                ((uid, first_seen, now, now) for uid, first_seen in entries),
+            )
+        return cursor.rowcount
+
+    def mark_seen(self, uids: Iterable[str]) -> None:
+        """Stamp ``last_seen`` on registered ``uids`` scraped again this run."""
+
+        now = time.time()
+        with self.transaction() as conn:
+            for chunk in _chunks(list(dict.fromkeys(uids)), LOOKUP_BATCH):
+                placeholders = ",".join("?" * len(chunk))
+                conn.execute(f"UPDATE registry SET last_seen = ? WHERE uid IN ({placeholders})", [now, *chunk])
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM registry").fetchone()[0]
+
+    def prune(self, retention_days: float = REGISTRY_RETENTION_DAYS, *, now: datetime | None = None) -> int:
+        """Drop entries whose event started, and was last scraped, more than ``retention_days`` ago.
+
+        A UID still being scraped keeps its row however old the event, so it
+        is never reported as new again. Rows without a usable ``first_seen``
+        age out by their last sighting alone.
+        """
+
+        now = now or datetime.now(DEFAULT_TIMEZONE)
+        cutoff = now - timedelta(days=retention_days)
+        with self.transaction() as conn:
+            dropped = conn.execute(
+                """
+                DELETE FROM registry
+                WHERE first_seen < ? AND first_seen != '' AND COALESCE(last_seen, added_at) < ?
+                """,
+                (cutoff.strftime("%Y-%m-%dT%H:%M"), cutoff.timestamp()),
+            ).rowcount
+            dropped += conn.execute(
+                """
+                DELETE FROM registry
+                WHERE (first_seen IS NULL OR first_seen = '') AND COALESCE(last_seen, added_at) < ?
+                """,
+                (cutoff.timestamp(),),
+            ).rowcount
+        return dropped
+
+    def stats(self) -> dict[str, object]:
+        entries, oldest, newest = self._conn().execute(
+            "SELECT COUNT(*), MIN(NULLIF(first_seen, '')), MAX(first_seen) FROM registry"
+        ).fetchone()
+        return {
+            "entries": entries,
+            "oldest_first_seen": oldest,
+            "newest_first_seen": newest,
+            "db_bytes": self._db_bytes(),
+        }
+
+    def compact(self, retention_days: float = REGISTRY_RETENTION_DAYS) -> dict[str, int]:
+        """Prune, then ``VACUUM`` so the file actually shrinks."""
+
+        before = self._db_bytes()
+        pruned = self.prune(retention_days)
+        conn = self._conn()
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return {"pruned": pruned, "bytes_before": before, "bytes_after": self._db_bytes()}
+
+    def _db_bytes(self) -> int:
+        total = 0
+        for suffix in ("", "-wal"):
+            candidate = self.path.with_name(self.path.name + suffix)
+            if candidate.exists():
+                total += candidate.stat().st_size
+        return total
+
+    def migrate_json(self, legacy_json: Path) -> int:
+        """Import ``registry.json`` whenever it changed since the last import.
+
+        The JSON file is left in place (it is checked in); rows already in
+        SQLite win, so re-importing an older copy never loses entries.
+        """
+
+        if not legacy_json.exists():
+            return 0
+        stat = legacy_json.stat()
+        stamp = f"{stat.st_size}:{stat.st_mtime_ns}"
+        key = f"imported:{os.path.abspath(legacy_json)}"
+        conn = self._conn()
+        done = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        if done and done[0] == stamp:
+            return 0
+        legacy: dict[str, dict] = json.loads(legacy_json.read_text() or "{}")
+        now = time.time()
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO registry (uid, first_seen, added_at) VALUES (?, ?, ?)",
+                ((uid, (entry or {}).get("first_seen"), now) for uid, entry in legacy.items()),
+            )
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, stamp))
+        return len(legacy)
+
+
+def open_registry(registry_path: Path) -> RegistryStore:
+    """Open the store behind ``--registry``, importing a legacy JSON registry if present."""
+
+    legacy = registry_path if registry_path.suffix == ".json" else None
+    return RegistryStore(registry_db_path(registry_path), legacy_json=legacy)
+
+
+__all__ = ["REGISTRY_RETENTION_DAYS", "RegistryStore", "open_registry", "registry_db_path"]
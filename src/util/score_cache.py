@@ -0,0 +1,166 @@
+"""Persistent event scores keyed by event content and scoring config.
+
+Most events a run scores were already scored yesterday under the same
+``scoring_config.json`` and ``preferences.yaml``. Each score is stored
+under ``(config fingerprint, event hash)``: the event hash covers only the
+fields the scorer reads, and the fingerprint covers the loaded config,
+preferences and scorer version, so editing either file (or the scorer)
+rescores everything while unchanged events are read back.
+
+Rows live in ``scores.sqlite3`` next to the HTTP cache index and are
+pruned once unused for :data:`SCORE_CACHE_MAX_AGE`.
+"""
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterable, Mapping
+
+from . import http_cache
+from .sqlite_store import SQLiteStore
+
+SCORE_DB_NAME = "scores.sqlite3"
+# Rows unused for this long (events gone, or an old config) are pruned at the end of a run.
+SCORE_CACHE_MAX_AGE = 30 * 86400.0
+# Keys per ``IN (...)`` lookup; stays under SQLite's bound-variable limit.
+LOOKUP_BATCH = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    key TEXT PRIMARY KEY,
+    score REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_by_use ON scores (last_used);
+"""
+
+
+def _digest(value: Any) -> str:
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def config_fingerprint(config: Mapping[str, Any], preferences: Mapping[str, Any], *, version: int) -> str:
+    """Hash of the loaded scoring config, preferences and scorer ``version``."""
+
+    return _digest({"config": config, "preferences": preferences, "version": version})[:16]
+
+
+def event_hash(event: Mapping[str, Any], fields: Iterable[str]) -> str:
+    """Hash of the ``fields`` present in ``event`` (absent and ``None`` differ)."""
+
+    return _digest({field: event[field] for field in fields if field in event})
+
+
+class ScoreCache(SQLiteStore):
+    """``key -> score`` with batched lookups and last-used pruning."""
+
+    SCHEMA = SCHEMA
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, float]:
+        conn = self._conn()
+        keys = list(dict.fromkeys(keys))
+        found: dict[str, float] = {}
+        for start in range(0, len(keys), LOOKUP_BATCH):
+            chunk = keys[start : start + LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(chunk))
+            found.update(conn.execute(f"SELECT key, score FROM scores WHERE key IN ({placeholders})", chunk))
+        if found:
+            now = time.time()
+            with self.transaction() as conn:
+                conn.executemany("UPDATE scores SET last_used = ? WHERE key = ?", ((now, key) for key in found))
+        return found
+
+    def put_many(self, items: Iterable[tuple[str, float]]) -> None:
+        now = time.time()
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO scores (key, score, last_used) VALUES (?, ?, ?)",
+                ((key, score, now) for key, score in items),
+            )
+
+    def prune(self, max_age: float) -> int:
+        cutoff = time.time() - max_age
+        return self._conn().execute("DELETE FROM scores WHERE last_used < ?", (cutoff,)).rowcount
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+
+class ScoreStats:
+    """Cached vs. computed counts for the current run."""
+
+    def __init__(self) -> None:
+        self._counts = {"cached": 0, "computed": 0}
+        self._lock = threading.Lock()
+
+    def record(self, *, cached: int, computed: int) -> None:
+        with self._lock:
+            self._counts["cached"] += cached
+            self._counts["computed"] += computed
+
+    def as_dict(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+_caches: dict[Path, ScoreCache] = {}
+_lock = threading.Lock()
+_stats = ScoreStats()
+
+
+def get_score_cache() -> ScoreCache:
+    """Return the score cache living next to the HTTP cache index."""
+
+    path = http_cache.CACHE_DIR / SCORE_DB_NAME
+    with _lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = ScoreCache(path)
+        return cache
+
+
+def close_score_cache() -> None:
+    with _lock:
+        for cache in _caches.values():
+            cache.close()
+        _caches.clear()
+
+
+atexit.register(close_score_cache)
+
+
+def record_score_stats(*, cached: int, computed: int) -> None:
+    _stats.record(cached=cached, computed=computed)
+
+
+def reset_score_stats() -> None:
+    global _stats
+    _stats = ScoreStats()
+
+
+def score_cache_stats() -> dict[str, int]:
+    """``{"cached": n, "computed": n}`` since the last reset."""
+
+    return _stats.as_dict()
+
+
+def prune_score_cache(max_age: float = SCORE_CACHE_MAX_AGE) -> int:
+    return get_score_cache().prune(max_age)
+
+
+__all__ = [
+    "ScoreCache",
+    "close_score_cache",
+    "config_fingerprint",
+    "event_hash",
+    "get_score_cache",
+    "prune_score_cache",
+    "record_score_stats",
+    "reset_score_stats",
+    "score_cache_stats",
+]
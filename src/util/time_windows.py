@@ -0,0 +1,166 @@
+"""Compiled evening, quiet-hour and late-start windows.
+
+Planner, scorer and availability summary all ask the same questions of
+every candidate event — is it inside the evening window for its weekday,
+does it touch quiet hours, does it start late — and used to re-parse the
+``"HH:MM"`` labels from ``preferences.yaml`` each time. :class:`TimeWindows`
+parses them once into sorted minute-of-week interval arrays (Monday 00:00
+is minute 0) and answers each question with a binary search.
+
+Times are read off the datetime's own wall clock at minute resolution,
+exactly as the per-event checks it replaces did.
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+from datetime import datetime
+from typing import Iterable, Mapping
+
+from dateutil import parser
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+Intervals = tuple[tuple[int, ...], tuple[int, ...]]
+
+
+def minute_of_day(value: datetime) -> int:
+    return value.hour * 60 + value.minute
+
+
+def minute_of_week(value: datetime) -> int:
+    return value.weekday() * MINUTES_PER_DAY + value.hour * 60 + value.minute
+
+
+def _clock_minutes(label: str) -> int:
+    """``"HH:MM"`` → minutes after midnight (the evening-window format)."""
+
+    hour, minute = map(int, str(label).split(":"))
+    return hour * 60 + minute
+
+
+def _parsed_minutes(label: str) -> int:
+    """Any time dateutil understands (``"22:30"``, ``"7am"``) → minutes after midnight."""
+
+    parsed = parser.parse(label).time()
+    return parsed.hour * 60 + parsed.minute
+
+
+def _compile(spans: Iterable[tuple[int, int]]) -> Intervals:
+    """Sort and merge half-open ``[start, end)`` minute spans for bisecting."""
+
+    starts: list[int] = []
+    ends: list[int] = []
+    for start, end in sorted(span for span in spans if span[0] < span[1]):
+        if ends and start <= ends[-1]:
+            ends[-1] = max(ends[-1], end)
+        else:
+            starts.append(start)
+            ends.append(end)
+    return tuple(starts), tuple(ends)
+
+
+def _contains(intervals: Intervals, minute: int) -> bool:
+    starts, ends = intervals
+    idx = bisect_right(starts, minute) - 1
+    return idx >= 0 and minute < ends[idx]
+
+
+def _daily(spans: Iterable[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Repeat minute-of-day spans on every day of the week."""
+
+    spans = list(spans)
+    return [(day * MINUTES_PER_DAY + start, day * MINUTES_PER_DAY + end) for day in range(7) for start, end in spans]
+
+
+class TimeWindows:
+    """Time-of-day rules for one run, compiled from preferences and hard rules.
+
+    ``evenings`` maps weekday index to an ``("HH:MM", "HH:MM")`` window
+    (days without one are unconstrained); ``quiet`` lists quiet-hour pairs;
+    ``late_start_after`` is the ``"HH:MM"`` from which starts are penalised
+    (only its hour counts) by ``late_start_penalty``.
+    """
+
+    def __init__(
+        self,
+        *,
+        evenings: Mapping[int, tuple[str, str]] | None = None,
+        quiet: Iterable[tuple[str, str]] | None = None,
+        late_start_after: str | None = None,
+        late_start_penalty: float = 0.0,
+    ) -> None:
+        self.evenings: dict[int, tuple[int, int]] = {
+            day: (_clock_minutes(start), _clock_minutes(end)) for day, (start, end) in (evenings or {}).items()
+        }
+        self._evening = self._compile_evenings() if self.evenings else None
+
+        quiet_pairs = [(_parsed_minutes(start), _parsed_minutes(end)) for start, end in quiet or ()]
+        start_spans: list[tuple[int, int]] = []
+        end_spans: list[tuple[int, int]] = []
+        for quiet_start, quiet_end in quiet_pairs:
+            if quiet_start <= quiet_end:
+                start_spans.append((quiet_start, quiet_end))
+                end_spans.append((quiet_start, quiet_end))
+            else:
+                # Window wraps midnight; only the start is checked against it.
+                start_spans += [(quiet_start, MINUTES_PER_DAY), (0, quiet_end)]
+        self.has_quiet_hours = bool(quiet_pairs)
+        self._quiet_start = _compile(_daily(start_spans))
+        self._quiet_end = _compile(_daily(end_spans))
+
+        # The historical rule compares whole hours: "20:30" penalises from 20:00.
+        self.late_start_after = int(str(late_start_after).split(":")[0]) * 60 if late_start_after else None
+        self.late_start_penalty = late_start_penalty
+
+    def _compile_evenings(self) -> Intervals:
+        spans: list[tuple[int, int]] = []
+        for day in range(7):
+            base = day * MINUTES_PER_DAY
+            if day not in self.evenings:
+                spans.append((base, base + MINUTES_PER_DAY))
+                continue
+            start, end = self.evenings[day]
+            # Both ends are inclusive.
+            if start <= end:
+                spans.append((base + start, base + end + 1))
+            else:
+                spans += [(base + start, base + MINUTES_PER_DAY), (base, base + end + 1)]
+        return _compile(spans)
+
+    def in_evening_window(self, start: datetime) -> bool:
+        """True when ``start`` falls in its weekday's evening window (or that day has none)."""
+
+        if self._evening is None:
+            return True
+        return _contains(self._evening, minute_of_week(start))
+
+    def in_quiet_hours(self, start: datetime, end: datetime) -> bool:
+        """True if the event starts in quiet hours or ends inside a same-day quiet window."""
+
+        if not self.has_quiet_hours:
+            return False
+        return _contains(self._quiet_start, minute_of_week(start)) or _contains(self._quiet_end, minute_of_week(end))
+
+    def evening_overlap(self, start: datetime, end: datetime) -> bool | None:
+        """Whether ``start``–``end`` touches the evening window of the start's weekday.
+
+        ``None`` when that weekday has no evening window. Both times are read
+        as minutes after midnight, so an event running past midnight is
+        compared on its start day.
+        """
+
+        window = self.evenings.get(start.weekday())
+        if window is None:
+            return None
+        window_start, window_end = window
+        start_minutes, end_minutes = minute_of_day(start), minute_of_day(end)
+        if window_start <= window_end:
+            return not (end_minutes <= window_start or start_minutes >= window_end)
+        return start_minutes >= window_start or end_minutes <= window_end
+
+    def starts_late(self, hour: int) -> bool:
+        return self.late_start_after is not None and hour * 60 >= self.late_start_after
+
+
+__all__ = ["MINUTES_PER_DAY", "MINUTES_PER_WEEK", "TimeWindows", "minute_of_day", "minute_of_week"]
@@ -1,12 +1,16 @@
 """Time handling utilities for Spiceflow Social."""
 from __future__ import annotations
 
+import re
 from datetime import date, datetime, timedelta
+from functools import lru_cache
 from typing import Iterable, Tuple
 from zoneinfo import ZoneInfo
 
 from dateutil import parser
 
+from .time_windows import TimeWindows
+
 DEFAULT_TIMEZONE = ZoneInfo("America/Detroit")
 
 
@@ -24,17 +28,120 @@ def ensure_timezone(dt: datetime, tz: ZoneInfo | None = None) -> datetime:
     return dt.astimezone(tz)
 
 
+# Distinct (string, tz) pairs remembered by ``parse_datetime``; feeds repeat
+# the same few timestamps across runs, sources and start/end fields.
+PARSE_MEMO_SIZE = 8192
+
+# Strict extended ISO-8601, where ``datetime.fromisoformat`` and dateutil agree.
+ISO_RE = re.compile(r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d{1,6})?)?(?:Z|[+-]\d{2}:?\d{2})?)?")
+# ``5/3/2030`` and ``5/3/2030 7:30 PM`` — month first, as dateutil reads them.
+US_DATE_RE = re.compile(
+    r"(\d{1,2})/(\d{1,2})/(\d{4})(?:,?\s+(\d{1,2}):(\d{2})(?::(\d{2}))?(?:\s*([AaPp][Mm]))?)?"
+)
+# ``Friday, May 3, 2030 at 7:30 pm`` and its shorter variants.
+MONTH_NAME_RE = re.compile(
+    r"(?:([A-Za-z]+)\.?,?\s+)?([A-Za-z]+)\.?\s+(\d{1,2})(?:st|nd|rd|th)?,?\s+(\d{4})"
+    r"(?:,?\s+(?:at\s+)?(\d{1,2})(?::(\d{2}))?(?:\s*([AaPp][Mm]))?)?"
+)
+MONTHS = {
+    name: number
+    for number, names in enumerate(
+        (
+            ("jan", "january"),
+            ("feb", "february"),
+            ("mar", "march"),
+            ("apr", "april"),
+            ("may",),
+            ("jun", "june"),
+            ("jul", "july"),
+            ("aug", "august"),
+            ("sep", "sept", "september"),
+            ("oct", "october"),
+            ("nov", "november"),
+            ("dec", "december"),
+        ),
+        start=1,
+    )
+    for name in names
+}
+WEEKDAYS = frozenset(
+    ("mon", "monday", "tue", "tuesday", "wed", "wednesday", "thu", "thursday")
+    + ("fri", "friday", "sat", "saturday", "sun", "sunday")
+)
+
+
+def _clock(hour: str | None, minute: str | None, second: str | None, ampm: str | None) -> tuple[int, int, int] | None:
+    """Resolve a matched time of day, or ``None`` when dateutil should decide."""
+
+    if hour is None:
+        return 0, 0, 0
+    value = int(hour)
+    if ampm is None:
+        if minute is None:
+            return None
+    else:
+        if not 1 <= value <= 12:
+            return None
+        if ampm.lower() == "pm" and value < 12:
+            value += 12
+        elif ampm.lower() == "am" and value == 12:
+            value = 0
+    return value, int(minute or 0), int(second or 0)
+
+
+def _parse_fast(value: str) -> datetime | None:
+    """Parse the common feed formats without dateutil, or return ``None``.
+
+    Every shape accepted here yields exactly what ``dateutil.parser.parse``
+    would; anything unusual (or invalid) is left to dateutil so its results
+    and errors are unchanged.
+    """
+
+    try:
+        if ISO_RE.fullmatch(value):
+            return datetime.fromisoformat(value)
+        match = US_DATE_RE.fullmatch(value)
+        if match:
+            month, day, year, hour, minute, second, ampm = match.groups()
+            clock = _clock(hour, minute, second, ampm)
+            return None if clock is None else datetime(int(year), int(month), int(day), *clock)
+        match = MONTH_NAME_RE.fullmatch(value)
+        if match:
+            weekday, month_name, day, year, hour, minute, ampm = match.groups()
+            month = MONTHS.get(month_name.lower())
+            if month is None or (weekday is not None and weekday.lower() not in WEEKDAYS):
+                return None
+            clock = _clock(hour, minute, None, ampm)
+            return None if clock is None else datetime(int(year), month, int(day), *clock)
+    except ValueError:
+        return None
+    return None
+
+
+@lru_cache(maxsize=PARSE_MEMO_SIZE)
+def _parse_memo(value: str, tz: ZoneInfo, today: date) -> datetime:
+    # ``today`` is part of the key because dateutil fills missing date parts
+    # from the current date; results are immutable so sharing them is safe.
+    dt = _parse_fast(value)
+    if dt is None:
+        dt = parser.parse(value)
+    return ensure_timezone(dt, tz)
+
+
 def parse_datetime(value: str, tz: ZoneInfo | None = None) -> datetime:
     """Parse a wide variety of datetime strings.
 
     The scraper inputs are intentionally flexible: ICS timestamps, ISO-8601
-    strings, or free-form text from HTML calendars. ``dateutil`` provides the
-    best compromise between robustness and size for this use case.
+    strings, or free-form text from HTML calendars. Strict ISO-8601 and a few
+    common feed layouts are parsed directly; everything else goes through
+    ``dateutil``, which provides the best compromise between robustness and
+    size for this use case. Results are memoized per ``(value, tz)``.
     """
 
     tz = tz or DEFAULT_TIMEZONE
-    dt = parser.parse(value)
-    return ensure_timezone(dt, tz)
+    if not isinstance(value, str):
+        return ensure_timezone(parser.parse(value), tz)
+    return _parse_memo(value, tz, date.today())
 
 
 def default_duration_for_event(category: str | None, all_day: bool) -> timedelta:
@@ -54,24 +161,22 @@ def default_duration_for_event(category: str | None, all_day: bool) -> timedelta
     return timedelta(hours=1, minutes=15)
 
 
+@lru_cache(maxsize=32)
+def _quiet_windows(pairs: Tuple[Tuple[str, str], ...]) -> TimeWindows:
+    return TimeWindows(quiet=pairs)
+
+
 def in_quiet_hours(start: datetime, end: datetime, quiet_windows: Iterable[Tuple[str, str]] | None) -> bool:
-    """Return True if the event overlaps configured quiet hours."""
+    """Return True if the event overlaps configured quiet hours.
+
+    Callers checking many events should build a
+    :class:`~util.time_windows.TimeWindows` once instead.
+    """
 
     if not quiet_windows:
         return False
-    for start_str, end_str in quiet_windows:
-        quiet_start = parser.parse(start_str).time()
-        quiet_end = parser.parse(end_str).time()
-        if quiet_start <= quiet_end:
-            if quiet_start <= start.time() < quiet_end:
-                return True
-        else:
-            # Window wraps midnight.
-            if start.time() >= quiet_start or start.time() < quiet_end:
-                return True
-        if quiet_start <= end.time() < quiet_end:
-            return True
-    return False
+    pairs = tuple(tuple(pair) for pair in quiet_windows)
+    return _quiet_windows(pairs).in_quiet_hours(start, end)
 
 
 def week_key(dt: datetime) -> Tuple[int, int]:
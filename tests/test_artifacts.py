@@ -0,0 +1,54 @@
+from pathlib import Path
+import os
+import re
+import sys
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'src'))
+
+from util.artifacts import artifact_counts, artifact_manifest, reset_artifact_manifest, write_artifact
+
+
+def test_unchanged_content_is_not_rewritten(tmp_path: Path) -> None:
+    reset_artifact_manifest()
+    path = tmp_path / "out" / "report.md"
+    assert write_artifact(path, "# Report\n")
+    os.utime(path, ns=(1, 1))
+
+    assert not write_artifact(path, "# Report\n")
+    assert path.stat().st_mtime_ns == 1
+    assert write_artifact(path, [b"# Report\n", b"- new line\n"])
+    assert path.read_text() == "# Report\n- new line\n"
+    assert oct(path.stat().st_mode & 0o777) == oct(0o644)
+    assert sorted(p.name for p in path.parent.iterdir()) == ["report.md"]
+
+    manifest = artifact_manifest()
+    assert manifest["counts"] == {"created": 0, "changed": 1, "unchanged": 0}
+    assert manifest["artifacts"][0]["path"] == str(path)
+    assert manifest["artifacts"][0]["bytes"] == len("# Report\n- new line\n")
+
+
+def test_volatile_lines_do_not_count_as_changes(tmp_path: Path) -> None:
+    reset_artifact_manifest()
+    stamp = re.compile(rb"^STAMP:.*\n", re.MULTILINE)
+    path = tmp_path / "feed.txt"
+    write_artifact(path, b"A\nSTAMP:1\nB\n", volatile=stamp)
+    assert not write_artifact(path, [b"A\n", b"STAMP:2\nB\n"], volatile=stamp)
+    assert path.read_bytes() == b"A\nSTAMP:1\nB\n"
+    assert write_artifact(path, b"A\nSTAMP:3\nC\n", volatile=stamp)
+    assert artifact_counts() == {"created": 0, "changed": 1, "unchanged": 0}
+
+
+def test_failed_write_keeps_the_old_file(tmp_path: Path) -> None:
+    path = tmp_path / "events.jsonl"
+    write_artifact(path, "old\n")
+
+    def chunks():
+        yield b"partial"
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        write_artifact(path, chunks())
+    assert path.read_text() == "old\n"
+    assert [p.name for p in tmp_path.iterdir()] == ["events.jsonl"]
@@ -1,4 +1,6 @@
+from datetime import date, datetime, timedelta
 from pathlib import Path
+import os
 import sys
 
 import pytest
@@ -7,7 +9,9 @@ sys.path.append(str(Path(__file__).resolve().parents[1] / 'src'))
 
 icalendar = pytest.importorskip('icalendar')
 
+import availability
 from availability import load_calendar_events, summarise_evenings
+from util.timez import DEFAULT_TIMEZONE
 
 ICS_SAMPLE = """BEGIN:VCALENDAR\nVERSION:2.0\nBEGIN:VEVENT\nDTSTART:20250929T223000Z\nDTEND:20250929T233000Z\nSUMMARY:Late Meeting\nEND:VEVENT\nEND:VCALENDAR"""
 
@@ -30,3 +34,108 @@ def test_summarise_evenings_flags_busy_slot(tmp_path: Path) -> None:
     }
     summary = summarise_evenings(events, preferences=prefs, horizon_days=1)
     assert any(payload["status"] == "busy" for payload in summary.values())
+
+
+def test_summarise_evenings_handles_spanning_and_transparent_entries(tmp_path: Path) -> None:
+    today = datetime.now(DEFAULT_TIMEZONE).date()
+
+    def stamp(offset: int, clock: str) -> str:
+        return (today + timedelta(days=offset)).strftime("%Y%m%d") + "T" + clock
+
+    ics_path = tmp_path / "fixture.ics"
+    ics_path.write_text(
+        "BEGIN:VCALENDAR\nVERSION:2.0\n"
+        f"BEGIN:VEVENT\nDTSTART;TZID=America/Detroit:{stamp(-1, '200000')}\n"
+        f"DTEND;TZID=America/Detroit:{stamp(0, '190000')}\nSUMMARY:Conference\nEND:VEVENT\n"
+        f"BEGIN:VEVENT\nDTSTART;TZID=America/Detroit:{stamp(1, '180000')}\n"
+        f"DTEND;TZID=America/Detroit:{stamp(1, '200000')}\nSUMMARY:Reminder\nTRANSP:TRANSPARENT\nEND:VEVENT\n"
+        "END:VCALENDAR"
+    )
+    events = load_calendar_events(ics_path)
+    evening = ["17:30", "21:30"]
+    prefs = {"time_windows": {"evenings": {"weekdays": evening, "saturday": evening, "sunday": evening}}}
+    summary = summarise_evenings(events, preferences=prefs, horizon_days=1)
+    assert summary[today.isoformat()] == {"status": "busy", "notes": "Conference"}
+    assert summary[(today + timedelta(days=1)).isoformat()]["status"] == "free"
+
+
+RECURRING_SAMPLE = """BEGIN:VCALENDAR
+VERSION:2.0
+BEGIN:VEVENT
+UID:standup
+SUMMARY:Evening Standup
+DTSTART;TZID=America/Detroit:20200106T180000
+DTEND;TZID=America/Detroit:20200106T190000
+RRULE:FREQ=WEEKLY;BYDAY=MO
+EXDATE;TZID=America/Detroit:20300513T180000
+END:VEVENT
+BEGIN:VEVENT
+UID:standup
+SUMMARY:Evening Standup (moved)
+RECURRENCE-ID;TZID=America/Detroit:20300520T180000
+DTSTART;TZID=America/Detroit:20300521T200000
+DTEND;TZID=America/Detroit:20300521T210000
+END:VEVENT
+BEGIN:VEVENT
+UID:trip
+SUMMARY:Trip
+DTSTART;VALUE=DATE:20300508
+TRANSP:TRANSPARENT
+END:VEVENT
+END:VCALENDAR
+"""
+
+
+def test_horizon_load_expands_recurrences(tmp_path: Path) -> None:
+    ics_path = tmp_path / "calendar.ics"
+    ics_path.write_text(RECURRING_SAMPLE)
+    entries = load_calendar_events(ics_path, horizon_days=21, today=date(2030, 5, 6), snapshot_dir=tmp_path)
+    starts = [(entry["summary"], entry["start"].strftime("%Y-%m-%dT%H:%M")) for entry in entries]
+    assert starts == [
+        ("Evening Standup", "2030-05-06T18:00"),
+        ("Trip", "2030-05-08T00:00"),
+        ("Evening Standup (moved)", "2030-05-21T20:00"),
+        ("Evening Standup", "2030-05-27T18:00"),
+    ]
+    assert entries[1]["transparent"] and entries[1]["end"] - entries[1]["start"] == timedelta(days=1)
+
+
+def test_horizon_load_reuses_snapshot_until_export_changes(tmp_path: Path, monkeypatch) -> None:
+    ics_path = tmp_path / "calendar.ics"
+    ics_path.write_text(RECURRING_SAMPLE)
+    first = load_calendar_events(ics_path, horizon_days=21, today=date(2030, 5, 6), snapshot_dir=tmp_path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("export was parsed again")
+
+    monkeypatch.setattr(availability, "_window_entries", fail)
+    assert load_calendar_events(ics_path, horizon_days=21, today=date(2030, 5, 6), snapshot_dir=tmp_path) == first
+    # Touched but unchanged: the digest still matches.
+    stat = ics_path.stat()
+    os.utime(ics_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert load_calendar_events(ics_path, horizon_days=21, today=date(2030, 5, 6), snapshot_dir=tmp_path) == first
+
+    monkeypatch.undo()
+    ics_path.write_text(RECURRING_SAMPLE.replace("Evening Standup", "Evening Sync"))
+    changed = load_calendar_events(ics_path, horizon_days=21, today=date(2030, 5, 6), snapshot_dir=tmp_path)
+    assert changed[0]["summary"] == "Evening Sync"
+    # A window reaching past the stored slack is parsed again.
+    later = load_calendar_events(ics_path, horizon_days=21, today=date(2030, 5, 20), snapshot_dir=tmp_path)
+    assert [entry["summary"] for entry in later][:2] == ["Evening Sync (moved)", "Evening Sync"]
+
+
+def test_later_days_reuse_the_previous_snapshot(tmp_path: Path, monkeypatch) -> None:
+    ics_path = tmp_path / "calendar.ics"
+    ics_path.write_text(RECURRING_SAMPLE)
+    load_calendar_events(ics_path, horizon_days=21, today=date(2030, 5, 6), snapshot_dir=tmp_path)
+    days = [date(2030, 5, 7), date(2030, 5, 8)]
+    expected = [load_calendar_events(ics_path, horizon_days=21, today=day, snapshot_dir=tmp_path / str(day)) for day in days]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("export was parsed again")
+
+    monkeypatch.setattr(availability, "_window_entries", fail)
+    later = [load_calendar_events(ics_path, horizon_days=21, today=day, snapshot_dir=tmp_path) for day in days]
+    assert later == expected
+    # The snapshot also holds the standups of 6 May and 3 June; the 8th's window excludes both.
+    assert [entry["start"].strftime("%m-%d") for entry in later[1]] == ["05-08", "05-21", "05-27"]
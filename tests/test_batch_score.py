@@ -0,0 +1,70 @@
+from pathlib import Path
+import json
+import random
+import sys
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'src'))
+
+numpy = pytest.importorskip('numpy')
+yaml = pytest.importorskip('yaml')
+
+from plan.batch_score import BatchScorer, attach_batch_scores
+from plan.score import score_event
+
+SRC = Path(__file__).resolve().parents[1] / 'src'
+CONFIG = json.loads((SRC / 'scoring_config.json').read_text())
+PREFERENCES = yaml.safe_load((SRC / 'preferences.yaml').read_text())
+
+WORDS = "climate energy run brunch yoga community mixer garden hike ai data center lecture jazz keynote".split()
+
+
+def _events(count: int, seed: int = 3) -> list[dict]:
+    rng = random.Random(seed)
+    events = []
+    for idx in range(count):
+        event = {
+            "title": " ".join(rng.choices(WORDS, k=4)),
+            "notes": " ".join(rng.choices(WORDS, k=rng.randrange(0, 20))),
+            "category": rng.choice(["Lecture", "climate", "arts", "Sports", None]),
+            "start_local": f"2030-05-{1 + idx % 28:02d}T{rng.randrange(8, 24):02d}:30",
+            "cost": rng.choice(["", "Free", "$10", "free with RSVP"]),
+            "source": rng.choice(["campus_farm", "aadl", "umich"]),
+            "travel_minutes": rng.choice([None, 10, 30, 31, 45, 46, 90.5]),
+        }
+        if rng.random() < 0.3:
+            event["tags"] = rng.sample(["wellbeing", "outdoors", "career", "networking"], k=2)
+        events.append(event)
+    return events
+
+
+def test_batch_scores_match_score_event() -> None:
+    events = _events(500)
+    scorer = BatchScorer(CONFIG, PREFERENCES)
+    scores = scorer.scores(scorer.features(events)).tolist()
+    assert scores == [score_event(event, CONFIG, PREFERENCES) for event in events]
+
+
+def test_weight_settings_rescore_without_re_extracting() -> None:
+    events = _events(200, seed=9)
+    scorer = BatchScorer(CONFIG, PREFERENCES)
+    features = scorer.features(events)
+
+    variant = {**CONFIG, "weights": {**CONFIG["weights"], "novelty": 0.4, "cost_penalty": -0.2}}
+    vectors = [scorer.weight_vector(), scorer.weight_vector(variant, PREFERENCES)]
+    both = scorer.score_many(features, vectors)
+
+    assert both.shape == (200, 2)
+    assert both[:, 1].tolist() == [score_event(event, variant, PREFERENCES) for event in events]
+
+
+def test_attach_batch_scores_and_columns() -> None:
+    events = _events(5)
+    attach_batch_scores(events, CONFIG, PREFERENCES)
+    assert [event["score"] for event in events] == [score_event(event, CONFIG, PREFERENCES) for event in events]
+
+    scorer = BatchScorer(CONFIG, PREFERENCES)
+    assert scorer.columns[0] == "goals.career_learning"
+    assert "category:lecture" in scorer.columns and scorer.columns[-1] == "must_see"
+    assert scorer.features([]).shape == (0, len(scorer.columns))
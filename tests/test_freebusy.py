@@ -0,0 +1,69 @@
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'src'))
+
+from plan.choose import choose_portfolio
+from util.freebusy import FreeBusy
+from util.timez import ensure_timezone
+
+
+def _at(day: int, hour: int, minute: int = 0) -> datetime:
+    return ensure_timezone(datetime(2030, 5, day, hour, minute))
+
+
+def test_cross_midnight_block_busies_both_days() -> None:
+    freebusy = FreeBusy([(_at(6, 22), _at(7, 1, 30))])
+    assert not freebusy.is_free(_at(6, 23), _at(6, 23, 30))
+    assert not freebusy.is_free(_at(7, 1), _at(7, 2))
+    assert freebusy.is_free(_at(7, 1, 30), _at(7, 3))
+    assert freebusy.is_free(_at(6, 20), _at(6, 22))
+    assert freebusy.free_minutes(date(2030, 5, 6)) == 22 * 60
+    assert freebusy.free_minutes(date(2030, 5, 7), (0, 120)) == 30
+
+
+def test_multi_day_and_utc_blocks() -> None:
+    freebusy = FreeBusy([(_at(6, 12), _at(9, 12))])
+    assert not freebusy.is_free(_at(8, 18), _at(8, 19))
+    assert freebusy.free_minutes(date(2030, 5, 8)) == 0
+
+    utc = FreeBusy([(datetime(2030, 5, 7, 2, 0, tzinfo=timezone.utc), datetime(2030, 5, 7, 3, 0, tzinfo=timezone.utc))])
+    # 02:00Z is 22:00 the previous evening in Detroit.
+    assert not utc.is_free(_at(6, 22), _at(6, 22, 15))
+    assert utc.is_free(_at(7, 2), _at(7, 3))
+
+
+def test_free_slots_join_across_midnight() -> None:
+    freebusy = FreeBusy([(_at(6, 9), _at(6, 17)), (_at(7, 9), _at(7, 12)), (_at(7, 12, 30), _at(7, 13))])
+    slots = freebusy.free_slots(_at(6, 8), _at(7, 14))
+    assert slots == [
+        (_at(6, 8), _at(6, 9)),
+        (_at(6, 17), _at(7, 9)),
+        (_at(7, 12), _at(7, 12, 30)),
+        (_at(7, 13), _at(7, 14)),
+    ]
+    assert freebusy.free_slots(_at(6, 8), _at(7, 14), min_minutes=60) == [slots[0], slots[1], slots[3]]
+
+
+def test_transparent_entries_are_ignored() -> None:
+    entries = [
+        {"start": _at(6, 18), "end": _at(6, 20), "summary": "Dinner"},
+        {"start": _at(7, 18), "end": _at(7, 20), "summary": "Reminder", "transparent": True},
+    ]
+    freebusy = FreeBusy.from_calendar_events(entries)
+    assert not freebusy.is_free(_at(6, 19), _at(6, 21))
+    assert freebusy.is_free(_at(7, 19), _at(7, 21))
+
+
+def test_planner_skips_busy_candidates() -> None:
+    events = [
+        {"uid": "busy", "start_local": "2030-05-06T18:00", "end_local": "2030-05-06T19:00", "score": 0.9},
+        {"uid": "free", "start_local": "2030-05-07T18:00", "end_local": "2030-05-07T19:00", "score": 0.5},
+    ]
+    config = {"hard_rules": {"no_overlap": True}}
+    preferences = {"time_windows": {"evenings": {"weekdays": ["17:00", "22:00"]}}}
+    freebusy = FreeBusy([(_at(6, 17), _at(6, 18) + timedelta(minutes=1))])
+    for planner in ("greedy", "optimal"):
+        portfolio = choose_portfolio(events, config, preferences, planner=planner, busy=freebusy)
+        assert [event["uid"] for event in portfolio["selected"]] == ["free"]
@@ -0,0 +1,127 @@
+from pathlib import Path
+import json
+import sys
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'src'))
+
+pytest.importorskip('bs4')
+
+from scrape import html_extract, html_pull
+
+
+PAGE = """<!DOCTYPE html><html><head><meta charset="utf-8"><title>Events</title>
+<style>.event{color:red}</style></head><body>
+<div class="listing">
+<!-- featured -->
+<article class="event">
+  <h2> Jazz &amp; Blues <em>Night</em> </h2>
+  <time>  2030-05-01 19:30 </time>
+  <div class="venue">Blind&nbsp;Pig <!-- note --> <span>208 S First St</span></div>
+  <a class="more" href="/events/jazz?x=1&amp;y=2">Details</a>
+  <div class="body"><p>Live music.</p><script>track('jazz')</script><p>All ages.</p></div>
+</article>
+<article class="event">
+  <h2>Café Talk</h2>
+  <time>May 3 2030 6pm</time>
+  <a class="more" href="/events/cafe"></a>
+</article>
+<article class="event"><h2>No date</h2></article>
+<article class="event"><h2>Bad date</h2><time>someday</time></article>
+</div></body></html>""".encode("utf-8")
+
+SOURCE = {
+    "slug": "demo",
+    "name": "Demo",
+    "url": "https://example.test/",
+    "city": "Ann Arbor, MI",
+    "category": "music",
+    "html": {
+        "item": "article.event",
+        "title": "h2",
+        "datetime": "time",
+        "location": "div.venue",
+        "notes": "div.body",
+        "url": "a.more::attr(href)",
+    },
+}
+
+# Output of the BeautifulSoup-only scraper for PAGE, kept byte for byte.
+GOLDEN = """[
+    {
+        "uid": "3765960922c3aed64221a82bdaca5fdf",
+        "title": "Jazz & BluesNight",
+        "start_local": "2030-05-01T19:30",
+        "end_local": "2030-05-01T20:45",
+        "all_day": false,
+        "timezone": "America/Detroit",
+        "location": "Blind\\u00a0Pig208 S First St",
+        "city": "Ann Arbor, MI",
+        "cost": "",
+        "category": "music",
+        "org": "Demo",
+        "url": "/events/jazz?x=1&y=2",
+        "image": null,
+        "source": "demo",
+        "notes": "Live music.All ages."
+    },
+    {
+        "uid": "e3dc1e71511bbdd2a9fc5b2a78dbc593",
+        "title": "Caf\\u00e9 Talk",
+        "start_local": "2030-05-03T18:00",
+        "end_local": "2030-05-03T19:15",
+        "all_day": false,
+        "timezone": "America/Detroit",
+        "location": "Ann Arbor, MI",
+        "city": "Ann Arbor, MI",
+        "cost": "",
+        "category": "music",
+        "org": "Demo",
+        "url": "/events/cafe",
+        "image": null,
+        "source": "demo",
+        "notes": ""
+    }
+]"""
+
+
+def _listing(rows: int) -> bytes:
+    items = "".join(
+        f"<li class='row'><h3>Event&nbsp;{idx} <b>#{idx}</b></h3><span class='when'> 2030-06-{1 + idx % 28:02d} 1{idx % 10}:00 </span>"
+        f"<a href='/e/{idx}?a=1&amp;b=2'>more</a><p class='where'>Room {idx}<!-- x --></p></li>"
+        for idx in range(rows)
+    )
+    return f"<html><body><ul>{items}</ul></body></html>".encode("utf-8")
+
+
+@pytest.fixture(params=html_extract.available_backends())
+def backend_source(request):
+    html_extract._compile_plan.cache_clear()
+    yield {**SOURCE, "html": {**SOURCE["html"], "backend": request.param}}
+    html_extract._compile_plan.cache_clear()
+
+
+def test_golden_output_for_every_backend(backend_source) -> None:
+    events = [row["event"] for row in html_pull._parse(PAGE, backend_source)]
+    assert json.dumps(events, indent=4) == GOLDEN
+
+
+def test_large_listing_matches_soup(backend_source) -> None:
+    html = {"item": "li.row", "title": "h3", "datetime": "span.when", "location": "p.where", "url": "a::attr(href)"}
+    reference = html_pull._parse(_listing(300), {**SOURCE, "html": {**html, "backend": "bs4"}})
+    rows = html_pull._parse(_listing(300), {**SOURCE, "html": {**html, "backend": backend_source["html"]["backend"]}})
+    assert len(reference) == 300
+    assert json.dumps(rows) == json.dumps(reference)
+
+
+def test_plan_splits_attr_suffix_once() -> None:
+    plan = html_extract.compile_plan({"item": "li", "url": "a.link::attr(href)", "title": "h3"})
+    assert {rule.name: rule.attribute for rule in plan.fields} == {"url": "href", "title": None}
+    assert html_extract.compile_plan({"item": "li", "title": "h3", "url": "a.link::attr(href)"}) is plan
+
+
+def test_unsupported_selector_falls_back_to_soup() -> None:
+    plan = html_extract.compile_plan({"item": "li:-soup-contains('Jazz')", "title": "h3"})
+    assert plan.backend.name == "bs4"
+    assert plan.extract(b"<ul><li><h3>Jazz</h3></li><li><h3>Folk</h3></li></ul>") == [{"title": "Jazz"}]
@@ -0,0 +1,275 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'src'))
+
+httpx = pytest.importorskip('httpx')
+
+from util import http_cache
+from util.blob_store import BlobStore
+from util.cache_index import CacheIndex
+from util.cache_policy import freshness_lifetime, initial_age
+from util.fetch_scheduler import HostCircuitOpen
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    body = b"BEGIN:VCALENDAR\r\nEND:VCALENDAR\r\n"
+    etag = '"v1"'
+
+    def do_GET(self) -> None:  # noqa: N802 - stdlib naming
+        self.server.peers.add(self.client_address)
+        self.server.hits += 1
+        if self.path.startswith("/dead") or (self.path.startswith("/flaky") and self.server.hits <= 2):
+            self.send_response(503)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", self.etag)
+        if self.path.startswith(("/fresh", "/aged")):
+            self.send_header("Cache-Control", "max-age=600")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def date_time_string(self, timestamp=None) -> str:
+        # "/aged" plays an upstream cache that serves a two-hour-old copy without an Age header.
+        if self.path.startswith("/aged"):
+            timestamp = time.time() - 7200
+        return super().date_time_string(timestamp)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.peers = set()
+    httpd.hits = 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def cache_dir(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(http_cache, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(http_cache, "INDEX_FILE", tmp_path / "index.json")
+    http_cache.close_client()
+    http_cache.configure_cache_policy()
+    defaults = http_cache.configure_scheduler()
+    http_cache.configure_scheduler(rate_per_second=1000.0, backoff_base=0.001, max_retries=2, breaker_threshold=2)
+    yield tmp_path
+    http_cache.configure_cache_policy()
+    http_cache.configure_scheduler(**defaults.__dict__)
+    http_cache.close_client()
+    http_cache.close_index()
+
+
+def test_fetch_revalidates_with_etag(server, cache_dir: Path) -> None:
+    url = f"http://127.0.0.1:{server.server_port}/feed.ics"
+    first = http_cache.fetch(url)
+    second = http_cache.fetch(url)
+    assert not first.from_cache
+    assert second.from_cache and second.status_code == 304
+    assert second.content == first.content
+
+
+def test_fetch_reuses_pooled_connection(server, cache_dir: Path) -> None:
+    for idx in range(10):
+        http_cache.fetch(f"http://127.0.0.1:{server.server_port}/source-{idx}", force_refresh=True)
+    assert server.hits == 10
+    assert len(server.peers) == 1
+
+
+def test_fetch_serves_fresh_entries_without_network(server, cache_dir: Path) -> None:
+    url = f"http://127.0.0.1:{server.server_port}/fresh.ics"
+    http_cache.fetch(url)
+    again = http_cache.fetch(url)
+    assert again.from_cache
+    assert server.hits == 1
+    assert http_cache.cache_stats()["hits"] == 1
+
+
+def test_per_source_ttl_and_offline_mode(server, cache_dir: Path) -> None:
+    url = f"http://127.0.0.1:{server.server_port}/feed.ics"
+    http_cache.fetch(url)
+    http_cache.fetch(url, ttl="1h")
+    assert server.hits == 1
+
+    http_cache.configure_cache_policy(offline=True)
+    assert http_cache.fetch(url).from_cache
+    with pytest.raises(http_cache.OfflineCacheMiss):
+        http_cache.fetch(f"http://127.0.0.1:{server.server_port}/never-seen.ics")
+    assert server.hits == 1
+    assert http_cache.cache_stats() == {"hits": 0, "stale": 1, "revalidated": 0, "misses": 0, "offline_misses": 1}
+
+
+def test_freshness_lifetime_reads_expires_relative_to_date() -> None:
+    headers = {
+        "Date": "Mon, 06 Oct 2025 10:00:00 GMT",
+        "Expires": "Mon, 06 Oct 2025 11:00:00 GMT",
+    }
+    assert freshness_lifetime(headers) == 3600
+    assert freshness_lifetime({**headers, "Cache-Control": "no-cache"}) == 0
+
+
+def test_initial_age_uses_date_header_for_apparent_age() -> None:
+    headers = {"Date": "Mon, 06 Oct 2025 10:00:00 GMT"}
+    received = 1759746600.0  # 10:30 GMT
+    assert initial_age(headers, response_time=received) == 1800
+    assert initial_age({**headers, "Age": "2400"}, response_time=received) == 2400
+    assert initial_age(headers, response_time=received - 3600) == 0
+    assert initial_age({"Age": "60"}) == 60
+
+
+def test_fetch_counts_date_header_age_against_max_age(server, cache_dir: Path) -> None:
+    url = f"http://127.0.0.1:{server.server_port}/aged.ics"
+    http_cache.fetch(url)
+    again = http_cache.fetch(url)
+    assert server.hits == 2
+    assert again.status_code == 304
+
+
+def test_cache_index_touch_refreshes_validators(tmp_path: Path) -> None:
+    index = CacheIndex(tmp_path / "index.sqlite3")
+    url = "https://a.example/feed"
+    index.put(url, {"filename": "abc", "etag": '"v1"', "last_modified": "Mon, 06 Oct 2025 10:00:00 GMT"})
+    index.touch(url, {"etag": '"v2"'})
+    entry = index.get(url)
+    assert entry["etag"] == '"v2"'
+    assert entry["last_modified"] == "Mon, 06 Oct 2025 10:00:00 GMT"
+    index.touch(url, {"Last-Modified": "Tue, 07 Oct 2025 10:00:00 GMT"})
+    entry = index.get(url)
+    assert entry["etag"] == '"v2"'
+    assert entry["last_modified"] == "Tue, 07 Oct 2025 10:00:00 GMT"
+    index.close()
+
+
+def test_fetch_retries_through_transient_503s(server, cache_dir: Path) -> None:
+    result = http_cache.fetch(f"http://127.0.0.1:{server.server_port}/flaky.ics")
+    assert result.status_code == 200
+    assert server.hits == 3
+
+
+def test_host_slot_is_released_between_attempts(server, cache_dir: Path, monkeypatch) -> None:
+    defaults = http_cache.configure_transport()
+    http_cache.configure_transport(max_per_host=1)
+    scheduler = http_cache.get_scheduler()
+    free_between: list[bool] = []
+
+    def request(host, send):
+        send()  # a first attempt the scheduler decided to retry
+        slot = http_cache._host_slots[host]
+        free_between.append(slot.acquire(blocking=False))
+        slot.release()
+        return send()
+
+    monkeypatch.setattr(scheduler, "request", request)
+    try:
+        assert http_cache.fetch(f"http://127.0.0.1:{server.server_port}/feed.ics").status_code == 200
+    finally:
+        http_cache.configure_transport(max_per_host=defaults.max_per_host)
+    assert free_between == [True]
+    assert server.hits == 2
+
+
+def test_breaker_opens_for_dead_host_and_persists(server, cache_dir: Path) -> None:
+    url = f"http://127.0.0.1:{server.server_port}/dead.ics"
+    for _ in range(2):
+        with pytest.raises(httpx.HTTPStatusError):
+            http_cache.fetch(url)
+    assert server.hits == 6
+
+    http_cache.close_index()  # a fresh run reloads breaker state from disk
+    with pytest.raises(HostCircuitOpen):
+        http_cache.fetch(url)
+    assert server.hits == 6
+
+
+def test_cache_index_migrates_legacy_json(tmp_path: Path) -> None:
+    legacy = tmp_path / "index.json"
+    legacy.write_text('{"https://a.example/feed": {"filename": "abc", "etag": "\\"x\\"", "response_headers": {"ETag": "\\"x\\""}}}')
+    index = CacheIndex(tmp_path / "index.sqlite3", legacy_json=legacy)
+    entry = index.get("https://a.example/feed")
+    assert entry["filename"] == "abc"
+    assert entry["response_headers"] == {"ETag": '"x"'}
+    assert entry["updated_at"] == 0  # unknown storage time: revalidate on first use
+    assert not legacy.exists()
+    index.close()
+
+
+def test_cache_index_concurrent_writers_keep_all_entries(tmp_path: Path) -> None:
+    index = CacheIndex(tmp_path / "index.sqlite3")
+
+    def writer(worker: int) -> None:
+        for idx in range(50):
+            index.put(f"https://host.example/{worker}/{idx}", {"filename": f"{worker}-{idx}"})
+
+    threads = [threading.Thread(target=writer, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(index) == 200
+    index.close()
+
+
+def test_blob_store_dedupes_bodies_and_evicts_lru(tmp_path: Path) -> None:
+    index = CacheIndex(tmp_path / "index.sqlite3")
+    store = BlobStore(tmp_path / "blobs", index, codec="gzip")
+    body = b"BEGIN:VCALENDAR\r\n" + b"X" * 4096 + b"END:VCALENDAR\r\n"
+    digest = store.put(body)
+    assert store.put(body) == digest
+    index.put("https://a.example/feed", {"filename": "a", "blob": digest})
+    index.put("https://b.example/feed", {"filename": "b", "blob": digest})
+    assert index.get_blob(digest)["refcount"] == 2
+    assert index.get_blob(digest)["stored_size"] < len(body)
+    assert store.read(digest) == body
+
+    other = store.put(b"unreferenced")
+    result = store.gc(max_bytes=0, grace=0)
+    assert result["orphans_removed"] == 1 and result["evicted"] == 1
+    assert index.get("https://a.example/feed") is None
+    assert not store.exists(digest) and not store.exists(other)
+    index.close()
+
+
+def test_blob_store_gc_spares_orphans_inside_grace_period(tmp_path: Path) -> None:
+    index = CacheIndex(tmp_path / "index.sqlite3")
+    store = BlobStore(tmp_path / "blobs", index, codec="gzip")
+    digest = store.put(b"written, not yet referenced")
+    assert store.gc()["orphans_removed"] == 0
+    index.put("https://a.example/feed", {"filename": "a", "blob": digest})
+    assert store.exists(digest) and store.read(digest) == b"written, not yet referenced"
+    index.close()
+
+
+def test_fetch_moves_legacy_body_files_into_blob_store(server, cache_dir: Path) -> None:
+    url = f"http://127.0.0.1:{server.server_port}/feed.ics"
+    http_cache.fetch(url)
+    index = http_cache.get_index()
+    entry = index.get(url)
+    legacy = cache_dir / entry["filename"]
+    legacy.write_bytes(_Handler.body)
+    index.put(url, {**entry, "blob": None})
+
+    again = http_cache.fetch(url)
+    assert again.content == _Handler.body
+    assert not legacy.exists()
+    assert index.get(url)["blob"] == again.digest
@@ -0,0 +1,114 @@
+from datetime import date, datetime
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'src'))
+
+pytest.importorskip('icalendar')
+
+from util.ics_stream import block_in_window, iter_occurrences
+from util.timez import DEFAULT_TIMEZONE
+
+WINDOW_START = datetime(2030, 3, 1, tzinfo=DEFAULT_TIMEZONE)
+WINDOW_END = datetime(2030, 3, 31, tzinfo=DEFAULT_TIMEZONE)
+
+
+def _feed(*events: str) -> bytes:
+    body = "".join(f"BEGIN:VEVENT\r\n{event.strip()}\r\nEND:VEVENT\r\n" for event in events)
+    return f"BEGIN:VCALENDAR\r\nVERSION:2.0\r\n{body}END:VCALENDAR\r\n".encode("utf-8")
+
+
+def _occurrences(content: bytes) -> list[tuple[str, str]]:
+    return sorted(
+        (str(occ.component.get("summary")), occ.start.strftime("%Y-%m-%dT%H:%M"))
+        for occ in iter_occurrences(content, WINDOW_START, WINDOW_END)
+    )
+
+
+def test_one_off_events_outside_window_are_dropped() -> None:
+    content = _feed(
+        "UID:old\r\nSUMMARY:Old\r\nDTSTART:20200105T180000\r\nDTEND:20200105T200000",
+        "UID:in\r\nSUMMARY:In\r\nDTSTART:20300310T180000\r\nDTEND:20300310T200000",
+        "UID:late\r\nSUMMARY:Late\r\nDTSTART:20300601T180000",
+    )
+    assert _occurrences(content) == [("In", "2030-03-10T18:00")]
+
+
+def test_weekly_series_honours_exdate_and_overrides() -> None:
+    content = _feed(
+        """
+UID:yoga
+SUMMARY:Yoga
+DTSTART;TZID=America/Detroit:20300107T180000
+DTEND;TZID=America/Detroit:20300107T190000
+RRULE:FREQ=WEEKLY;UNTIL=20300325
+EXDATE;TZID=America/Detroit:20300311T180000
+""",
+        """
+UID:yoga
+SUMMARY:Yoga (moved)
+RECURRENCE-ID;TZID=America/Detroit:20300318T180000
+DTSTART;TZID=America/Detroit:20300319T070000
+DTEND;TZID=America/Detroit:20300319T080000
+""",
+        """
+UID:yoga
+SUMMARY:Yoga
+RECURRENCE-ID;TZID=America/Detroit:20300325T180000
+DTSTART;TZID=America/Detroit:20300325T180000
+STATUS:CANCELLED
+""",
+    )
+    assert _occurrences(content) == [
+        ("Yoga", "2030-03-04T18:00"),
+        ("Yoga (moved)", "2030-03-19T07:00"),
+    ]
+    uids = {occ.instance for occ in iter_occurrences(content, WINDOW_START, WINDOW_END)}
+    assert uids == {"20300304T1800", "20300318T1800"}
+
+
+def test_rdate_and_all_day_series() -> None:
+    content = _feed(
+        """
+UID:market
+SUMMARY:Market
+DTSTART;VALUE=DATE:20300302
+DTEND;VALUE=DATE:20300303
+RRULE:FREQ=WEEKLY;COUNT=2
+RDATE;VALUE=DATE:20300330
+""",
+    )
+    occurrences = list(iter_occurrences(content, WINDOW_START, WINDOW_END))
+    assert [(occ.start.date(), occ.all_day) for occ in sorted(occurrences, key=lambda occ: occ.start)] == [
+        (date(2030, 3, 2), True),
+        (date(2030, 3, 9), True),
+        (date(2030, 3, 30), True),
+    ]
+
+
+def test_series_keeps_local_wall_time_across_dst() -> None:
+    content = _feed(
+        "UID:club\r\nSUMMARY:Club\r\nDTSTART;TZID=America/Detroit:20300201T190000\r\nDURATION:PT2H\r\nRRULE:FREQ=DAILY",
+    )
+    times = {occ.start.strftime("%H:%M") for occ in iter_occurrences(content, WINDOW_START, WINDOW_END)}
+    assert times == {"19:00"}
+    assert len(list(iter_occurrences(content, WINDOW_START, WINDOW_END))) == 30
+
+
+def test_prefilter_is_conservative() -> None:
+    first, last = date(2030, 3, 1), date(2030, 3, 31)
+    assert not block_in_window(b"BEGIN:VEVENT\r\nDTSTART:20200101T100000\r\nEND:VEVENT\r\n", first, last)
+    assert not block_in_window(b"BEGIN:VEVENT\r\nDTSTART:20200101\r\nRRULE:FREQ=DAILY;UNTIL=20210101\r\nEND:VEVENT\r\n", first, last)
+    assert block_in_window(b"BEGIN:VEVENT\r\nDTSTART:20200101\r\nRRULE:FREQ=DAILY\r\nEND:VEVENT\r\n", first, last)
+    assert block_in_window(b"BEGIN:VEVENT\r\nDTSTART:20300228T230000Z\r\nEND:VEVENT\r\n", first, last)
+    assert block_in_window(b"BEGIN:VEVENT\r\nSUMMARY:no start\r\nEND:VEVENT\r\n", first, last)
+
+
+def test_broken_event_does_not_sink_the_batch() -> None:
+    content = _feed(
+        "UID:bad\r\nSUMMARY:Bad\r\nDTSTART:2030031X",
+        "UID:good\r\nSUMMARY:Good\r\nDTSTART:20300312T100000\r\nDTEND:20300312T110000",
+    )
+    assert _occurrences(content) == [("Good", "2030-03-12T10:00")]
@@ -0,0 +1,100 @@
+from pathlib import Path
+import re
+import sys
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'src'))
+
+icalendar = pytest.importorskip('icalendar')
+
+from emit import ics_writer
+from emit.ics_writer import clear_vevent_cache, render_vevent, write_ics
+
+EVENTS = [
+    {
+        "uid": "talk-1",
+        "title": "Talk, with commas",
+        "start_local": "2030-05-06T18:00",
+        "end_local": "2030-05-06T19:30",
+        "location": "Rackham",
+        "notes": "A long description " * 10,
+    },
+    {
+        "uid": "fair",
+        "title": "Fair",
+        "start_local": "2030-05-09T00:00",
+        "end_local": "2030-05-10T00:00",
+        "url": "https://example.org/fair?day=1",
+        "all_day": True,
+    },
+]
+
+
+def test_calendars_parse_and_rollback_overrides_status(tmp_path: Path) -> None:
+    clear_vevent_cache()
+    write_ics(EVENTS, tmp_path / "winners.ics", calendar_name="Picks")
+    write_ics(EVENTS, tmp_path / "winners-REMOVE.ics", calendar_name="Picks (Rollback)", cancelled=True)
+
+    winners = icalendar.Calendar.from_ical((tmp_path / "winners.ics").read_bytes())
+    assert str(winners["X-WR-CALNAME"]) == "Picks"
+    components = winners.walk("VEVENT")
+    assert [str(c["summary"]) for c in components] == ["Talk, with commas", "Fair"]
+    assert "status" not in components[0] and str(components[1]["transp"]) == "TRANSPARENT"
+
+    rollback = icalendar.Calendar.from_ical((tmp_path / "winners-REMOVE.ics").read_bytes())
+    for component in rollback.walk("VEVENT"):
+        assert str(component["status"]) == "CANCELLED"
+        assert "transp" not in component
+    # Both files share the rendered bodies, DTSTAMP included.
+    assert [c["dtstamp"].dt for c in rollback.walk("VEVENT")] == [c["dtstamp"].dt for c in components]
+
+
+def test_vevents_render_once_per_content(monkeypatch) -> None:
+    clear_vevent_cache()
+    calls = []
+    original = ics_writer._event_component
+
+    def counting(event):
+        calls.append(event["uid"])
+        return original(event)
+
+    monkeypatch.setattr(ics_writer, "_event_component", counting)
+    first = render_vevent(EVENTS[0])
+    assert render_vevent(dict(EVENTS[0])) == first
+    render_vevent(EVENTS[0], status="CANCELLED")
+    assert calls == ["talk-1"]
+    render_vevent(dict(EVENTS[0], title="Talk (moved)"))
+    assert calls == ["talk-1", "talk-1"]
+
+
+def test_vevents_match_the_per_file_calendar_rebuild() -> None:
+    clear_vevent_cache()
+    for event in EVENTS:
+        for status in (None, "CANCELLED"):
+            # The pre-cache writer: a fresh component per file, overrides added as properties.
+            component = ics_writer._event_component(event)
+            if status:
+                component.add("status", status)
+            elif event.get("all_day"):
+                component.add("transp", "TRANSPARENT")
+            golden = ics_writer.DTSTAMP_LINE.sub(b"", component.to_ical())
+            assert ics_writer.DTSTAMP_LINE.sub(b"", render_vevent(event, status=status)) == golden
+
+
+def test_missing_start_is_rejected(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        write_ics([{"uid": "x", "title": "No start"}], tmp_path / "bad.ics")
+
+
+def test_only_dtstamp_changes_leave_the_file_alone(tmp_path: Path) -> None:
+    path = tmp_path / "winners.ics"
+    write_ics(EVENTS, path, calendar_name="Picks")
+    stale = re.sub(rb"DTSTAMP:\d{8}T\d{6}Z", b"DTSTAMP:20000101T000000Z", path.read_bytes())
+    path.write_bytes(stale)
+
+    clear_vevent_cache()
+    write_ics(EVENTS, path, calendar_name="Picks")
+    assert path.read_bytes() == stale
+    write_ics(EVENTS[:1], path, calendar_name="Picks")
+    assert path.read_bytes() != stale
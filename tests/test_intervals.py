@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+import random
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'src'))
+
+from plan.intervals import IntervalIndex
+from util.timez import DEFAULT_TIMEZONE
+
+
+def _brute(intervals, start, end) -> bool:
+    return any(max(start, other_start) < min(end, other_end) for other_start, other_end in intervals)
+
+
+def test_matches_linear_scan_on_random_intervals() -> None:
+    rng = random.Random(4)
+    index = IntervalIndex()
+    inserted: list[tuple[int, int]] = []
+    for _ in range(2000):
+        start = rng.randrange(0, 5000)
+        end = start + rng.randrange(-5, 60)
+        assert index.overlaps(start, end) == _brute(inserted, start, end)
+        if rng.random() < 0.3:
+            index.add(start, end)
+            inserted.append((start, end))
+    runs = list(index)
+    assert all(left[1] < right[0] for left, right in zip(runs, runs[1:]))
+    assert list(IntervalIndex(inserted)) == runs
+
+
+def test_touching_and_empty_intervals() -> None:
+    index = IntervalIndex([(10, 20), (20, 30), (40, 40), (50, 45)])
+    assert list(index) == [(10, 30)]
+    assert not index.overlaps(30, 35)
+    assert not index.overlaps(5, 10)
+    assert index.overlaps(29, 31)
+    assert not index.overlaps(15, 15)
+    index.add(0, 100)
+    assert list(index) == [(0, 100)]
+
+
+def test_busy_blocks_from_calendar_events() -> None:
+    start = datetime(2030, 5, 6, 18, 0, tzinfo=DEFAULT_TIMEZONE)
+    busy = IntervalIndex.from_calendar_events([{"start": start, "end": start + timedelta(hours=2), "summary": "Dinner"}])
+    assert busy.overlaps(start + timedelta(hours=1), start + timedelta(hours=3))
+    assert not busy.overlaps(start + timedelta(hours=2), start + timedelta(hours=3))
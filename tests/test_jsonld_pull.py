@@ -0,0 +1,95 @@
+from pathlib import Path
+import json
+import sys
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'src'))
+
+pytest.importorskip('bs4')
+
+from scrape import jsonld_pull
+
+
+SOURCE = {"slug": "demo", "url": "https://example.test/events", "city": "Ann Arbor, MI"}
+
+
+def _page(*payloads, extra: str = "") -> bytes:
+    scripts = "".join(
+        f'<script type="application/ld+json">{json.dumps(payload)}</script>' for payload in payloads
+    )
+    return (
+        "<html><head><title>Events</title>"
+        "<script>var x = '<div>';</script>"
+        f"{scripts}</head><body><!-- <script type=\"application/ld+json\">{{}}</script> -->"
+        f"<div class='event'>Listing</div>{extra}</body></html>"
+    ).encode("utf-8")
+
+
+def _titles(content: bytes) -> list[str]:
+    return [row["event"]["title"] for row in jsonld_pull._parse(content, SOURCE)]
+
+
+def test_fast_scan_matches_soup() -> None:
+    content = _page(
+        {"@type": "Event", "name": "Talk", "startDate": "2030-05-01T18:00"},
+        [{"@type": "Event", "name": "Walk", "startDate": "2030-05-02T09:00"}],
+    )
+    assert jsonld_pull._script_payloads_fast(content) == jsonld_pull._script_payloads_soup(content)
+    assert _titles(content) == ["Talk", "Walk"]
+
+
+def test_graph_type_lists_and_subtypes() -> None:
+    content = _page(
+        {
+            "@context": "https://schema.org",
+            "@graph": [
+                {"@type": "Organization", "name": "UMich"},
+                {"@type": ["Event", "Thing"], "name": "Lecture", "startDate": "2030-05-01T18:00"},
+                {"@type": "schema:MusicEvent", "name": "Concert", "startDate": "2030-05-03T20:00"},
+            ],
+        }
+    )
+    assert _titles(content) == ["Lecture", "Concert"]
+
+
+def test_sub_events_inherit_parent_location() -> None:
+    content = _page(
+        {
+            "@type": "Festival",
+            "name": "Not an event type",
+        },
+        {
+            "@type": "Event",
+            "name": "Festival",
+            "startDate": "2030-06-01T10:00",
+            "location": {"name": "Diag"},
+            "subEvent": [
+                {"@type": "Event", "name": "Opening", "startDate": "2030-06-01T10:00"},
+                {"@type": "Event", "name": "Closing", "startDate": "2030-06-01T20:00", "location": {"name": "Hill"}},
+            ],
+        },
+    )
+    rows = jsonld_pull._parse(content, SOURCE)
+    assert [(row["event"]["title"], row["event"]["location"]) for row in rows] == [
+        ("Festival", "Diag"),
+        ("Opening", "Diag"),
+        ("Closing", "Hill"),
+    ]
+
+
+def test_undecodable_markup_falls_back_to_soup() -> None:
+    payload = {"@type": "Event", "name": "Caf\u00e9 night", "startDate": "2030-05-01T18:00"}
+    content = (
+        '<html><head><meta charset="iso-8859-1">'
+        f'<script type="application/ld+json">{json.dumps(payload, ensure_ascii=False)}</script>'
+        "</head></html>"
+    ).encode("latin-1")
+    assert jsonld_pull._script_payloads_fast(content) is None
+    assert _titles(content) == ["Caf\u00e9 night"]
+
+
+def test_unterminated_script_falls_back_to_soup() -> None:
+    content = _page({"@type": "Event", "name": "Talk", "startDate": "2030-05-01T18:00"}, extra="<script>var y = 1;")
+    assert jsonld_pull._script_payloads_fast(content) is None
+    assert _titles(content) == ["Talk"]
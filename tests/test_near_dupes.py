@@ -0,0 +1,94 @@
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'src'))
+
+from util import near_dupes
+from util.dedupe import dedupe_events
+from util.near_dupes import collapse_near_duplicates, find_near_duplicates, minhash, shingles
+
+
+def _event(uid: str, title: str, start: str, location: str = "Dana Building", source: str = "umich") -> dict:
+    return {"uid": uid, "title": title, "start_local": start, "location": location, "source": source}
+
+
+def test_cross_site_variants_collapse_into_earliest() -> None:
+    events = [
+        _event("dept", "Jane Roe on Carbon Markets (Climate Seminar)", "2030-03-04T16:10", "Dana Building, 440 Church St", "seas"),
+        _event("umich", "Climate Seminar: Jane Roe on Carbon Markets", "2030-03-04T16:00"),
+        _event("other-day", "Climate Seminar: Jane Roe on Carbon Markets", "2030-03-11T16:00"),
+        _event("unrelated", "Open Mic Night", "2030-03-04T20:00"),
+    ]
+    kept, dropped = collapse_near_duplicates(events, threshold=0.6)
+    assert [event["uid"] for event in kept] == ["umich", "other-day", "unrelated"]
+    assert [(event["uid"], event["duplicate_of"]) for event in dropped] == [("dept", "umich")]
+    assert 0.6 <= dropped[0]["similarity"] < 1
+    clusters = find_near_duplicates(events, threshold=0.6)
+    assert len(clusters) == 1 and clusters[0].keeper["uid"] == "umich"
+
+    assert find_near_duplicates(events, threshold=0.9) == []
+
+
+def test_numbered_parts_do_not_chain_through_unnumbered_title() -> None:
+    events = [
+        _event("part-1", "Climate Lecture Series Part 1", "2030-03-04T16:00"),
+        _event("part", "Climate Lecture Series Part", "2030-03-04T16:00"),
+        _event("part-2", "Climate Lecture Series Part 2", "2030-03-04T16:00"),
+    ]
+    clusters = find_near_duplicates(events, threshold=0.7)
+    assert [(c.keeper["uid"], [m["uid"] for m, _ in c.members]) for c in clusters] == [("part-1", ["part"])]
+    assert all(similarity >= 0.7 for c in clusters for _, similarity in c.members)
+    kept, _ = collapse_near_duplicates(events, threshold=0.7)
+    assert [event["uid"] for event in kept] == ["part-1", "part-2"]
+
+
+def test_dedupe_events_reports_near_duplicates(tmp_path: Path) -> None:
+    events = [
+        _event("a", "Yoga at Gallup Park", "2099-06-01T08:00", "Gallup Park"),
+        _event("b", "Yoga in Gallup Park", "2099-06-01T08:00", "Gallup Park"),
+    ]
+    unique, duplicates = dedupe_events([dict(e) for e in events], tmp_path / "registry.json")
+    assert len(unique) == 2 and duplicates == []
+
+    unique, duplicates = dedupe_events([dict(e) for e in events], tmp_path / "other.json", near_dup_threshold=0.6)
+    assert [event["uid"] for event in unique] == ["a"]
+    assert duplicates[0]["duplicate_of"] == "a"
+
+
+def test_results_do_not_depend_on_numpy(monkeypatch) -> None:
+    events = [
+        _event(str(idx), f"{kind} on {topic} with guest {idx % 7}", f"2030-03-0{1 + idx % 3}T18:00")
+        for idx, (kind, topic) in enumerate(
+            (kind, topic) for kind in ("Talk", "Panel", "Reading") for topic in ("jazz", "soil", "climate data", "poetry")
+        )
+    ]
+    sets = [shingles(event) for event in events] + [frozenset()]
+    days = [event["start_local"][:10] for event in events] + [""]
+    with_numpy = near_dupes.signatures(sets)
+    pairs = near_dupes.candidate_pairs(days, with_numpy)
+    monkeypatch.setattr(near_dupes, "numpy", None)
+    assert near_dupes.signatures(sets) == with_numpy == [minhash(shingle_set) for shingle_set in sets]
+    assert near_dupes.candidate_pairs(days, with_numpy) == pairs
+
+
+def test_large_days_stay_subquadratic(monkeypatch) -> None:
+    checked = []
+    real_jaccard = near_dupes.jaccard
+    monkeypatch.setattr(near_dupes, "jaccard", lambda a, b: checked.append(1) or real_jaccard(a, b))
+    # Templated titles on one day all land in the same buckets.
+    events = [_event(str(idx), f"Office hours with Prof. Smith {idx}", "2030-03-04T10:00", "Room 1") for idx in range(3000)]
+    events += [_event("dup", "Office hours w/ Prof Smith 7", "2030-03-04T10:00", "Room 1")]
+    clusters = find_near_duplicates(events)
+    assert len(checked) < 3001 * near_dupes.BANDS
+    assert [(c.keeper["uid"], [m["uid"] for m, _ in c.members]) for c in clusters] == [("7", ["dup"])]
+
+
+def test_one_large_templated_group_stays_linear(monkeypatch) -> None:
+    checked = []
+    real_jaccard = near_dupes.jaccard
+    monkeypatch.setattr(near_dupes, "jaccard", lambda a, b: checked.append(1) or real_jaccard(a, b))
+    # Every listing matches every other, so they form a single group.
+    events = [_event(str(idx), "Office hours with Prof. Smith", f"2030-03-04T{10 + idx % 8}:00", "Room 1") for idx in range(3000)]
+    clusters = find_near_duplicates(events)
+    assert len(checked) < 3000 * near_dupes.BANDS
+    assert len(clusters) == 1 and clusters[0].keeper["uid"] == "0" and len(clusters[0].members) == 2999
@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta
+from itertools import combinations
+from pathlib import Path
+import random
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'src'))
+
+from plan.choose import choose_portfolio, event_window, portfolio_caps
+from plan.optimal import event_cost, portfolio_objective, weekly_spend_cap
+
+CONFIG = {"hard_rules": {"no_overlap": True}}
+
+PREFERENCES = {
+    "time_windows": {"evenings": {"weekdays": ["17:00", "22:00"]}},
+    "caps": {"max_per_day": 2, "max_per_week": 3, "max_weekend_total": 2},
+    "budgets": {"weekly_spend_cap_usd": 30},
+    "quotas": {"weekly": {"career_learning": 1}, "monthly": {"social_connection": 2}},
+    "categories": {"map": {"Lecture": ["career_learning"], "Music": ["social_connection"]}},
+}
+
+
+def _event(uid: str, start: str, minutes: int, score: float, category: str = "Arts", cost: str = "") -> dict:
+    end = datetime.fromisoformat(start) + timedelta(minutes=minutes)
+    return {
+        "uid": uid,
+        "start_local": start,
+        "end_local": end.isoformat(timespec="minutes"),
+        "score": score,
+        "category": category,
+        "cost": cost,
+    }
+
+
+def _uids(portfolio: dict) -> set[str]:
+    return {event["uid"] for event in portfolio["selected"]}
+
+
+def test_two_compatible_picks_beat_one_blocking_pick() -> None:
+    events = [
+        _event("long", "2030-05-07T18:00", 180, 1.0),
+        _event("early", "2030-05-07T17:30", 60, 0.7),
+        _event("late", "2030-05-07T19:30", 90, 0.7),
+    ]
+    assert _uids(choose_portfolio(events, CONFIG, PREFERENCES)) == {"long"}
+    optimal = choose_portfolio(events, CONFIG, PREFERENCES, planner="optimal")
+    assert _uids(optimal) == {"early", "late"}
+    assert optimal["summary"]["planner"]["weeks_optimal"] == ["2030-W19"]
+
+
+def test_spend_cap_and_quotas_shape_the_pick() -> None:
+    events = [
+        _event("pricey", "2030-05-06T18:00", 60, 0.9, cost="$25"),
+        _event("pricey-2", "2030-05-07T18:00", 60, 0.85, cost="$20 members / $25"),
+        _event("lecture", "2030-05-08T18:00", 60, 0.3, category="Lecture"),
+        _event("free", "2030-05-09T18:00", 60, 0.4, cost="Free"),
+    ]
+    portfolio = choose_portfolio(events, CONFIG, PREFERENCES, planner="optimal")
+    assert _uids(portfolio) == {"pricey", "lecture", "free"}
+    assert sum(event_cost(event) for event in portfolio["selected"]) <= weekly_spend_cap(CONFIG, PREFERENCES)
+    assert portfolio["summary"]["quota_progress"]["weekly"]["career_learning"]["max_count"] == 1
+
+    hard = choose_portfolio(events[:2] + events[2:3], CONFIG, PREFERENCES, planner="optimal", quota_mode="hard")
+    assert "lecture" in _uids(hard)
+
+
+def _brute_force(events: list[dict], quota_mode: str) -> float:
+    caps = portfolio_caps(CONFIG, PREFERENCES)
+    cap = weekly_spend_cap(CONFIG, PREFERENCES)
+    best = 0.0
+    for size in range(1, caps["per_week"] + 1):
+        for combo in combinations(events, size):
+            windows = sorted(event_window(event) for event in combo)
+            if any(left[1] > right[0] for left, right in zip(windows, windows[1:])):
+                continue
+            days = [window[0].date() for window in windows]
+            if max(days.count(day) for day in days) > caps["per_day"]:
+                continue
+            if sum(day.weekday() >= 5 for day in days) > caps["weekend"]:
+                continue
+            if sum(event_cost(event) for event in combo) > cap:
+                continue
+            best = max(best, portfolio_objective(list(combo), CONFIG, PREFERENCES, quota_mode=quota_mode))
+    return best
+
+
+def test_matches_brute_force_on_small_weeks() -> None:
+    rng = random.Random(12)
+    for _ in range(25):
+        events = [
+            _event(
+                f"e{idx}",
+                f"2030-05-{6 + rng.randrange(7):02d}T{rng.randrange(17, 21)}:{rng.choice(['00', '30'])}",
+                rng.choice([30, 60, 120]),
+                round(rng.uniform(-0.2, 1.0), 2),
+                category=rng.choice(["Lecture", "Music", "Arts"]),
+                cost=rng.choice(["", "Free", "$10", "$25"]),
+            )
+            for idx in range(9)
+        ]
+        for quota_mode in ("soft", "hard"):
+            portfolio = choose_portfolio(events, CONFIG, PREFERENCES, planner="optimal", quota_mode=quota_mode)
+            objective = portfolio_objective(portfolio["selected"], CONFIG, PREFERENCES, quota_mode=quota_mode)
+            assert objective == portfolio["summary"]["planner"]["objective"]
+            assert objective == _brute_force(events, quota_mode)
+
+
+def test_zero_budget_falls_back_to_greedy_quality() -> None:
+    rng = random.Random(3)
+    events = [
+        _event(f"e{idx}", f"2030-05-{6 + idx % 21:02d}T{17 + idx % 4}:00", 60, round(rng.random(), 3))
+        for idx in range(400)
+    ]
+    greedy = choose_portfolio(events, CONFIG, PREFERENCES)
+    optimal = choose_portfolio(events, CONFIG, PREFERENCES, planner="optimal", time_budget=0.0)
+    assert portfolio_objective(optimal["selected"], CONFIG, PREFERENCES) >= portfolio_objective(
+        [event for event in greedy["selected"]], CONFIG, PREFERENCES
+    )
+
+
+def test_event_cost_parsing() -> None:
+    assert event_cost({"cost": "Free with RSVP"}) == 0.0
+    assert event_cost({"cost": "$1,200"}) == 1200.0
+    assert event_cost({"cost": "$10 students / $20"}) == 10.0
+    assert event_cost({"cost": "Donation"}) == 0.0
+    assert event_cost({"cost": 15}) == 15.0
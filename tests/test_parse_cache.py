@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+import hashlib
+import sys
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'src'))
+
+pytest.importorskip('httpx')
+pytest.importorskip('icalendar')
+
+from scrape import ics_pull
+from util import http_cache, parse_cache
+from util.http_cache import CachedFetch
+from util.timez import DEFAULT_TIMEZONE
+
+
+def _ics(*events: tuple[str, datetime]) -> bytes:
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0"]
+    for uid, start in events:
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:{uid}",
+            f"SUMMARY:{uid}",
+            f"DTSTART:{start.strftime('%Y%m%dT%H%M%S')}",
+            f"DTEND:{(start + timedelta(hours=2)).strftime('%Y%m%dT%H%M%S')}",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(lines).encode("utf-8")
+
+
+def _response(content: bytes) -> CachedFetch:
+    return CachedFetch(content=content, headers={}, from_cache=True, status_code=304, digest=hashlib.sha256(content).hexdigest())
+
+
+@pytest.fixture
+def cache_dir(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(http_cache, "CACHE_DIR", tmp_path)
+    parse_cache.reset_parse_stats()
+    yield tmp_path
+    parse_cache.close_parse_cache()
+    parse_cache.reset_parse_stats()
+
+
+def test_unchanged_body_skips_parsing(cache_dir: Path, monkeypatch) -> None:
+    now = datetime.now(DEFAULT_TIMEZONE).replace(tzinfo=None)
+    response = _response(_ics(("soon", now + timedelta(days=2)), ("gone", now - timedelta(days=2))))
+    monkeypatch.setattr(ics_pull, "fetch", lambda url, ttl=None: response)
+    source = {"slug": "demo", "url": "https://example.test/feed.ics"}
+
+    first = ics_pull.pull(source, horizon_days=30)
+    monkeypatch.setattr(ics_pull, "iter_occurrences", None)  # a second parse would blow up
+    second = ics_pull.pull(source, horizon_days=30)
+
+    assert [event["uid"] for event in first] == ["soon"]
+    assert second == first
+    assert parse_cache.parse_cache_stats() == {"ics": {"hits": 1, "misses": 1}}
+
+
+def test_horizon_is_applied_on_read(cache_dir: Path, monkeypatch) -> None:
+    now = datetime.now(DEFAULT_TIMEZONE).replace(tzinfo=None)
+    response = _response(_ics(("near", now + timedelta(days=1)), ("far", now + timedelta(days=20))))
+    monkeypatch.setattr(ics_pull, "fetch", lambda url, ttl=None: response)
+    source = {"slug": "demo", "url": "https://example.test/feed.ics"}
+
+    assert [event["uid"] for event in ics_pull.pull(source, horizon_days=30)] == ["near", "far"]
+    assert [event["uid"] for event in ics_pull.pull(source, horizon_days=30)] == ["near", "far"]
+    assert parse_cache.parse_cache_stats()["ics"] == {"hits": 1, "misses": 1}
+
+    stamp = datetime.now(DEFAULT_TIMEZONE).timestamp()
+    rows = [
+        {"start": stamp - 7200, "end": stamp - 3600, "event": {"uid": "over"}},
+        {"start": stamp - 3600, "end": stamp + 3600, "event": {"uid": "running"}},
+        {"start": stamp + 86400 * 10, "end": None, "event": {"uid": "later"}},
+    ]
+    assert [event["uid"] for event in parse_cache.within_horizon(rows, 7)] == ["running"]
+    assert [event["uid"] for event in parse_cache.within_horizon(rows, 14, drop_past=False)] == ["over", "running", "later"]
+
+
+def test_key_changes_with_source_config_and_version() -> None:
+    source = {"slug": "demo", "url": "https://example.test/feed.ics", "city": "Ann Arbor"}
+    base = parse_cache.cache_key("ics", source, "abc", 1)
+    assert parse_cache.cache_key("ics", dict(reversed(source.items())), "abc", 1) == base
+    assert parse_cache.cache_key("ics", {**source, "city": "Ypsilanti"}, "abc", 1) != base
+    assert parse_cache.cache_key("ics", source, "abc", 2) != base
+    assert parse_cache.cache_key("jsonld", source, "abc", 1) != base
+    assert parse_cache.cache_key("ics", source, "def", 1) != base
+    assert parse_cache.cache_key("ics", source, "abc", 1, "2030-01-01+45") != base
+
+
+def test_html_rows_are_reparsed_on_a_new_day(cache_dir: Path, monkeypatch) -> None:
+    pytest.importorskip('bs4')
+    from datetime import date
+
+    from scrape import html_pull
+
+    page = b'<div class="event"><h2>Open mic</h2><time>7:00 PM</time></div>'
+    response = _response(page)
+    monkeypatch.setattr(html_pull, "fetch", lambda url, ttl=None: response)
+    source = {"slug": "demo", "url": "https://example.test/", "html": {"item": "div.event", "title": "h2", "datetime": "time"}}
+
+    class Day(date):
+        current = date(2030, 5, 6)
+
+        @classmethod
+        def today(cls):
+            return cls.current
+
+    monkeypatch.setattr(html_pull, "date", Day)
+    html_pull.pull(source, horizon_days=30)
+    html_pull.pull(source, horizon_days=30)
+    assert parse_cache.parse_cache_stats()["html"] == {"hits": 1, "misses": 1}
+
+    # A time-only listing resolves against today, so the next day parses afresh.
+    Day.current = date(2030, 5, 7)
+    html_pull.pull(source, horizon_days=30)
+    assert parse_cache.parse_cache_stats()["html"] == {"hits": 1, "misses": 2}
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+import json
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'src'))
+
+from util.dedupe import dedupe_events
+from util.registry_store import RegistryStore, open_registry, registry_db_path
+from util.timez import DEFAULT_TIMEZONE
+
+
+def _event(uid: str, start: str) -> dict:
+    return {"uid": uid, "title": uid, "start_local": start, "location": uid}
+
+
+def test_second_run_flags_registered_uids(tmp_path: Path) -> None:
+    registry = tmp_path / "registry.json"
+    unique, duplicates = dedupe_events([_event("a", "2099-01-01T18:00"), _event("a", "2099-01-01T18:00")], registry)
+    assert [e["uid"] for e in unique] == ["a"] and len(duplicates) == 1
+
+    unique, duplicates = dedupe_events([_event("a", "2099-01-01T18:00"), _event("b", "2099-01-02T18:00")], registry)
+    assert [e["uid"] for e in unique] == ["b"]
+    assert [e["uid"] for e in duplicates] == ["a"]
+    assert not registry.exists() and registry_db_path(registry).exists()
+
+
+def test_legacy_json_is_imported_and_left_in_place(tmp_path: Path) -> None:
+    legacy = tmp_path / "registry.json"
+    legacy.write_text(json.dumps({"old": {"first_seen": "2099-03-01T10:00"}, "blank": {}}))
+    unique, duplicates = dedupe_events([_event("old", "2099-03-01T10:00"), _event("new", "2099-03-02T10:00")], legacy)
+    assert [e["uid"] for e in unique] == ["new"] and [e["uid"] for e in duplicates] == ["old"]
+    assert legacy.exists()
+
+    store = open_registry(legacy)
+    assert store.known(["old", "new", "blank", "missing"]) == {"old", "new", "blank"}
+    assert store.migrate_json(legacy) == 0
+    store.close()
+
+
+def test_prune_drops_entries_past_retention(tmp_path: Path) -> None:
+    store = RegistryStore(tmp_path / "registry.sqlite3")
+    now = datetime.now(DEFAULT_TIMEZONE)
+
+    def stamp(days_ago: int) -> str:
+        return (now - timedelta(days=days_ago)).strftime("%Y-%m-%dT%H:%M")
+
+    store.add([("past", stamp(45)), ("recent", stamp(10)), ("upcoming", stamp(-40)), ("undated", None)])
+    assert store.add([("past", stamp(0))]) == 0
+    # Everything was seen just now, so nothing goes until its last sighting ages out too.
+    assert store.prune(30) == 0
+    assert store.prune(30, now=now + timedelta(days=31)) == 3
+    assert store.known(["past", "recent", "upcoming", "undated"]) == {"upcoming"}
+    assert store.stats()["entries"] == 1
+    store.close()
+
+
+def test_pruned_uid_still_scraped_is_not_new_again(tmp_path: Path) -> None:
+    registry = tmp_path / "registry.json"
+    started = (datetime.now(DEFAULT_TIMEZONE) - timedelta(days=120)).strftime("%Y-%m-%dT%H:%M")
+    listing = _event("past-listing", started)  # a listing page that still shows an old event
+    unique, _ = dedupe_events([dict(listing)], registry, retention_days=90)
+    assert [e["uid"] for e in unique] == ["past-listing"]
+
+    for _ in range(2):
+        unique, duplicates = dedupe_events([dict(listing)], registry, retention_days=90)
+        assert unique == [] and [e["uid"] for e in duplicates] == ["past-listing"]
+
+    store = open_registry(registry)
+    assert store.prune(90, now=datetime.now(DEFAULT_TIMEZONE) + timedelta(days=91)) == 1
+    store.close()
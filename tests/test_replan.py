@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'src'))
+
+from plan.choose import choose_portfolio
+from plan.replan import candidate_digests, replan_portfolio
+from util.timez import ensure_timezone
+
+CONFIG = {"hard_rules": {"no_overlap": True}}
+
+PREFERENCES = {
+    "time_windows": {"evenings": {"weekdays": ["17:00", "22:00"]}, "no_change_window_hours": 24},
+    "caps": {"max_per_day": 1, "max_per_week": 5, "daily_change_budget": 2, "weekly_change_budget": 6},
+}
+
+NOW = ensure_timezone(datetime(2030, 5, 6, 9, 0))
+
+
+def _event(uid: str, day: int, score: float, hour: int = 18) -> dict:
+    start = datetime(2030, 5, day, hour)
+    return {
+        "uid": uid,
+        "start_local": start.isoformat(timespec="minutes"),
+        "end_local": (start + timedelta(hours=1)).isoformat(timespec="minutes"),
+        "score": score,
+    }
+
+
+def _baseline(events: list[dict]) -> dict:
+    portfolio = choose_portfolio(events, CONFIG, PREFERENCES)
+    portfolio["summary"]["candidate_digests"] = candidate_digests(events)
+    return portfolio
+
+
+def _uids(portfolio: dict) -> list[str]:
+    return sorted(event["uid"] for event in portfolio["selected"])
+
+
+def test_unchanged_days_keep_their_picks() -> None:
+    events = [_event("a", 7, 0.5), _event("b", 8, 0.6), _event("c", 9, 0.7)]
+    previous = _baseline(events)
+
+    # A better event appears on the 9th and a new day opens; the 8th is untouched.
+    today = [dict(event) for event in events] + [_event("d", 9, 0.9, hour=19), _event("e", 10, 0.4)]
+    today[1]["score"] = 0.1  # same day set, but rescoring changes its digest
+    portfolio = replan_portfolio(today, previous, CONFIG, PREFERENCES, now=NOW)
+    assert _uids(portfolio) == ["a", "b", "d", "e"]
+    replan = portfolio["summary"]["replan"]
+    assert replan["resolved_days"] == ["2030-05-08", "2030-05-09", "2030-05-10"]
+    assert replan["new_days"] == ["2030-05-10"]
+    assert replan["changes"] == {"2030-05-09": 2}
+    assert portfolio["summary"]["candidate_digests"] == candidate_digests(today)
+
+
+def test_approved_and_near_term_picks_are_pinned() -> None:
+    events = [_event("soon", 6, 0.5), _event("kept", 9, 0.5)]
+    previous = _baseline(events)
+    previous["selected"][1]["approved"] = True
+
+    today = [dict(event) for event in events] + [_event("rival-soon", 6, 0.9, 20), _event("rival", 9, 0.9, 20)]
+    portfolio = replan_portfolio(today, previous, CONFIG, PREFERENCES, now=NOW)
+    assert _uids(portfolio) == ["kept", "soon"]
+    assert [event.get("approved") for event in portfolio["selected"] if event["uid"] == "kept"] == [True]
+
+
+def test_change_budget_reverts_busiest_days() -> None:
+    events = [_event(f"old{day}", day, 0.5) for day in range(7, 12)]
+    previous = _baseline(events)
+    today = [dict(event) for event in events] + [_event(f"new{day}", day, 0.9, 20) for day in range(7, 12)]
+
+    budget = dict(PREFERENCES, caps=dict(PREFERENCES["caps"], weekly_change_budget=4))
+    portfolio = replan_portfolio(today, previous, CONFIG, budget, now=NOW)
+    replan = portfolio["summary"]["replan"]
+    assert sum(replan["changes"].values()) <= 4
+    assert len(replan["reverted_days"]) == 3
+    assert sum(uid.startswith("new") for uid in _uids(portfolio)) == 2
+
+
+def test_budgets_apply_without_stored_digests(caplog) -> None:
+    events = [_event(f"old{day}", day, 0.5) for day in range(7, 12)]
+    previous = choose_portfolio(events, CONFIG, PREFERENCES)
+    previous["summary"].pop("candidate_digests", None)
+    today = [dict(event) for event in events] + [_event(f"new{day}", day, 0.9, 20) for day in range(7, 12)]
+
+    budget = dict(PREFERENCES, caps=dict(PREFERENCES["caps"], weekly_change_budget=4))
+    with caplog.at_level("WARNING", logger="plan.replan"):
+        portfolio = replan_portfolio(today, previous, CONFIG, budget, now=NOW)
+    replan = portfolio["summary"]["replan"]
+    assert replan["new_days"] == []
+    assert sum(replan["changes"].values()) <= 4
+    assert len(replan["reverted_days"]) == 3
+    assert "no candidate digests" in caplog.text
+
+
+def test_vanished_picks_are_replaced_without_counting() -> None:
+    events = [_event("gone", 8, 0.9), _event("backup", 8, 0.4, 20)]
+    previous = _baseline(events)
+    budget = dict(PREFERENCES, caps=dict(PREFERENCES["caps"], daily_change_budget=0))
+    portfolio = replan_portfolio([dict(events[1])], previous, CONFIG, budget, now=NOW)
+    # Picking the backup is one change; the forced drop of "gone" is not.
+    assert portfolio["summary"]["replan"]["changes"] == {}
+    assert _uids(portfolio) == []
+
+    relaxed = replan_portfolio([dict(events[1])], previous, CONFIG, PREFERENCES, now=NOW)
+    assert _uids(relaxed) == ["backup"]
+
+
+def test_sticky_bonus_keeps_previous_pick() -> None:
+    events = [_event("old", 8, 0.5), _event("new", 8, 0.5, 20)]
+    previous = choose_portfolio(events[:1], CONFIG, PREFERENCES)
+    previous["summary"]["candidate_digests"] = candidate_digests(events[:1])
+    sticky = dict(PREFERENCES, meta={"stable_plan_bias": True}, weights={"sticky_keep_bonus": 0.15})
+    today = [dict(events[0]), dict(events[1], score=0.6)]
+    portfolio = replan_portfolio(today, previous, CONFIG, sticky, now=NOW)
+    assert _uids(portfolio) == ["old"]
+    assert portfolio["selected"][0]["score"] == 0.5
+    assert _uids(replan_portfolio(today, previous, CONFIG, PREFERENCES, now=NOW)) == ["new"]
@@ -0,0 +1,85 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'src'))
+
+pytest.importorskip('httpx')
+
+from plan import score as score_module
+from plan.score import attach_scores, score_event
+from util import score_cache
+from util.score_cache import ScoreCache, event_hash
+
+CONFIG = {
+    "weights": {"goals.career_learning": 0.3, "novelty": 0.1},
+    "goal_keywords": {"career_learning": ["climate", "energy"]},
+    "category_weights": {"lecture": 0.05},
+    "novelty_sources": ["source-a"],
+}
+PREFERENCES = {"weights": {"must_see_bonus": 0.2}, "categories": {"must_see_keywords": ["keynote"]}}
+
+
+def _events() -> list[dict]:
+    return [
+        {"uid": "a", "title": "Climate keynote", "category": "Lecture", "source": "source-a", "image": "x.png"},
+        {"uid": "b", "title": "Energy meetup", "start_local": "2030-05-01T19:00"},
+        {"uid": "c", "title": "Open mic"},
+    ]
+
+
+@pytest.fixture
+def cache(tmp_path: Path):
+    store = ScoreCache(tmp_path / "scores.sqlite3")
+    score_cache.reset_score_stats()
+    yield store
+    store.close()
+
+
+def test_unchanged_events_are_read_back(cache, monkeypatch) -> None:
+    first = attach_scores(_events(), CONFIG, PREFERENCES, cache=cache)
+    assert score_cache.score_cache_stats() == {"cached": 0, "computed": 3}
+    assert [event["score"] for event in first] == [score_event(event, CONFIG, PREFERENCES) for event in first]
+
+    def fail(self, event):
+        raise AssertionError("rescored an unchanged event")
+
+    monkeypatch.setattr(score_module.ScoringModel, "score", fail)
+    score_cache.reset_score_stats()
+    again = _events()
+    again[0]["image"] = "y.png"  # not a scored field
+    attach_scores(again, CONFIG, PREFERENCES, cache=cache)
+    assert score_cache.score_cache_stats() == {"cached": 3, "computed": 0}
+    assert [event["score"] for event in again] == [event["score"] for event in first]
+
+
+def test_changed_events_and_config_are_rescored(cache) -> None:
+    attach_scores(_events(), CONFIG, PREFERENCES, cache=cache)
+
+    score_cache.reset_score_stats()
+    events = _events()
+    events[2]["notes"] = "Climate panel afterwards"
+    attach_scores(events, CONFIG, PREFERENCES, cache=cache)
+    assert score_cache.score_cache_stats() == {"cached": 2, "computed": 1}
+    assert events[2]["score"] == score_event(events[2], CONFIG, PREFERENCES)
+
+    score_cache.reset_score_stats()
+    changed = {**CONFIG, "weights": {**CONFIG["weights"], "novelty": 0.5}}
+    events = _events()
+    attach_scores(events, changed, PREFERENCES, cache=cache)
+    assert score_cache.score_cache_stats() == {"cached": 0, "computed": 3}
+    assert events[0]["score"] == score_event(events[0], changed, PREFERENCES)
+
+
+def test_event_hash_covers_only_present_fields() -> None:
+    fields = score_module.SCORED_FIELDS
+    assert event_hash({"title": "x", "uid": "1"}, fields) == event_hash({"title": "x", "uid": "2"}, fields)
+    assert event_hash({"title": "x"}, fields) != event_hash({"title": "x", "cost": None}, fields)
+
+
+def test_prune_drops_unused_rows(cache) -> None:
+    cache.put_many([("k1", 0.5), ("k2", 0.25)])
+    assert cache.get_many(["k1", "missing"]) == {"k1": 0.5}
+    assert cache.prune(max_age=-1.0) == 2
+    assert len(cache) == 0
@@ -3,7 +3,7 @@ import sys
 
 sys.path.append(str(Path(__file__).resolve().parents[1] / 'src'))
 
-from plan.score import attach_scores, score_event
+from plan.score import ScoringModel, attach_scores, score_event
 
 
 SCORING_CONFIG = {
@@ -62,3 +62,52 @@ def test_attach_scores_mutates_events() -> None:
     ]
     attach_scores(events, SCORING_CONFIG, PREFERENCES)
     assert "score" in events[0]
+
+
+PARITY_CONFIG = {
+    "weights": {
+        "goals.career_learning": 0.3,
+        "goals.fitness": 0.17,
+        "novelty": 0.1,
+        "travel_time_penalty": -0.13,
+        "cost_penalty": -0.07,
+    },
+    "goal_keywords": {
+        "career_learning": ["climate", "Energy", "energy", "", "  "],
+        "fitness": ["run", "yoga", "climate"],
+    },
+    "category_weights": {"lecture": 0.05, "sports": 0.11},
+    "cost_preferences": {"free_bonus": 0.05},
+    "novelty_sources": ["source-a"],
+}
+
+PARITY_EVENTS = [
+    {"title": "Brunch & Run Club", "notes": "Yoga after", "category": "Sports", "cost": "$5", "travel_minutes": 50},
+    {"title": "Climate keynote", "category": "Lecture", "start_local": "2025-10-01T21:30", "source": "source-a"},
+    {"title": "CLIMATE — Énergie", "notes": "energy!", "url": "https://x.test/run", "cost": "FREE", "travel_minutes": 20},
+    {"title": "Quiet evening", "tags": ["Lecture", "sports"], "start_local": "bad", "travel_minutes": 35.5},
+    {"title": "Keynote: Run", "tags": "lecture", "org": "Energy Org", "start_local": "2025-10-01T20:00"},
+    {"title": "", "notes": ""},
+    {},
+]
+
+
+def test_scoring_model_matches_score_event() -> None:
+    model = ScoringModel(PARITY_CONFIG, PREFERENCES)
+    for event in PARITY_EVENTS:
+        assert model.score(event) == score_event(event, PARITY_CONFIG, PREFERENCES)
+
+
+def test_scoring_model_counts_duplicate_keywords_and_skips_empty_ones() -> None:
+    model = ScoringModel(PARITY_CONFIG, PREFERENCES)
+    assert model.patterns == ("climate", "energy", "run", "yoga")
+    assert model.goal_matches("climate energy") == [3, 1]
+    assert model.goal_matches("brunch") == [0, 1]
+
+
+def test_empty_must_see_keyword_matches_everything_as_before() -> None:
+    preferences = {**PREFERENCES, "categories": {"must_see_keywords": ["", "keynote"]}}
+    model = ScoringModel(SCORING_CONFIG, preferences)
+    event = {"title": "Anything"}
+    assert model.is_must_see(event)
+    assert model.score(event) == score_event(event, SCORING_CONFIG, preferences)
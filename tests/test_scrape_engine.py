@@ -0,0 +1,57 @@
+from pathlib import Path
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'src'))
+
+pytest.importorskip('httpx')
+
+from scrape.engine import scrape_concurrently
+
+
+def test_scrape_concurrently_preserves_order_and_host_limits() -> None:
+    sources = [
+        {"slug": f"s{idx}", "url": f"https://host{idx % 2}.example/feed"}
+        for idx in range(8)
+    ]
+    in_flight: dict[str, int] = {"host0.example": 0, "host1.example": 0}
+    peak: dict[str, int] = dict(in_flight)
+    lock = threading.Lock()
+
+    def fake_process(source, *, horizon_days, include_js):
+        host = source["url"].split("/")[2]
+        with lock:
+            in_flight[host] += 1
+            peak[host] = max(peak[host], in_flight[host])
+        time.sleep(0.05)
+        with lock:
+            in_flight[host] -= 1
+        return [{"title": source["slug"]}], "ics"
+
+    started = time.perf_counter()
+    results = scrape_concurrently(sources, fake_process, horizon_days=7, include_js=False, concurrency=8, per_host=2)
+    elapsed = time.perf_counter() - started
+
+    assert [source["slug"] for source, _, _ in results] == [s["slug"] for s in sources]
+    assert max(peak.values()) <= 2
+    assert elapsed < 0.05 * len(sources)
+
+
+def test_busy_host_does_not_starve_other_hosts() -> None:
+    sources = [{"slug": f"busy{idx}", "url": "https://events.example/feed"} for idx in range(6)]
+    sources.append({"slug": "other", "url": "https://other.example/feed"})
+    started_at: dict[str, float] = {}
+
+    def fake_process(source, *, horizon_days, include_js):
+        started_at[source["slug"]] = time.perf_counter()
+        time.sleep(0.05)
+        return [], "ics"
+
+    began = time.perf_counter()
+    scrape_concurrently(sources, fake_process, horizon_days=7, include_js=False, concurrency=2, per_host=1)
+    # Five busy-host sources queue behind the first; the other host gets the free global slot at once.
+    assert started_at["other"] - began < 0.04
+    assert started_at["other"] < started_at["busy1"]
@@ -0,0 +1,115 @@
+from pathlib import Path
+import json
+import sys
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'src'))
+
+pytest.importorskip('httpx')
+pytest.importorskip('yaml')
+
+import run_all
+from scrape.strategy import StrategyMemory
+from util.http_cache import CachedFetch
+
+
+@pytest.fixture
+def scrapers(monkeypatch):
+    calls: list[tuple[str, object]] = []
+    fetches: list[str] = []
+    yields = {"ics": 0, "jsonld": 0, "html": 3}
+
+    def make(name):
+        def scraper(source, *, horizon_days, response=None):
+            calls.append((name, response))
+            if yields[name] < 0:
+                raise ValueError("broken")
+            return [{"title": f"{name}-{idx}"} for idx in range(yields[name])]
+
+        return scraper
+
+    def fake_fetch(url, *, ttl=None):
+        fetches.append(url)
+        return CachedFetch(content=b"<html></html>", headers={}, from_cache=False, status_code=200, digest="d")
+
+    monkeypatch.setattr(run_all, "fetch", fake_fetch)
+    monkeypatch.setattr(run_all, "SCRAPERS", {name: make(name) for name in yields})
+    monkeypatch.setattr(run_all, "SCRAPER_ORDER", ["ics", "jsonld", "html"])
+    return calls, fetches, yields
+
+
+SOURCE = {"slug": "demo", "url": "https://example.test/events"}
+
+
+def test_attempts_share_one_fetch_and_learn_the_winner(tmp_path: Path, scrapers) -> None:
+    calls, fetches, _ = scrapers
+    strategy = StrategyMemory(tmp_path / "strategy.json")
+
+    events, type_name = run_all.process_source(SOURCE, horizon_days=7, include_js=False, strategy=strategy)
+
+    assert type_name == "html" and len(events) == 3
+    assert fetches == [SOURCE["url"]]
+    assert [name for name, _ in calls] == ["ics", "jsonld", "html"]
+    assert len({id(response) for _, response in calls}) == 1
+    assert strategy.preferred("demo") == "html"
+
+    strategy.save()
+    reloaded = StrategyMemory(tmp_path / "strategy.json")
+    calls.clear()
+    run_all.process_source(SOURCE, horizon_days=7, include_js=False, strategy=reloaded)
+    assert [name for name, _ in calls] == ["html"]
+
+
+def test_failure_falls_back_and_relearns(tmp_path: Path, scrapers) -> None:
+    calls, _, yields = scrapers
+    strategy = StrategyMemory(tmp_path / "strategy.json")
+    run_all.process_source(SOURCE, horizon_days=7, include_js=False, strategy=strategy)
+
+    yields.update({"html": -1, "ics": 2})
+    calls.clear()
+    events, type_name = run_all.process_source(SOURCE, horizon_days=7, include_js=False, strategy=strategy)
+    assert (type_name, len(events)) == ("ics", 2)
+    assert [name for name, _ in calls] == ["html", "ics"]
+    assert strategy.preferred("demo") == "ics"
+
+
+def test_fetch_failure_is_recorded(tmp_path: Path, scrapers, monkeypatch) -> None:
+    calls, _, _ = scrapers
+    strategy = StrategyMemory(tmp_path / "strategy.json")
+    run_all.process_source(SOURCE, horizon_days=7, include_js=False, strategy=strategy)
+
+    def failing_fetch(url, *, ttl=None):
+        raise OSError("connection refused")
+
+    monkeypatch.setattr(run_all, "fetch", failing_fetch)
+    calls.clear()
+    assert run_all.process_source(SOURCE, horizon_days=7, include_js=False, strategy=strategy) == ([], "html")
+    assert calls == []
+    assert strategy.preferred("demo") == "html"
+    strategy.save()
+    stats = json.loads((tmp_path / "strategy.json").read_text())["demo"]["scrapers"]["html"]
+    assert (stats["successes"], stats["failures"], stats["last_events"]) == (1, 1, 0)
+
+
+def test_reprobe_runs_everything_and_keeps_the_best_yield(tmp_path: Path, scrapers) -> None:
+    calls, _, yields = scrapers
+    strategy = StrategyMemory(tmp_path / "strategy.json", reprobe_after=0.0)
+    run_all.process_source(SOURCE, horizon_days=7, include_js=False, strategy=strategy)
+
+    yields["jsonld"] = 5
+    calls.clear()
+    events, type_name = run_all.process_source(SOURCE, horizon_days=7, include_js=False, strategy=strategy)
+    assert [name for name, _ in calls] == ["ics", "jsonld", "html"]
+    assert (type_name, len(events)) == ("jsonld", 5)
+
+
+def test_plan_orders_preferred_first(tmp_path: Path) -> None:
+    strategy = StrategyMemory(tmp_path / "strategy.json", reprobe_after=100.0)
+    assert strategy.plan("new", ["ics", "html"]) == (["ics", "html"], True)
+    strategy.record("s", "html", events=4, latency=0.2)
+    strategy.choose("s", "html", probed=True)
+    assert strategy.plan("s", ["ics", "jsonld", "html"]) == (["html", "ics", "jsonld"], False)
+    assert strategy.plan("s", ["ics", "jsonld", "html"], now=10**12) == (["ics", "jsonld", "html"], True)
+    strategy.choose("s", None, probed=False)
+    assert strategy.preferred("s") is None
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+import random
+import sys
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'src'))
+
+pytest.importorskip('yaml')
+
+from preferences import time_windows_from_config
+from util.time_windows import TimeWindows
+from util.timez import DEFAULT_TIMEZONE, in_quiet_hours
+
+PREFERENCES = {
+    "time_windows": {
+        "evenings": {"weekdays": ["17:30", "21:30"], "saturday": ["22:00", "02:00"]},
+        "quiet_hours": [["22:30", "07:00"], ["12:00", "13:15"]],
+    },
+    "preferences": {"start_time": {"late_start_penalty_after": "20:30", "late_start_penalty": -0.04}},
+}
+
+
+def _minutes(label: str) -> int:
+    hour, minute = map(int, label.split(":"))
+    return hour * 60 + minute
+
+
+def _reference_evening(start: datetime, windows: dict[int, tuple[str, str]]) -> bool:
+    if start.weekday() not in windows:
+        return True
+    window_start, window_end = map(_minutes, windows[start.weekday()])
+    minutes = start.hour * 60 + start.minute
+    if window_start <= window_end:
+        return window_start <= minutes <= window_end
+    return minutes >= window_start or minutes <= window_end
+
+
+def _reference_quiet(start: datetime, end: datetime, pairs: list[tuple[str, str]]) -> bool:
+    for start_str, end_str in pairs:
+        quiet_start = datetime.strptime(start_str, "%H:%M").time()
+        quiet_end = datetime.strptime(end_str, "%H:%M").time()
+        if quiet_start <= quiet_end:
+            if quiet_start <= start.time() < quiet_end:
+                return True
+        elif start.time() >= quiet_start or start.time() < quiet_end:
+            return True
+        if quiet_start <= end.time() < quiet_end:
+            return True
+    return False
+
+
+def test_matches_per_event_checks() -> None:
+    evenings = {day: ("17:30", "21:30") for day in range(5)} | {5: ("22:00", "02:00")}
+    quiet = [("22:30", "07:00"), ("12:00", "13:15"), ("09:00", "09:00")]
+    windows = TimeWindows(evenings=evenings, quiet=quiet)
+    rng = random.Random(3)
+    base = datetime(2030, 3, 4, tzinfo=DEFAULT_TIMEZONE)
+    for _ in range(5000):
+        start = base + timedelta(minutes=rng.randrange(7 * 1440), seconds=rng.randrange(60))
+        end = start + timedelta(minutes=rng.randrange(1, 600))
+        assert windows.in_evening_window(start) == _reference_evening(start, evenings)
+        assert windows.in_quiet_hours(start, end) == _reference_quiet(start, end, quiet)
+        assert in_quiet_hours(start, end, quiet) == _reference_quiet(start, end, quiet)
+
+
+def test_window_edges() -> None:
+    windows = time_windows_from_config({}, PREFERENCES)
+    friday = datetime(2030, 3, 8, tzinfo=DEFAULT_TIMEZONE)
+    saturday = datetime(2030, 3, 9, tzinfo=DEFAULT_TIMEZONE)
+    assert windows.in_evening_window(friday.replace(hour=21, minute=30))
+    assert not windows.in_evening_window(friday.replace(hour=21, minute=31))
+    assert windows.in_evening_window(saturday.replace(hour=1, minute=0))
+    assert windows.in_evening_window(saturday + timedelta(days=1, hours=9))  # Sunday: no window
+    assert windows.in_quiet_hours(friday.replace(hour=12, minute=30), friday.replace(hour=14))
+    assert not windows.in_quiet_hours(friday.replace(hour=13, minute=15), friday.replace(hour=14))
+    assert windows.evening_overlap(friday.replace(hour=16), friday.replace(hour=17, minute=45))
+    assert windows.evening_overlap(saturday.replace(hour=16), saturday.replace(hour=17)) is False
+    assert windows.evening_overlap(saturday + timedelta(days=1, hours=18), saturday + timedelta(days=1, hours=19)) is None
+    assert (windows.starts_late(19), windows.starts_late(20), windows.late_start_penalty) == (False, True, -0.04)
+
+
+def test_quiet_hours_fall_back_to_hard_rules() -> None:
+    config = {"hard_rules": {"evening_quiet_hours": [["21:00", "23:00"]]}, "weights": {"evening_penalty": -0.07}}
+    windows = time_windows_from_config(config, {})
+    start = datetime(2030, 3, 5, 21, 30, tzinfo=DEFAULT_TIMEZONE)
+    assert windows.in_quiet_hours(start, start + timedelta(hours=1))
+    assert windows.in_evening_window(start)
+    assert windows.late_start_after is None and windows.late_start_penalty == -0.07
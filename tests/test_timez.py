@@ -0,0 +1,87 @@
+from datetime import datetime
+from pathlib import Path
+import sys
+from zoneinfo import ZoneInfo
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'src'))
+
+pytest.importorskip('dateutil')
+
+from dateutil import parser
+
+from util import timez
+from util.timez import DEFAULT_TIMEZONE, ensure_timezone, parse_datetime
+
+# Shapes seen in scraped feeds, plus near misses that must still reach dateutil.
+CORPUS = [
+    "2030-05-01",
+    "2030-05-01T18:00",
+    "2030-05-01 18:00:00",
+    "2030-05-01T18:00:00-04:00",
+    "2030-05-01T22:00:00Z",
+    "2030-05-01T18:00:00.250+0530",
+    "2030-11-03T01:30:00",
+    "2030-02-30",
+    "2030-05-01T24:00",
+    "20300501T180000",
+    "5/3/2030",
+    "05/03/2030 7:30 PM",
+    "5/3/2030 19:30:05",
+    "5/3/2030 12:00 am",
+    "13/3/2030",
+    "May 3, 2030",
+    "Friday, May 3, 2030 7:30 PM",
+    "Fri, May 3, 2030 at 7pm",
+    "Sept. 3rd, 2030 12pm",
+    "MAY 3 2030 19:30",
+    "May 3 2030 13pm",
+    "May 3 2030 7",
+    "Tues, May 7, 2030",
+    "Someday 3, 2030",
+    "7:30 PM",
+    "Saturday",
+]
+
+
+def _reference(value: str, tz: ZoneInfo | None = None) -> datetime | type:
+    try:
+        return ensure_timezone(parser.parse(value), tz or DEFAULT_TIMEZONE)
+    except Exception as exc:
+        return type(exc)
+
+
+@pytest.mark.parametrize("value", CORPUS)
+@pytest.mark.parametrize("tz", [None, ZoneInfo("Europe/Berlin")])
+def test_matches_dateutil(value: str, tz: ZoneInfo | None) -> None:
+    expected = _reference(value, tz)
+    try:
+        result = parse_datetime(value, tz)
+    except Exception as exc:
+        assert type(exc) is expected
+        return
+    assert result == expected
+    assert result.tzinfo is expected.tzinfo
+    assert (result.isoformat(), result.fold) == (expected.isoformat(), expected.fold)
+
+
+def test_common_formats_skip_dateutil(monkeypatch) -> None:
+    timez._parse_memo.cache_clear()
+
+    def boom(value):
+        raise AssertionError(f"dateutil called for {value!r}")
+
+    monkeypatch.setattr(timez.parser, "parse", boom)
+    expected = datetime(2031, 1, 2, 3, 4, tzinfo=DEFAULT_TIMEZONE)
+    assert parse_datetime("2031-01-02T03:04:00-05:00") == expected
+    assert parse_datetime("1/2/2031 3:04 AM") == expected
+    assert parse_datetime("Thursday, January 2, 2031 at 3:04 am") == expected
+
+
+def test_repeated_values_are_memoized() -> None:
+    timez._parse_memo.cache_clear()
+    first = parse_datetime("June 9, 2031 8pm")
+    assert parse_datetime("June 9, 2031 8pm") is first
+    assert timez._parse_memo.cache_info().hits == 1
+    assert parse_datetime("June 9, 2031 8pm", ZoneInfo("UTC")) is not first